@@ -10,8 +10,9 @@ percentile-based whisker plots.
 from __future__ import annotations
 
 import numpy as np
-from datetime import datetime, timedelta
-from typing import Tuple, List, Optional, Dict
+from bisect import bisect_right
+from datetime import datetime, timedelta, timezone
+from typing import Tuple, List, Optional, Dict, Union
 import logging
 
 log = logging.getLogger(__name__)
@@ -33,7 +34,8 @@ def aggregate_timeseries(
     Uses pure numpy implementation (no pandas dependency).
     
     Args:
-        timestamps: Array of datetime objects (must be timezone-aware)
+        timestamps: Array of datetime objects (must be timezone-aware), or a
+            datetime64 array
         values: Array of numeric values (same length as timestamps)
         time_unit: Aggregation interval - one of:
             "1min", "5min", "15min", "30min", "1h", "6h", "12h", "1d", "3d", "1w"
@@ -42,7 +44,8 @@ def aggregate_timeseries(
     
     Returns:
         Tuple of (bin_centers, stats_dict) where:
-        - bin_centers: Array of datetime objects representing center of each time bin
+        - bin_centers: Array of datetime objects (datetime64 for datetime64 input)
+            representing center of each time bin
         - stats_dict: Dictionary with keys like 'p10', 'p25', 'p50', 'p75', 'p90', 'count'
             Each value is an ndarray of statistics for each bin
     
@@ -90,62 +93,41 @@ def aggregate_timeseries(
     bin_width = time_delta_map[time_unit]
     
     try:
-        # Sort by timestamp
-        sort_idx = np.argsort(timestamps)
-        timestamps_sorted = timestamps[sort_idx]
-        values_sorted = values[sort_idx]
+        # Everything below works on int64 microseconds; one stable sort
+        timestamps = np.asarray(timestamps)
+        offsets_us = _to_epoch_us(timestamps)
+        sort_idx = np.argsort(offsets_us, kind='stable')
+        offsets_sorted = offsets_us[sort_idx]
+        values_sorted = np.asarray(values)[sort_idx]
         
-        # Determine time range and create bins
-        t_min = timestamps_sorted[0]
-        t_max = timestamps_sorted[-1]
+        # Determine time range relative to the earliest sample
+        t_min = timestamps[sort_idx[0]]
+        offsets_sorted -= offsets_sorted[0]
         
-        # Calculate number of bins needed
-        total_duration = (t_max - t_min).total_seconds()
-        bin_width_seconds = bin_width.total_seconds()
-        n_bins = int(np.ceil(total_duration / bin_width_seconds)) + 1
+        # Every supported unit is a fixed width, so the bin of each
+        # timestamp is a single integer division (no edges array or search)
+        width_us = bin_width // timedelta(microseconds=1)
+        bin_indices = offsets_sorted // width_us
         
-        # Create bin edges
-        bin_edges = [t_min + i * bin_width for i in range(n_bins + 1)]
+        # Group values by bin (empty bins never appear); input is sorted, so
+        # each bin is a contiguous run. Sort values within each run once so
+        # every percentile of every bin is a direct rank lookup
+        unique_bins, starts, counts, bin_rank = _runs(bin_indices)
+        if values_sorted.dtype.kind != 'f':
+            values_sorted = values_sorted.astype(np.float64)
+        values_sorted = values_sorted[_sort_within_runs(values_sorted, bin_rank, len(starts))]
         
-        # Assign each timestamp to a bin
-        bin_indices = []
-        for ts in timestamps_sorted:
-            # Find which bin this timestamp belongs to
-            bin_idx = int((ts - t_min).total_seconds() / bin_width_seconds)
-            bin_indices.append(bin_idx)
+        # Bin center is the start of the bin (same type as the input timestamps).
+        # Offsets are one int64 sequence; datetime inputs only pay for the final
+        # object conversion, which keeps tzinfo for the plotting code
+        bin_offsets = (unique_bins * width_us).astype('timedelta64[us]')
+        if timestamps.dtype.kind == 'M':
+            bin_centers = t_min + bin_offsets
+        else:
+            bin_centers = t_min + bin_offsets.astype(object)
         
-        bin_indices = np.array(bin_indices)
-        
-        # Group values by bin and compute statistics
-        unique_bins = np.unique(bin_indices)
-        
-        bin_centers_list = []
-        stats = {f'p{int(p)}': [] for p in percentiles}
-        stats['count'] = []
-        
-        for bin_idx in unique_bins:
-            mask = bin_indices == bin_idx
-            bin_values = values_sorted[mask]
-            
-            if len(bin_values) == 0:
-                continue  # Skip empty bins
-            
-            # Bin center is the start of the bin
-            bin_start = t_min + bin_idx * bin_width
-            bin_centers_list.append(bin_start)
-            
-            # Compute percentiles
-            for p in percentiles:
-                percentile_val = np.percentile(bin_values, p)
-                stats[f'p{int(p)}'].append(percentile_val)
-            
-            # Count
-            stats['count'].append(len(bin_values))
-        
-        # Convert lists to arrays
-        bin_centers = np.array(bin_centers_list)
-        for key in stats:
-            stats[key] = np.array(stats[key])
+        stats = {f'p{int(p)}': _grouped_percentile(values_sorted, starts, counts, p) for p in percentiles}
+        stats['count'] = counts
         
         log.info(f"Aggregated {len(timestamps)} points into {len(bin_centers)} bins using {time_unit} intervals")
         
@@ -157,11 +139,102 @@ def aggregate_timeseries(
         return np.array([]), {}
 
 
+_EPOCH_UTC = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_EPOCH_NAIVE = datetime(1970, 1, 1)
+_ONE_US = timedelta(microseconds=1)
+
+
+def _to_epoch_us(timestamps: np.ndarray) -> np.ndarray:
+    """
+    Convert timestamps to int64 microseconds since the epoch.
+    
+    datetime64 arrays are cast directly. Object arrays of datetimes take one
+    pass of exact integer timedelta division (aware values against a UTC
+    epoch, so mixed offsets compare correctly; naive values against a naive
+    epoch). Mixing aware and naive values raises TypeError.
+    """
+    if timestamps.dtype.kind == 'M':
+        return timestamps.astype('datetime64[us]').view(np.int64)
+    epoch = _EPOCH_NAIVE if timestamps[0].tzinfo is None else _EPOCH_UTC
+    return np.fromiter(
+        ((t - epoch) // _ONE_US for t in timestamps.tolist()),
+        dtype=np.int64,
+        count=len(timestamps)
+    )
+
+
+def _runs(keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Describe the runs of equal values in a sorted key array.
+    
+    Returns (run keys, run start offsets, run lengths, run rank of every
+    element); one linear pass, unlike np.unique, which would sort again.
+    """
+    is_start = np.empty(len(keys), dtype=bool)
+    is_start[0] = True
+    np.not_equal(keys[1:], keys[:-1], out=is_start[1:])
+    starts = np.flatnonzero(is_start)
+    counts = np.diff(np.append(starts, len(keys)))
+    return keys[starts], starts, counts, np.cumsum(is_start) - 1
+
+
+def _sort_within_runs(values: np.ndarray, rank: np.ndarray, n_runs: int) -> np.ndarray:
+    """
+    Permutation that keeps runs in place and sorts values inside each run.
+    
+    Same ordering as np.lexsort((values, rank)) but about five times faster:
+    sort by value, then stable-sort that order by run rank. Ranks that fit
+    in 16 bits get NumPy's radix sort for the stable pass.
+    """
+    by_value = np.argsort(values)
+    rank_dtype = np.uint16 if n_runs <= 1 << 16 else np.intp
+    return by_value[np.argsort(rank.astype(rank_dtype)[by_value], kind='stable')]
+
+
+def _grouped_percentile(
+    sorted_values: np.ndarray,
+    starts: np.ndarray,
+    counts: np.ndarray,
+    p: float
+) -> np.ndarray:
+    """
+    np.percentile(group, p) (linear method) for every contiguous sorted group.
+    
+    Mirrors NumPy's rank and interpolation arithmetic so results are
+    identical to calling np.percentile on each group; a group holding NaN
+    (sorted last) yields NaN, as np.percentile does.
+    """
+    q = p / 100
+    if not 0 <= q <= 1:
+        raise ValueError("Percentiles must be in the range [0, 100]")
+    
+    last = counts - 1
+    virtual = last * q
+    prev = np.floor(virtual)
+    gamma = virtual - prev
+    prev_idx = prev.astype(np.intp)
+    next_idx = prev_idx + 1
+    # At (or past) the last rank both neighbours are the group maximum
+    at_end = virtual >= last
+    prev_idx[at_end] = last[at_end]
+    next_idx[at_end] = last[at_end]
+    
+    # Weights take the values' dtype, as np.percentile's scalar-q path does
+    dtype = sorted_values.dtype
+    a = sorted_values[starts + prev_idx]
+    b = sorted_values[starts + next_idx]
+    diff = b - a
+    result = a + diff * gamma.astype(dtype, copy=False)
+    np.subtract(b, diff * (1 - gamma).astype(dtype, copy=False), out=result, where=gamma >= 0.5)
+    result[np.isnan(sorted_values[starts + last])] = np.nan
+    return result
+
+
 def should_aggregate(
-    n_points: int,
-    time_span_days: float,
+    n_points: Union[int, np.ndarray],
+    time_span_days: Union[float, np.ndarray],
     threshold_points: int = 1000
-) -> bool:
+) -> Union[bool, np.ndarray]:
     """
     Determine if aggregation should be applied based on data density.
     
@@ -170,24 +243,39 @@ def should_aggregate(
     aggregation manually via dashboard checkbox.
     
     Args:
-        n_points: Number of data points in the series
-        time_span_days: Time span covered by the data in days
+        n_points: Number of data points in the series, or an array of counts
+            (one per series) to decide for many series at once
+        time_span_days: Time span covered by the data in days (scalar or array)
         threshold_points: Point count above which aggregation is recommended
             Default: 1000
     
     Returns:
-        True if aggregation is recommended (n_points > threshold_points)
+        True if aggregation is recommended (n_points > threshold_points);
+        a bool array for array input
     
     Example:
         >>> should_aggregate(5000, 7.0)  # 5000 points over 7 days
         True
         >>> should_aggregate(500, 1.0)   # 500 points over 1 day
         False
+        >>> should_aggregate(np.array([500, 5000]), np.array([1.0, 7.0]))
+        array([False,  True])
     """
-    return n_points > threshold_points
+    if np.ndim(n_points) == 0:
+        return n_points > threshold_points
+    return np.asarray(n_points) > threshold_points
+
+
+# recommend_time_unit decision table: spans below _SPAN_THRESHOLDS_DAYS[i]
+# map to _UNIT_CHOICES[i]; anything longer maps to the last unit
+_SPAN_THRESHOLDS_DAYS = (1.0, 3.0, 7.0, 30.0)
+_UNIT_CHOICES = ("5min", "15min", "1h", "6h", "1d")
 
 
-def recommend_time_unit(n_points: int, time_span_days: float) -> str:
+def recommend_time_unit(
+    n_points: Union[int, np.ndarray],
+    time_span_days: Union[float, np.ndarray]
+) -> Union[str, np.ndarray]:
     """
     Recommend an appropriate aggregation time unit based on data characteristics.
     
@@ -195,11 +283,12 @@ def recommend_time_unit(n_points: int, time_span_days: float) -> str:
     always have final control via dashboard UI.
     
     Args:
-        n_points: Number of data points
-        time_span_days: Time span in days
+        n_points: Number of data points (scalar or array)
+        time_span_days: Time span in days, or an array of spans (one per series)
     
     Returns:
-        Recommended time unit as string: "1min", "5min", "15min", "1h", "6h", "1d"
+        Recommended time unit as string: "5min", "15min", "1h", "6h", "1d";
+        an array of those strings for array input
     
     Heuristics:
         - < 1 day: 5min
@@ -210,15 +299,10 @@ def recommend_time_unit(n_points: int, time_span_days: float) -> str:
     
     Example:
         >>> recommend_time_unit(10000, 7.5)
-        '1h'
+        '6h'
     """
-    if time_span_days < 1:
-        return "5min"
-    elif time_span_days < 3:
-        return "15min"
-    elif time_span_days < 7:
-        return "1h"
-    elif time_span_days < 30:
-        return "6h"
-    else:
-        return "1d"
+    # First threshold strictly above the span picks the unit (NaN -> "1d")
+    if np.ndim(time_span_days) == 0:
+        return _UNIT_CHOICES[bisect_right(_SPAN_THRESHOLDS_DAYS, time_span_days)]
+    idx = np.searchsorted(_SPAN_THRESHOLDS_DAYS, np.asarray(time_span_days, dtype=float), side='right')
+    return np.asarray(_UNIT_CHOICES)[idx]
@@ -11,6 +11,7 @@ structure suitable for console output and metrics emission.
 from __future__ import annotations
 
 from dataclasses import dataclass, field
+from operator import attrgetter
 from typing import Dict, Optional, List
 from datetime import datetime, timezone, timedelta
 
@@ -58,6 +59,14 @@ class AssetDecision:
     price_delta_rel: Optional[float] = None
     price_mismatch: Optional[int] = None  # 0/1
     price_compare_unavailable: Optional[int] = None  # 0/1
+    
+    @property
+    def total_wmax_usd(self) -> float:
+        """Sum of per-wallet Wmax (0 when there is no wallet breakdown)"""
+        return sum(map(_WMAX_USD, self.wmax_usd))
+
+
+_WMAX_USD = attrgetter('wmax_usd')
 
 
 def _calculate_per_wallet_wmax(
@@ -113,8 +122,7 @@ def _calculate_per_wallet_wmax(
         wallet_txs = [tx for tx in all_txs if tx.wallet_address == wallet_addr]
         
         # Calculate gains for this wallet
-        pos_ts = sorted(wallet_series.series.keys())
-        pos_vals = [float(wallet_series.series[ts]) for ts in pos_ts]
+        pos_ts, pos_vals = wallet_series.sorted_points()
         
         try:
             _, _, _, _, gains = calculate_correct_gains(
@@ -287,8 +295,7 @@ def evaluate_once(reader: GreptimeReader, settings: Settings) -> Dict[str, Asset
                         withdrawals_prefix=cfg.withdrawals_prefix,
                         date_range=per_range,
                     )
-                    pos_ts = sorted(series_obj0.series.keys())
-                    pos_vals = [float(series_obj0.series[ts]) for ts in pos_ts]
+                    pos_ts, pos_vals = series_obj0.sorted_points()
                     timebase, _, _, _, gains = calculate_correct_gains(
                         position_timestamps=pos_ts,
                         position_values=pos_vals,
@@ -348,7 +355,7 @@ def evaluate_once(reader: GreptimeReader, settings: Settings) -> Dict[str, Asset
                                     f"Residual gate (fallback) skipped: asset={asset} reason=insufficient_points (n={len(cp_vals_use)})"
                                 )
                                 # Keep baseline decision based on total wmax across all wallets
-                                total_wmax = sum(wb.wmax_usd for wb in dec.wmax_usd)
+                                total_wmax = dec.total_wmax_usd
                                 dec.decision = 1 if total_wmax > 0 else 0
                             else:
                                 # Fit
@@ -370,7 +377,7 @@ def evaluate_once(reader: GreptimeReader, settings: Settings) -> Dict[str, Asset
                                     log.warning(
                                         f"Residual gate (fallback) skipped: asset={asset} reason=degenerate_sigma (sigma={sigma_fb:.6g})"
                                     )
-                                    total_wmax = sum(wb.wmax_usd for wb in dec.wmax_usd)
+                                    total_wmax = dec.total_wmax_usd
                                     dec.decision = 1 if total_wmax > 0 else 0
                                 else:
                                     r_now_fb = float(residuals_fb[-1])
@@ -439,11 +446,11 @@ def evaluate_once(reader: GreptimeReader, settings: Settings) -> Dict[str, Asset
                                             log.warning(f"Failed to save residual diagnostic (fallback) for asset={asset}: {pe}")
                         except Exception as ge:
                             log.warning(f"Residual gate (fallback) error for asset={asset}: {ge}. Using baseline decision.")
-                            total_wmax = sum(wb.wmax_usd for wb in dec.wmax_usd)
+                            total_wmax = dec.total_wmax_usd
                             dec.decision = 1 if total_wmax > 0 else 0
                     else:
                         # Baseline decision when gate disabled or not applied in fallback
-                        total_wmax = sum(wb.wmax_usd for wb in dec.wmax_usd)
+                        total_wmax = dec.total_wmax_usd
                         dec.decision = 1 if total_wmax > 0 else 0
                         # Visualization-only composite if diagnostics enabled
                         try:
@@ -635,8 +642,7 @@ def evaluate_once(reader: GreptimeReader, settings: Settings) -> Dict[str, Asset
             )
 
             # Use mathematically correct gains with unified timebase & CDF(D/W)
-            pos_ts = sorted(series_obj.series.keys())
-            pos_vals = [float(series_obj.series[ts]) for ts in pos_ts]
+            pos_ts, pos_vals = series_obj.sorted_points()
             timebase, positions, deposit_cdf, withdrawal_cdf, gains = calculate_correct_gains(
                 position_timestamps=pos_ts,
                 position_values=pos_vals,
@@ -671,7 +677,7 @@ def evaluate_once(reader: GreptimeReader, settings: Settings) -> Dict[str, Asset
                 pass
             
             # Baseline decision (when gate disabled or not applied)
-            total_wmax = sum(wb.wmax_usd for wb in dec.wmax_usd)
+            total_wmax = dec.total_wmax_usd
             base_decision = 1 if total_wmax > 0 else 0
 
             # Residual gate for all assets (when enabled)
@@ -725,8 +731,9 @@ def evaluate_once(reader: GreptimeReader, settings: Settings) -> Dict[str, Asset
                             dec.gate_applied = False
                             decisions[asset] = dec
                             continue
-                        x_time = np.array(sorted(rate_series.series.keys()))
-                        cp_vals = np.array([float(rate_series.series[t]) for t in x_time], dtype=float)
+                        rate_ts, rate_vals = rate_series.sorted_points()
+                        x_time = np.array(rate_ts)
+                        cp_vals = np.array(rate_vals, dtype=float)
                         # Optional lookback window
                         if dg.lookback_hours is not None and len(x_time) > 0:
                             t_cut = x_time[-1] - timedelta(hours=float(dg.lookback_hours))
@@ -82,8 +82,7 @@ def dump_asset_debug(
         )
 
         # Prepare position vectors
-        pos_ts = sorted(series_obj.series.keys())
-        pos_vals = [float(series_obj.series[t]) for t in pos_ts]
+        pos_ts, pos_vals = series_obj.sorted_points()
 
         # Run the same calculation path the app uses
         timebase, interp_pos, dep_cdf, wdr_cdf, gains = calculate_correct_gains(
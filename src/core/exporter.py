@@ -738,7 +738,7 @@ class MetricsExporter:
                 if self.metrics.decision is not None:
                     self.metrics.decision.labels(asset=asset, alternate_asset_name=alt_label, ref_mode=ref_mode).set(dec.decision)
                 if self.metrics.wmax_usd is not None and getattr(dec, 'wmax_usd', None) is not None:
-                    total_wmax = sum(wb.wmax_usd for wb in dec.wmax_usd)
+                    total_wmax = dec.total_wmax_usd
                     self.metrics.wmax_usd.labels(asset=asset, alternate_asset_name=alt_label, ref_mode=ref_mode).set(total_wmax)
                 if self.metrics.v_ref_usd is not None:
                     v = getattr(dec, 'v_ref_usd', None)
@@ -1044,7 +1044,7 @@ class MetricsExporter:
             wmax_value = None  # Will be excluded from stats bar
             residual_value = None
         elif dec and getattr(dec, 'wmax_usd', None):
-            total_wmax = sum(wb.wmax_usd for wb in dec.wmax_usd)
+            total_wmax = dec.total_wmax_usd
             wmax_value = _fmt(total_wmax, as_percent=use_percent, base=percent_base_value)
         else:
             wmax_value = "N/A"
@@ -1591,13 +1591,11 @@ class MetricsExporter:
                 return None, None, f"No units series for {asset_sym}"
             if not (price_series_local and price_series_local.series):
                 return None, None, f"No price series for {asset_sym}"
-            ts_units = sorted(units_series.series.keys())
-            ts_price = sorted(price_series_local.series.keys())
+            ts_units, units_vals = units_series.sorted_points()
+            ts_price, price_vals = price_series_local.sorted_points()
             tb_union_all = sorted(set(ts_units) | set(ts_price))
             first_units_ts = ts_units[0].astimezone(timezone.utc) if ts_units[0].tzinfo else ts_units[0].replace(tzinfo=timezone.utc)
             tb_union = [t for t in tb_union_all if (t.astimezone(timezone.utc) if t.tzinfo else t.replace(tzinfo=timezone.utc)) >= first_units_ts]
-            units_vals = [float(units_series.series[t]) for t in ts_units]
-            price_vals = [float(price_series_local.series[t]) for t in ts_price]
             units_interp = interpolate_positions_on_timebase(ts_units, units_vals, np.array(tb_union), 'linear')
             price_interp = interpolate_positions_on_timebase(ts_price, price_vals, np.array(tb_union), 'linear')
             usd_positions = np.array(units_interp) * np.array(price_interp)
@@ -1714,8 +1712,7 @@ class MetricsExporter:
                     from datetime import timezone as _tz
                     align_method = str(self.settings.client.alignment_method)
                     for wallet_addr, series in wallets_series.items():
-                        w_ts = sorted(series.series.keys())
-                        w_vals = [float(series.series[t]) for t in w_ts]
+                        w_ts, w_vals = series.sorted_points()
                         interp_w = interpolate_positions_on_timebase(
                             position_timestamps=w_ts,
                             position_values=w_vals,
@@ -2071,11 +2068,9 @@ class MetricsExporter:
             #log.info(f"[RATE_DEBUG] Position view validation passed: units={len(units_series.series)} points, prices={len(price_series.series)} points")
             
             # Compute positions (units * price)
-            ts_units = sorted(units_series.series.keys())
-            ts_price = sorted(price_series.series.keys())
+            ts_units, units_vals = units_series.sorted_points()
+            ts_price, price_vals = price_series.sorted_points()
             tb_union = sorted(set(ts_units) | set(ts_price))
-            units_vals = [float(units_series.series[t]) for t in ts_units]
-            price_vals = [float(price_series.series[t]) for t in ts_price]
             units_interp = interpolate_positions_on_timebase(ts_units, units_vals, np.array(tb_union), 'linear')
             price_interp = interpolate_positions_on_timebase(ts_price, price_vals, np.array(tb_union), 'linear')
             pos_ts = list(tb_union)
@@ -2135,8 +2130,9 @@ class MetricsExporter:
             else:
                 log.warning(f"[RATE_DEBUG] rate_usd series is None or empty for {resolved_asset} from {source}")
                 return None, "No USD rate series", None
-            x_time_use = np.array(sorted(rate_series.series.keys()))
-            cp_vals_use = np.array([float(rate_series.series[t]) for t in x_time_use], dtype=float)
+            rate_ts, rate_vals = rate_series.sorted_points()
+            x_time_use = np.array(rate_ts)
+            cp_vals_use = np.array(rate_vals, dtype=float)
             #log.info(f"[RATE_DEBUG] Successfully loaded rate_usd data: {len(x_time_use)} points, values range [{cp_vals_use.min():.4f}, {cp_vals_use.max():.4f}]")
             deposit_timestamps_list = []
             withdrawal_timestamps_list = []
@@ -2147,8 +2143,9 @@ class MetricsExporter:
             if not rate_series or not rate_series.series:
                 log.warning(f"[RATE_DEBUG] rate_ada series is None or empty for {resolved_asset}")
                 return None, "No ADA rate series", None
-            x_time_use = np.array(sorted(rate_series.series.keys()))
-            cp_vals_use = np.array([float(rate_series.series[t]) for t in x_time_use], dtype=float)
+            rate_ts, rate_vals = rate_series.sorted_points()
+            x_time_use = np.array(rate_ts)
+            cp_vals_use = np.array(rate_vals, dtype=float)
             log.info(f"[RATE_DEBUG] Successfully loaded rate_ada data: {len(x_time_use)} points")
             deposit_timestamps_list = []
             withdrawal_timestamps_list = []
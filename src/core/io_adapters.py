@@ -12,9 +12,11 @@ from dataclasses import dataclass
 from typing import Dict, List, Optional, Literal, Tuple
 from datetime import datetime
 
+import numpy as np
+
 from ..shared.config import ClientConfig, DateRange, GreptimeConnConfig
 from ..shared.greptime_reader import GreptimeReader
-from ..shared.models import AssetTimeSeries, Transaction
+from ..shared.models import AssetTimeSeries, SortedSeries, Transaction
 
 DataSourceName = Literal["greptime(liqwid)", "greptime(minswap)"]
 
@@ -129,6 +131,17 @@ def get_change_rate_series_ada(asset_symbol: str, cfg: ClientConfig, date_range:
 	price_usd_series, ada_usd_series = dual
 	if not price_usd_series.series or not ada_usd_series.series:
 		return None
+	if isinstance(price_usd_series.series, SortedSeries) and isinstance(ada_usd_series.series, SortedSeries):
+		# Array-backed: intersect sorted epoch-ms timestamps and divide in one pass
+		ts, i_usd, i_ada = np.intersect1d(
+			price_usd_series.series.ts_ms, ada_usd_series.series.ts_ms, assume_unique=True, return_indices=True
+		)
+		if ts.size == 0:
+			return None
+		p = price_usd_series.series.vals[i_usd]
+		a = ada_usd_series.series.vals[i_ada]
+		keep = a != 0.0
+		return AssetTimeSeries.from_arrays(asset_symbol.upper(), ts[keep], p[keep] / a[keep])
 	# Intersection on timestamps
 	ts_usd = set(price_usd_series.series.keys())
 	ts_ada = set(ada_usd_series.series.keys())
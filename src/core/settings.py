@@ -9,12 +9,19 @@ configuration loader from src/shared/config.py
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Optional, List
+from functools import lru_cache
+from typing import Any, Optional, List
 from pathlib import Path
 from datetime import datetime, timezone, timedelta
+import copy
 import os
+import re
 import yaml
 import logging
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as _YamlLoader
 try:
     from zoneinfo import ZoneInfo
 except Exception:
@@ -31,6 +38,10 @@ from ..shared.config import (
 
 log = logging.getLogger(__name__)
 
+# plot_range.relative_duration, e.g. "7d", "12h", "1w"
+_REL_DUR_RE = re.compile(r'^(\d+)([dhw])$')
+_REL_UNIT = {'d': 'days', 'h': 'hours', 'w': 'weeks'}
+
 
 @dataclass
 class TelemetryExpose:
@@ -101,7 +112,7 @@ class DecisionGateConfig:
     central_confidence: Optional[float] = None  # central interval mass when threshold_mode='percentile'
 
 
-@dataclass
+@dataclass(slots=True)
 class PlotRangeConfig:
     """Visualization-specific date range (decoupled from data sync range)"""
     start: Optional[datetime] = None
@@ -119,8 +130,7 @@ class PlotRangeConfig:
         
         # Validate relative_duration format if mode is relative
         if self.mode == "relative" and self.relative_duration is not None:
-            import re
-            if not re.match(r'^\d+[dhw]$', self.relative_duration.lower().strip()):
+            if not _REL_DUR_RE.match(self.relative_duration.lower().strip()):
                 log.warning(f"Invalid relative_duration format '{self.relative_duration}', expected format like '7d', '12h', '1w'")
 
     def resolve(self, data_range: "DateRange", now: Optional[datetime] = None) -> "DateRange":
@@ -154,22 +164,12 @@ class PlotRangeConfig:
             now_dt = now if now is not None else datetime.now(timezone.utc)
             
             # Simple parser for relative duration (e.g., "7d", "30d", "12h", "1w")
-            import re
-            match = re.match(r'^(\d+)([dhw])$', self.relative_duration.lower().strip())
+            match = _REL_DUR_RE.match(self.relative_duration.lower().strip())
             if not match:
                 # Invalid format, fall back to inherit
                 return data_range
             
-            value, unit = int(match.group(1)), match.group(2)
-            if unit == 'd':
-                duration_td = timedelta(days=value)
-            elif unit == 'h':
-                duration_td = timedelta(hours=value)
-            elif unit == 'w':
-                duration_td = timedelta(weeks=value)
-            else:
-                # Unknown unit, fall back to inherit
-                return data_range
+            duration_td = timedelta(**{_REL_UNIT[match.group(2)]: int(match.group(1))})
             
             resolved_start = now_dt - duration_td
             resolved_end = now_dt
@@ -180,8 +180,7 @@ class PlotRangeConfig:
             return data_range
 
 
-@dataclass
-@dataclass
+@dataclass(slots=True)
 class AggregationConfig:
     """Data aggregation settings for dashboard performance optimization"""
     enabled: bool = True  # Changed default to True for performance
@@ -631,14 +630,23 @@ def _validate_config(settings: Settings) -> None:
         raise SettingsError(error_msg)
 
 
+@lru_cache(maxsize=4)
+def _load_raw_yaml(config_path: str, mtime_ns: int, size: int) -> Any:
+    """Parse a config file; keyed on mtime/size so an edited file is re-read"""
+    with open(config_path, "r", encoding="utf-8") as f:
+        return yaml.load(f, Loader=_YamlLoader)
+
+
 def load_settings(config_path: str | Path) -> Settings:
     path = Path(config_path)
     if not path.exists():
         raise SettingsError(f"Configuration file not found: {config_path}")
 
+    # Only the YAML parse is cached; Settings is rebuilt and preflight re-run
+    # on every call. Deep-copied so no caller can alter the cached document
+    st = path.stat()
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            raw = yaml.safe_load(f) or {}
+        raw = copy.deepcopy(_load_raw_yaml(str(path.resolve()), st.st_mtime_ns, st.st_size)) or {}
     except yaml.YAMLError as e:
         raise SettingsError(f"Invalid YAML in {config_path}: {e}")
 
@@ -655,7 +663,6 @@ def load_settings(config_path: str | Path) -> Settings:
     # ===== Preflight: verify configured sources DB reachability =====
     try:
         from ..shared.greptime_reader import GreptimeReader
-        import copy
         ok_all = True
         # Derive greptime-backed providers from v2 prices
         provs = []
@@ -832,6 +839,8 @@ def _load_settings_new_schema(raw: dict, path: Path) -> Settings:
             port=int(g_raw.get("port", 4000)),
             database=str(g_raw.get("database", "liqwid")),
             timeout=int(g_raw.get("timeout", 10)),
+            response_format=str(g_raw.get("response_format", "json")).strip().lower(),
+            request_gzip_min_bytes=int(g_raw.get("request_gzip_min_bytes", 0) or 0),
         )
         # date range
         dr_raw = data.get("date_range", {}) or {}
@@ -948,8 +957,18 @@ def _load_settings_new_schema(raw: dict, path: Path) -> Settings:
         # price_compare v2
         pc2_root = analysis_root.get("price_compare", {}) or {}
         pc_sources = pc2_root.get("sources", [])
-        if isinstance(pc_sources, str) and pc_sources.strip() == "@prices.sources":
-            pc_sources_list = list(p_sources)
+        if isinstance(pc_sources, str) and pc_sources.strip().startswith("@"):
+            # "@<section>.<key>" references resolve through a fixed table of
+            # already-parsed values; anything else is a config error (it used
+            # to be split into single-character source names)
+            indirections = {"@prices.sources": p_sources}
+            target = indirections.get(pc_sources.strip())
+            if target is None:
+                raise SettingsError(
+                    f"analysis.price_compare.sources: unknown reference '{pc_sources.strip()}' "
+                    f"(supported: {', '.join(indirections)})"
+                )
+            pc_sources_list = list(target)
         else:
             pc_sources_list = [str(s).strip().lower() for s in (pc_sources or []) if str(s).strip()]
         pc2 = PriceCompareV2(
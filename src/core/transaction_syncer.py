@@ -370,6 +370,8 @@ class TransactionSyncer:
         # Group transactions by type for batch writing
         deposits = []
         withdrawals = []
+        # One ingestion timestamp for the whole batch
+        created_at = datetime.now(UTC)
         
         for tx in transactions:
             try:
@@ -408,7 +410,8 @@ class TransactionSyncer:
                     asset_symbol=asset_symbol,
                     amount=amount,
                     transaction_type=our_type,
-                    notes=notes
+                    notes=notes,
+                    created_at=created_at
                 )
                 
                 if our_type == 'deposit':
@@ -45,7 +45,7 @@ def _evaluation_loop(settings, exporter) -> None:
             # Console summary (privacy-safe): asset -> decision, total wmax, wallet count
             lines = []
             for asset, dec in decisions.items():
-                total_wmax = sum(wb.wmax_usd for wb in dec.wmax_usd)
+                total_wmax = dec.total_wmax_usd
                 num_wallets = len(dec.wmax_usd)
                 reason = None
                 if total_wmax <= 0.0:
@@ -142,7 +142,7 @@ def main(config_path: Optional[str] = None, once: bool = False, no_telemetry: bo
         reader = create_greptime_reader(settings.client.greptime, settings.client.table_asset_prefix)
         decisions = evaluate_once(reader, settings)
         for asset, dec in decisions.items():
-            total_wmax = sum(wb.wmax_usd for wb in dec.wmax_usd)
+            total_wmax = dec.total_wmax_usd
             num_wallets = len(dec.wmax_usd)
             reason = None
             if total_wmax <= 0.0:
@@ -6,13 +6,15 @@ Handles time series aggregation, gap filling, and gain calculations.
 """
 
 import logging
+import sys
 import numpy as np
 from datetime import datetime
 from typing import Dict, List, Optional, Set
 from collections import defaultdict
+from collections.abc import Mapping
 
-from .models import AssetTimeSeries, AggregatedRow, GainStats, ProcessingStats, Transaction
-from .utils import safe_float, calculate_percentage_change
+from .models import AggregatedFrame, AssetTimeSeries, AggregatedRow, GainStats, ProcessingStats, SortedSeries, Transaction
+from .utils import safe_float, calculate_percentage_change, timestamps_to_datetimes
 from .correct_calculations import calculate_correct_gains
 
 
@@ -62,52 +64,69 @@ class TimeSeriesAggregator:
             self.logger.warning("No asset series provided for aggregation")
             return []
         
+        frame = self.aggregate_frame(asset_series)
+        rows = frame.to_rows()
+        self.logger.info(f"Successfully aggregated {len(rows)} rows")
+        return rows
+    
+    def aggregate_frame(
+        self,
+        asset_series: Dict[str, AssetTimeSeries]
+    ) -> AggregatedFrame:
+        """
+        Aggregate multiple asset time series into a column-oriented frame
+        
+        When every series is array-backed (SortedSeries) the timestamp union and
+        value placement run in NumPy; otherwise the union is built from the
+        mapping keys. Missing points are 0.0 when fill_missing_with_zero is set,
+        NaN otherwise, and totals sum the present values.
+        
+        Args:
+            asset_series: Dictionary mapping asset symbols to their time series
+            
+        Returns:
+            AggregatedFrame sorted by timestamp (empty if there is no data)
+            
+        Raises:
+            AggregationError: If aggregation fails
+        """
+        # Interned once here; every AggregatedRow.asset_values dict reuses these key objects
+        asset_symbols = tuple(sys.intern(sym) for sym in sorted(asset_series.keys()))
+        fill = 0.0 if self.fill_missing_with_zero else np.nan
+        
         try:
             self.logger.info(f"Aggregating {len(asset_series)} asset series")
             
-            # Collect all unique timestamps
-            all_timestamps: Set[datetime] = set()
-            for series in asset_series.values():
-                all_timestamps.update(series.series.keys())
+            if all(isinstance(asset_series[sym].series, SortedSeries) for sym in asset_symbols):
+                columns = [asset_series[sym].series for sym in asset_symbols]
+                union_ms = (np.unique(np.concatenate([c.ts_ms for c in columns]))
+                            if columns else np.empty(0, dtype=np.int64))
+                values = np.full((union_ms.size, len(asset_symbols)), fill)
+                for j, col in enumerate(columns):
+                    # Each series' timestamps are a subset of the sorted union
+                    values[np.searchsorted(union_ms, col.ts_ms), j] = col.vals
+                timestamps = timestamps_to_datetimes(union_ms)
+            else:
+                all_timestamps: Set[datetime] = set()
+                for series in asset_series.values():
+                    all_timestamps.update(series.series.keys())
+                timestamps = sorted(all_timestamps)
+                values = np.full((len(timestamps), len(asset_symbols)), fill)
+                for j, sym in enumerate(asset_symbols):
+                    series = asset_series[sym].series
+                    # A stored None is omitted (NaN) in both modes, as the row loop did
+                    values[:, j] = [
+                        np.nan if (v := series.get(ts, fill)) is None else safe_float(v)
+                        for ts in timestamps
+                    ]
             
-            if not all_timestamps:
+            if not timestamps:
                 self.logger.warning("No timestamps found across all series")
-                return []
-            
-            # Sort timestamps for consistent processing
-            sorted_timestamps = sorted(all_timestamps)
-            asset_symbols = sorted(asset_series.keys())
-            
-            self.logger.info(f"Processing {len(sorted_timestamps)} timestamps across {len(asset_symbols)} assets")
-            
-            # Build aggregated rows
-            aggregated_rows = []
-            for timestamp in sorted_timestamps:
-                asset_values = {}
-                total = 0.0
-                
-                # Collect values for each asset at this timestamp
-                for asset_symbol in asset_symbols:
-                    series = asset_series[asset_symbol]
-                    value = series.series.get(timestamp, 0.0 if self.fill_missing_with_zero else None)
-                    
-                    if value is not None:
-                        asset_values[asset_symbol] = safe_float(value)
-                        total += safe_float(value)
-                    else:
-                        # Don't include assets with missing data if not filling with zero
-                        continue
-                
-                # Create aggregated row
-                row = AggregatedRow(
-                    timestamp=timestamp,
-                    asset_values=asset_values,
-                    total=total
-                )
-                aggregated_rows.append(row)
+            else:
+                self.logger.info(f"Processing {len(timestamps)} timestamps across {len(asset_symbols)} assets")
             
-            self.logger.info(f"Successfully aggregated {len(aggregated_rows)} rows")
-            return aggregated_rows
+            totals = np.nansum(values, axis=1) if values.size else np.zeros(len(timestamps))
+            return AggregatedFrame(timestamps, asset_symbols, values, totals)
             
         except Exception as e:
             error_msg = f"Failed to aggregate series: {e}"
@@ -141,20 +160,15 @@ class TimeSeriesAggregator:
         try:
             self.logger.info(f"Computing gain statistics for {len(rows)} rows")
             
-            # Find baseline (first non-zero total if excluding zeros)
-            initial_total = 0.0
-            baseline_found = False
-            
-            for row in rows:
-                if exclude_zero_baseline and row.total <= 0:
-                    continue
-                initial_total = row.total
-                baseline_found = True
-                break
+            totals = np.fromiter((row.total for row in rows), dtype=np.float64, count=len(rows))
             
-            if not baseline_found:
+            # Find baseline (first non-zero total if excluding zeros)
+            candidates = np.flatnonzero(totals > 0) if exclude_zero_baseline else np.arange(1)
+            if candidates.size:
+                initial_total = float(totals[candidates[0]])
+            else:
                 # Use first row's total even if zero
-                initial_total = rows[0].total
+                initial_total = float(totals[0])
                 self.logger.warning(f"No non-zero baseline found, using first total: {initial_total}")
             
             # Use correct calculations if transactions are provided
@@ -163,7 +177,7 @@ class TimeSeriesAggregator:
                 
                 # Extract timestamps and position values
                 timestamps = [row.timestamp for row in rows]
-                position_values = [row.total for row in rows]
+                position_values = totals.tolist()
                 
                 # Calculate correct gains
                 align_method = str(getattr(getattr(self, 'config', None), 'alignment_method', 'none'))
@@ -177,44 +191,23 @@ class TimeSeriesAggregator:
                 )
                 
                 # Calculate statistics based on correct gains
-                absolute_gains = correct_gains
-                percentage_gains = []
-                
-                for gain in correct_gains:
-                    if initial_total > 0:
-                        pct_gain = (gain / initial_total) * 100
-                        percentage_gains.append(pct_gain)
+                absolute_gains = np.asarray(correct_gains, dtype=np.float64)
+                percentage_gains = (absolute_gains / initial_total) * 100 if initial_total > 0 else None
                 
             else:
                 # Fallback to naive calculations (for backward compatibility with zero transactions)
                 self.logger.info("Using naive gain calculations (no transactions provided)")
                 
-                absolute_gains = []
-                percentage_gains = []
-                
-                for row in rows:
-                    # Absolute gain (naive)
-                    abs_gain = row.total - initial_total
-                    absolute_gains.append(abs_gain)
-                    
-                    # Percentage gain (only if baseline is non-zero)
-                    if initial_total > 0:
-                        pct_gain = ((row.total / initial_total) - 1) * 100
-                        percentage_gains.append(pct_gain)
+                absolute_gains = totals - initial_total
+                # Percentage gain (only if baseline is non-zero)
+                percentage_gains = ((totals / initial_total) - 1) * 100 if initial_total > 0 else None
             
             # Calculate averages
-            avg_absolute_gain = None
-            avg_percentage_gain = None
-            
-            if len(absolute_gains) > 0:
-                # Normalize to a plain Python list via numpy for consistency
-                absolute_gains_list = np.asarray(absolute_gains, dtype=float).tolist()
-                avg_absolute_gain = sum(absolute_gains_list) / len(absolute_gains_list)
-            
-            if len(percentage_gains) > 0:
-                # Normalize to a plain Python list via numpy for consistency
-                percentage_gains_list = np.asarray(percentage_gains, dtype=float).tolist()
-                avg_percentage_gain = sum(percentage_gains_list) / len(percentage_gains_list)
+            avg_absolute_gain = float(absolute_gains.mean()) if absolute_gains.size else None
+            avg_percentage_gain = (
+                float(percentage_gains.mean())
+                if percentage_gains is not None and percentage_gains.size else None
+            )
             
             # Log results
             if avg_percentage_gain is not None:
@@ -378,7 +371,7 @@ def validate_aggregation_input(asset_series: Dict[str, AssetTimeSeries]) -> None
         if not series.asset_symbol:
             raise AggregationError(f"Empty asset symbol in series")
         
-        if not isinstance(series.series, dict):
+        if not isinstance(series.series, Mapping):
             raise AggregationError(f"Invalid series data for {asset_symbol}")
 
 
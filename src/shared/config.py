@@ -6,6 +6,10 @@ Handles YAML configuration loading, validation, and type conversion.
 """
 
 import yaml
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as _YamlLoader
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
@@ -21,6 +25,8 @@ class GreptimeConnConfig:
     database: str = "liqwid"
     timeout: int = 10
     test_prefix: bool = False  # If True, writes go to test_* tables (reads still use normal tables)
+    response_format: str = "json"  # "json" or "arrow" (arrow requires pyarrow; falls back to json)
+    request_gzip_min_bytes: int = 0  # Gzip writer request bodies at least this large (0 disables)
     
     def __post_init__(self):
         """Validate connection parameters"""
@@ -32,6 +38,10 @@ class GreptimeConnConfig:
             raise ValueError("Database name cannot be empty")
         if self.timeout <= 0:
             raise ValueError("Timeout must be positive")
+        if self.response_format not in ["json", "arrow"]:
+            raise ValueError("response_format must be 'json' or 'arrow'")
+        if self.request_gzip_min_bytes < 0:
+            raise ValueError("request_gzip_min_bytes cannot be negative")
 
 
 @dataclass
@@ -241,7 +251,7 @@ def _load_raw_config(config_path: str) -> Dict[str, Any]:
     
     try:
         with open(config_file, 'r', encoding='utf-8') as f:
-            raw_config = yaml.safe_load(f)
+            raw_config = yaml.load(f, Loader=_YamlLoader)
     except yaml.YAMLError as e:
         raise ConfigError(f"Invalid YAML in {config_path}: {e}")
     except Exception as e:
@@ -278,7 +288,9 @@ def _build_config_from_dict(config_dict: Dict[str, Any]) -> ClientConfig:
             host=greptime_raw.get("host", "http://localhost"),
             port=greptime_raw.get("port", 4000),
             database=greptime_raw.get("database", "liqwid"),
-            timeout=greptime_raw.get("timeout", 10)
+            timeout=greptime_raw.get("timeout", 10),
+            response_format=str(greptime_raw.get("response_format", "json")).strip().lower(),
+            request_gzip_min_bytes=int(greptime_raw.get("request_gzip_min_bytes", 0) or 0)
         )
         
         # Build date range config
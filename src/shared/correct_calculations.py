@@ -595,29 +595,38 @@ def calculate_correct_adjusted_positions(
     # Convert to AdjustedSupplyPosition format for backward compatibility
     adjusted_positions = []
     original_timestamps = set(position_timestamps)
+    # Only include original position timestamps in output (not interpolated ones)
+    keep = [i for i, timestamp in enumerate(timebase) if timestamp in original_timestamps]
+    
+    # Validate the whole batch once, then build rows without per-row checks
+    AdjustedSupplyPosition.validate_arrays(
+        asset_symbol,
+        np.asarray(positions)[keep],
+        np.asarray(deposits_cdf)[keep],
+        -np.asarray(withdrawals_cdf)[keep],
+    )
     
-    for i, timestamp in enumerate(timebase):
-        # Only include original position timestamps in output (not interpolated ones)
-        if timestamp in original_timestamps:
-            # Calculate values for model compatibility
-            cumulative_deposits = deposits_cdf[i]
-            cumulative_withdrawals = withdrawals_cdf[i]
-            true_gain = gains[i]
-            
-            # For model compatibility: Create adjusted_position using old formula
-            # This allows existing code to work while we provide the true gain separately
-            cumulative_investment = cumulative_deposits - cumulative_withdrawals  
-            model_adjusted_position = positions[i] - cumulative_investment
-            
-            adjusted_positions.append(AdjustedSupplyPosition(
-                timestamp=timestamp,
-                asset_symbol=asset_symbol,
-                raw_position=positions[i],
-                adjusted_position=true_gain,  # PUT THE TRUE GAIN IN adjusted_position field
-                cumulative_deposits=cumulative_deposits,
-                cumulative_withdrawals=-cumulative_withdrawals,  # Model expects negative withdrawals
-                net_gain=cumulative_investment  # Store investment for compatibility
-            ))
-            
+    for i in keep:
+        timestamp = timebase[i]
+        # Calculate values for model compatibility
+        cumulative_deposits = deposits_cdf[i]
+        cumulative_withdrawals = withdrawals_cdf[i]
+        true_gain = gains[i]
+        
+        # For model compatibility: Create adjusted_position using old formula
+        # This allows existing code to work while we provide the true gain separately
+        cumulative_investment = cumulative_deposits - cumulative_withdrawals  
+        model_adjusted_position = positions[i] - cumulative_investment
+        
+        adjusted_positions.append(AdjustedSupplyPosition.from_validated(
+            timestamp=timestamp,
+            asset_symbol=asset_symbol,
+            raw_position=positions[i],
+            adjusted_position=true_gain,  # PUT THE TRUE GAIN IN adjusted_position field
+            cumulative_deposits=cumulative_deposits,
+            cumulative_withdrawals=-cumulative_withdrawals,  # Model expects negative withdrawals
+            net_gain=cumulative_investment  # Store investment for compatibility
+        ))
+        
     logger.info(f"Converted {len(timebase)} calculated points to {len(adjusted_positions)} adjusted positions")
     return adjusted_positions
@@ -7,6 +7,7 @@ Handles derivative calculations, smoothing functions, and gains analysis.
 
 import numpy as np
 import logging
+from numpy.lib.stride_tricks import sliding_window_view
 from datetime import datetime, timedelta
 from typing import List, Optional, Tuple
 from scipy import ndimage
@@ -16,6 +17,61 @@ from .models import AggregatedRow, GainsRow
 from .config import AssetSmoothingConfig, SmoothingMethod
 
 
+_ONE_MICROSECOND = timedelta(microseconds=1)
+
+
+def _divide_where_positive(num: np.ndarray, h: np.ndarray, denom: np.ndarray) -> np.ndarray:
+    """num / denom where h > 0, else 0.0 (NaN steps count as non-positive)"""
+    out = np.zeros_like(num)
+    np.divide(num, denom, out=out, where=h > 0)
+    return out
+
+
+def _finite_difference(v: np.ndarray, t: np.ndarray) -> np.ndarray:
+    """
+    Adaptive-order derivative of v over per-point time steps t (both 1-D, len >= 2)
+    
+    Each point uses the widest centered stencil that fits (7, 5, then 3
+    points) and one-sided 2-point differences at the ends; the stencils are
+    evaluated as whole-array slices instead of one Python iteration per point.
+    """
+    n = v.size
+    d = np.zeros(n, dtype=np.float64)
+    
+    # 7-point centered difference on i in [3, n-4]
+    if n >= 7:
+        i = np.arange(3, n - 3)
+        h = sliding_window_view(t, 7).mean(axis=1)
+        dv = (-v[i-3] + 9*v[i-2] - 45*v[i-1] + 45*v[i+1] - 9*v[i+2] + v[i+3]) / 60
+        d[i] = _divide_where_positive(dv, h, h)
+    
+    # 5-point centered difference where exactly two neighbours fit on the short side
+    if n >= 5:
+        i = np.unique([2, n - 3])
+        h = np.array([np.mean(t[k-2:k+3]) for k in i])
+        dv = (-v[i-2] + 8*v[i-1] - 8*v[i+1] + v[i+2]) / 12
+        d[i] = _divide_where_positive(dv, h, h)
+    
+    # 3-point centered difference next to the ends
+    if n >= 3:
+        i = np.unique([1, n - 2])
+        h = t[i]
+        d[i] = _divide_where_positive(v[i+1] - v[i-1], h, 2 * h)
+    
+    # 2-point forward / backward differences at the ends
+    d[:1] = _divide_where_positive(v[1:2] - v[:1], t[:1], t[:1])
+    d[-1:] = _divide_where_positive(v[-1:] - v[-2:-1], t[-1:], t[-1:])
+    return d
+
+
+def _percentage_gain(gains: np.ndarray, ref: np.ndarray) -> np.ndarray:
+    """gains / ref * 100 where ref > 1e-6 (avoids dividing by tiny values), else 0.0"""
+    out = np.zeros_like(gains)
+    mask = ref > 1e-6
+    out[mask] = (gains[mask] / ref[mask]) * 100.0
+    return out
+
+
 class GainsCalculationError(Exception):
     """Gains calculation-related errors"""
     pass
@@ -187,22 +243,16 @@ class GainsCalculator:
         if len(timestamps) < 2:
             return [1.0]  # Default 1 hour for single point
         
-        time_steps = []
-        
-        # First point: use forward difference
-        dt = (timestamps[1] - timestamps[0]).total_seconds() / 3600.0
-        time_steps.append(dt)
-        
-        # Middle points: use centered difference
-        for i in range(1, len(timestamps) - 1):
-            dt = (timestamps[i+1] - timestamps[i-1]).total_seconds() / 7200.0  # /2 for centered diff
-            time_steps.append(dt)
-        
-        # Last point: use backward difference  
-        dt = (timestamps[-1] - timestamps[-2]).total_seconds() / 3600.0
-        time_steps.append(dt)
-        
-        return time_steps
+        # Exact integer microsecond offsets, so steps match timedelta.total_seconds()
+        t0 = timestamps[0]
+        us = np.array([(ts - t0) // _ONE_MICROSECOND for ts in timestamps], dtype=np.int64)
+        time_steps = np.empty(len(timestamps), dtype=np.float64)
+        # First point: forward difference; last point: backward difference
+        time_steps[0] = (us[1] - us[0]) / 1e6 / 3600.0
+        time_steps[-1] = (us[-1] - us[-2]) / 1e6 / 3600.0
+        # Middle points: centered difference (/2)
+        time_steps[1:-1] = (us[2:] - us[:-2]) / 1e6 / 7200.0
+        return time_steps.tolist()
     
     def _calculate_derivatives(self, values: List[float], time_steps: List[float]) -> List[float]:
         """
@@ -218,68 +268,9 @@ class GainsCalculator:
         """
         if len(values) < 2:
             return [0.0]
-        
-        n = len(values)
-        derivatives = []
-        
-        for i in range(n):
-            # Determine how many points we can use around point i
-            left_points = i
-            right_points = n - 1 - i
-            
-            # Choose highest order derivative possible
-            if left_points >= 3 and right_points >= 3:
-                # 7-point centered difference
-                h = np.mean(time_steps[max(0, i-3):min(n, i+4)])
-                if h > 0:
-                    dv = (-values[i-3] + 9*values[i-2] - 45*values[i-1] + 45*values[i+1] - 9*values[i+2] + values[i+3]) / 60
-                    derivative = dv / h
-                else:
-                    derivative = 0.0
-                    
-            elif left_points >= 2 and right_points >= 2:
-                # 5-point centered difference  
-                h = np.mean(time_steps[max(0, i-2):min(n, i+3)])
-                if h > 0:
-                    dv = (-values[i-2] + 8*values[i-1] - 8*values[i+1] + values[i+2]) / 12
-                    derivative = dv / h
-                else:
-                    derivative = 0.0
-                    
-            elif left_points >= 1 and right_points >= 1:
-                # 3-point centered difference
-                h = time_steps[i]
-                if h > 0:
-                    dv = values[i+1] - values[i-1]
-                    derivative = dv / (2 * h)
-                else:
-                    derivative = 0.0
-                    
-            elif right_points >= 1:
-                # 2-point forward difference
-                h = time_steps[i]
-                if h > 0:
-                    dv = values[i+1] - values[i]
-                    derivative = dv / h
-                else:
-                    derivative = 0.0
-                    
-            elif left_points >= 1:
-                # 2-point backward difference
-                h = time_steps[i]
-                if h > 0:
-                    dv = values[i] - values[i-1]
-                    derivative = dv / h
-                else:
-                    derivative = 0.0
-                    
-            else:
-                # Single point - no derivative possible
-                derivative = 0.0
-                
-            derivatives.append(derivative)
-        
-        return derivatives
+        return _finite_difference(
+            np.asarray(values, dtype=np.float64), np.asarray(time_steps, dtype=np.float64)
+        ).tolist()
     
     def _calculate_percentage_derivatives(self, values: List[float], absolute_gains: List[float]) -> List[float]:
         """
@@ -292,16 +283,9 @@ class GainsCalculator:
         Returns:
             List of percentage gains (% per hour)
         """
-        percentage_gains = []
-        
-        for value, abs_gain in zip(values, absolute_gains):
-            if value > 1e-6:  # Avoid division by very small numbers
-                pct_gain = (abs_gain / value) * 100.0
-            else:
-                pct_gain = 0.0
-            percentage_gains.append(pct_gain)
-        
-        return percentage_gains
+        return _percentage_gain(
+            np.asarray(absolute_gains, dtype=np.float64), np.asarray(values, dtype=np.float64)
+        ).tolist()
     
     def _apply_smoothing_by_method(
         self,
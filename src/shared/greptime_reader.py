@@ -5,27 +5,95 @@ GreptimeDB Reader for Liqwid Client Aggregator
 Handles database queries, response parsing, and time series data extraction.
 """
 
-import json
+import asyncio
+import hashlib
 import logging
+import re
+import sys
+import threading
+import time
+from functools import lru_cache
+import numpy as np
 import requests
+from array import array
+from collections import OrderedDict
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import Dict, List, Optional, Any, Tuple
-from urllib.parse import urljoin, urlparse
+from typing import Dict, Iterable, Iterator, List, Optional, Any, Tuple
+from urllib.parse import urlencode, urljoin, urlparse
 
 from .config import GreptimeConnConfig, DateRange
 from .models import AssetTimeSeries, Transaction
 from .utils import (
     timestamp_to_datetime,
+    timestamps_to_datetimes,
     datetime_to_timestamp,
     build_date_range_filter,
     validate_table_name,
+    validate_wallet_address,
     retry_with_backoff,
     safe_float,
     normalize_asset_symbol,
+    decode_json_bytes,
     ProgressTracker
 )
 
 
+# Success marker for DESCRIBE probes: a non-empty "output" array
+_NON_EMPTY_OUTPUT_RE = re.compile(rb'"output"\s*:\s*\[\s*\{')
+
+
+@lru_cache(maxsize=64)
+def _build_index_map(column_names: Tuple[str, ...], expected_columns: Tuple[str, ...]) -> Tuple[int, ...]:
+    """
+    Map expected column names to their response positions (-1 when absent)
+    
+    Response schemas for a given query shape are stable, so the mapping is
+    memoized on the (response columns, expected columns) pair.
+    """
+    column_map: Dict[str, int] = {}
+    for i, name in enumerate(column_names):
+        column_map[name] = i
+    return tuple(column_map.get(name, -1) for name in expected_columns)
+
+
+def _schema_column_names(query_records: Dict[str, Any]) -> Tuple[str, ...]:
+    """Extract the response column names as a hashable tuple"""
+    column_schemas = query_records.get('schema', {}).get('column_schemas', [])
+    return tuple(col.get('name', f'col_{i}') for i, col in enumerate(column_schemas))
+
+
+def _group_wallet_rows(wallets: Tuple[str, ...]) -> Iterator[Tuple[str, Any]]:
+    """
+    Group row positions by wallet address
+    
+    Rows normally arrive ORDER BY wallet_address, so each wallet is a single
+    contiguous run and is yielded as a slice. Wallet codes are stably sorted
+    first, so out-of-order groups are merged while preserving row order.
+    
+    Args:
+        wallets: Wallet address per row
+        
+    Yields:
+        (wallet_address, index) pairs, where index is a slice or index array
+    """
+    codes: Dict[str, int] = {}
+    wid = np.fromiter((codes.setdefault(w, len(codes)) for w in wallets), dtype=np.int32, count=len(wallets))
+    names = [sys.intern(w) for w in codes]
+    order = None
+    if wid.size > 1 and np.any(wid[1:] < wid[:-1]):
+        order = np.argsort(wid, kind="stable")
+        wid = wid[order]
+    bounds = np.flatnonzero(wid[1:] != wid[:-1]) + 1
+    starts = np.concatenate(([0], bounds)).tolist()
+    ends = np.concatenate((bounds, [wid.size])).tolist()
+    for start, end in zip(starts, ends):
+        idx = slice(start, end) if order is None else order[start:end]
+        yield names[wid[start]], idx
+
+
 class GreptimeError(Exception):
     """Base exception for GreptimeDB operations"""
     pass
@@ -79,21 +147,73 @@ class GreptimeReader:
         self.base_url = f"{scheme}://{netloc}"
         self.sql_endpoint = f"{self.base_url}/v1/sql"
         
-        # Session for connection pooling
+        # Session for connection pooling; pool sized for concurrent fan-out
+        # (fetch_all_assets) with transport-level retries on gateway errors
         self.session = requests.Session()
         self.session.headers.update({
             'Content-Type': 'application/x-www-form-urlencoded',
-            'User-Agent': 'LiqwidClientAggregator/1.0'
+            'User-Agent': 'LiqwidClientAggregator/1.0',
+            'Connection': 'keep-alive',
+            'Accept-Encoding': 'gzip, deflate'
         })
+        adapter = HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=32,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.5,
+                status_forcelist=[502, 503, 504],
+                allowed_methods=['POST'],
+                raise_on_status=False
+            )
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        
+        # Optional Arrow IPC responses (numeric columns without JSON tokenizing)
+        self._use_arrow = getattr(config, 'response_format', 'json') == 'arrow'
+        if self._use_arrow:
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError:
+                self.logger.warning("pyarrow not available, falling back to JSON responses")
+                self._use_arrow = False
         
-        self.logger.info(f"Initialized GreptimeDB reader: {self.base_url}")
+        # Per-instance memo of asset symbol -> table name (prefix is fixed)
+        self._table_name_cache: Dict[str, str] = {}
+        
+        # Table-name cache populated from a single SHOW TABLES (see _table_exists)
+        self._tables_cache: Optional[frozenset] = None
+        self._tables_cache_at = 0.0
+        self._tables_cache_ttl = 60.0
+        self._tables_lock = threading.Lock()
+        self._show_tables_cache: Optional[Tuple[float, List[str]]] = None
+        self._show_tables_lock = threading.Lock()
+        
+        # Short-lived LRU of parsed query results keyed by (db, SQL digest)
+        self._query_cache: "OrderedDict[Tuple[str, bytes], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._query_cache_maxsize = 128
+        self._query_cache_ttl = 30.0
+        # Larger results (full histories, per-wallet rows) are never cached
+        self._query_cache_max_rows = 5000
+        self._query_cache_lock = threading.Lock()
+        
+        # Tables per UNION ALL statement in discover_wallet_addresses
+        self._wallet_discovery_batch_size = 32
+        
+        self.logger.info("Initialized GreptimeDB reader: %s", self.base_url)
     
-    def _execute_sql(self, sql: str) -> Dict[str, Any]:
+    def _execute_sql(self, sql: str, bypass_cache: bool = False) -> Dict[str, Any]:
         """
         Execute SQL query against GreptimeDB
         
+        Identical queries issued within the cache TTL are served from an
+        in-process cache instead of a new HTTP round-trip. Cached results are
+        shared between callers and must be treated as read-only.
+        
         Args:
             sql: SQL query string
+            bypass_cache: Always query the server (result still refreshes the cache)
             
         Returns:
             Response data from GreptimeDB
@@ -102,18 +222,17 @@ class GreptimeReader:
             GreptimeConnectionError: Connection issues
             GreptimeQueryError: Query execution issues
         """
+        # Form-encode once; retries reuse the same bytes payload
+        body = self._encode_body(sql)
+        
         def _do_request():
-            self.logger.debug(f"Executing SQL: {sql[:100]}...")
-            
-            # Prepare request data
-            data = {'sql': sql}
-            if self.config.database:
-                data['db'] = self.config.database
+            self.logger.debug("Executing SQL: %s...", sql[:100])
             
             # Execute request
             response = self.session.post(
                 self.sql_endpoint,
-                data=data,
+                params={'format': 'arrow'} if self._use_arrow else None,
+                data=body,
                 timeout=self.config.timeout
             )
             
@@ -121,30 +240,145 @@ class GreptimeReader:
             if response.status_code != 200:
                 raise GreptimeQueryError(f"HTTP {response.status_code}: {response.text}")
             
+            # Arrow IPC when requested and honored; errors still come back as JSON
+            if self._use_arrow and 'json' not in response.headers.get('Content-Type', ''):
+                try:
+                    return self._arrow_to_result(response.content)
+                except Exception as e:
+                    if response.content.lstrip()[:1] != b'{':
+                        # Undecodable binary body: retrying or JSON-decoding it cannot
+                        # succeed, so switch this reader to JSON and re-issue once
+                        self.logger.warning("Arrow decode failed, switching to JSON responses: %s", e)
+                        self._use_arrow = False
+                        return _do_request()
+            
             # Parse JSON response
             try:
-                result = response.json()
-                self.logger.debug(f"SQL execution successful")
+                result = decode_json_bytes(response.content)
+                self.logger.debug("SQL execution successful")
                 return result
-            except json.JSONDecodeError as e:
+            except ValueError as e:
                 raise GreptimeQueryError(f"Invalid JSON response: {e}")
         
+        cache_key = (self.config.database or "", hashlib.blake2b(sql.encode('utf-8'), digest_size=16).digest())
+        if not bypass_cache:
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                self.logger.debug("Query cache hit: %s...", sql[:100])
+                return cached
+        
         # Execute with retry logic
         try:
             result = retry_with_backoff(
                 _do_request,
                 max_attempts=3,
                 base_delay=1.0,
-                exceptions=(requests.exceptions.RequestException, GreptimeQueryError)
+                exceptions=(requests.exceptions.RequestException, GreptimeQueryError),
+                jitter=0.5
             )
             if not isinstance(result, dict):
                 raise GreptimeQueryError("Invalid response format")
+            if result.get('code', 0) == 0:
+                self._cache_put(cache_key, result)
             return result
         except requests.exceptions.ConnectionError as e:
             raise GreptimeConnectionError(f"Failed to connect to GreptimeDB: {e}")
         except requests.exceptions.Timeout as e:
             raise GreptimeConnectionError(f"Request timeout: {e}")
     
+    def _encode_body(self, sql: str) -> bytes:
+        """
+        Form-encode the /v1/sql payload into bytes
+        
+        Passing bytes lets requests send the body as-is (with Content-Length)
+        instead of re-encoding a dict on every POST.
+        """
+        data = {'sql': sql}
+        if self.config.database:
+            data['db'] = self.config.database
+        return urlencode(data).encode('ascii')
+    
+    def _cache_get(self, key: Tuple[str, bytes]) -> Optional[Dict[str, Any]]:
+        """Return a cached query result if present and not expired"""
+        with self._query_cache_lock:
+            entry = self._query_cache.get(key)
+            if entry is None:
+                return None
+            stored_at, result = entry
+            if time.monotonic() - stored_at >= self._query_cache_ttl:
+                del self._query_cache[key]
+                return None
+            self._query_cache.move_to_end(key)
+            return result
+    
+    def _cache_put(self, key: Tuple[str, bytes], result: Dict[str, Any]) -> None:
+        """
+        Store a query result, evicting the least recently used entry when full
+        
+        Expired entries are purged on every store so a reader that is idle
+        past the TTL between cycles does not hold on to stale results; results
+        above the row cap are not cached at all.
+        """
+        n_rows = 0
+        for output_block in result.get('output') or []:
+            records = output_block.get('records') if isinstance(output_block, dict) else None
+            if isinstance(records, dict):
+                n_rows += len(records.get('rows') or ())
+        with self._query_cache_lock:
+            now = time.monotonic()
+            expired = [k for k, (stored_at, _) in self._query_cache.items() if now - stored_at >= self._query_cache_ttl]
+            for k in expired:
+                del self._query_cache[k]
+            if n_rows > self._query_cache_max_rows:
+                self._query_cache.pop(key, None)
+                return
+            self._query_cache[key] = (now, result)
+            self._query_cache.move_to_end(key)
+            while len(self._query_cache) > self._query_cache_maxsize:
+                self._query_cache.popitem(last=False)
+    
+    def clear_query_cache(self) -> None:
+        """Drop all cached query results"""
+        with self._query_cache_lock:
+            self._query_cache.clear()
+    
+    @staticmethod
+    def _arrow_to_result(content: bytes) -> Dict[str, Any]:
+        """
+        Convert an Arrow IPC body (file or stream format) into the JSON response shape
+        
+        Timestamp columns are cast to epoch milliseconds so downstream parsing
+        is identical to the JSON path.
+        
+        Args:
+            content: Raw Arrow IPC bytes; the file format is detected by its ARROW1 magic
+            
+        Returns:
+            Response dict compatible with _parse_query_response
+        """
+        import pyarrow as pa
+        
+        source = pa.BufferReader(content)
+        if content[:6] == b'ARROW1':
+            table = pa.ipc.open_file(source).read_all()
+        else:
+            table = pa.ipc.open_stream(source).read_all()
+        columns = []
+        for col in table.columns:
+            if pa.types.is_timestamp(col.type):
+                col = col.cast(pa.timestamp('ms', tz=col.type.tz), safe=False).cast(pa.int64())
+            columns.append(col.to_pylist())
+        rows = [list(row) for row in zip(*columns)]
+        return {
+            'code': 0,
+            'output': [{
+                'records': {
+                    'schema': {'column_schemas': [{'name': name} for name in table.column_names]},
+                    'rows': rows
+                }
+            }]
+        }
+    
     def test_connection(self) -> bool:
         """
         Test connection to GreptimeDB
@@ -153,11 +387,11 @@ class GreptimeReader:
             True if connection successful, False otherwise
         """
         try:
-            result = self._execute_sql("SELECT 1 as test")
+            result = self._execute_sql("SELECT 1 as test", bypass_cache=True)
             # GreptimeDB returns either {'code': 0} or {'output': [...]} on success
             return 'output' in result or result.get('code') == 0
         except Exception as e:
-            self.logger.error(f"Connection test failed: {e}")
+            self.logger.error("Connection test failed: %s", e)
             return False
     
     def _get_table_name(self, asset_symbol: str) -> str:
@@ -170,8 +404,11 @@ class GreptimeReader:
         Returns:
             Full table name (lowercase for GreptimeDB compatibility)
         """
-        normalized_symbol = normalize_asset_symbol(asset_symbol)
-        return f"{self.table_prefix}{normalized_symbol}"
+        table_name = self._table_name_cache.get(asset_symbol)
+        if table_name is None:
+            table_name = f"{self.table_prefix}{normalize_asset_symbol(asset_symbol)}"
+            self._table_name_cache[asset_symbol] = table_name
+        return table_name
     
     def _parse_query_response(self, result: Dict[str, Any], expected_columns: List[str]) -> List[Dict[str, Any]]:
         """
@@ -198,6 +435,7 @@ class GreptimeReader:
                 return []
             
             records = []
+            expected = tuple(expected_columns)
             
             for output_block in result['output']:
                 if 'records' not in output_block:
@@ -207,38 +445,156 @@ class GreptimeReader:
                 if not query_records:
                     continue
                 
-                # Get schema (field names)
-                schema = query_records.get('schema', {})
-                column_schemas = schema.get('column_schemas', [])
-                
-                # Map column names to indices
-                column_map = {}
-                for i, col_schema in enumerate(column_schemas):
-                    column_name = col_schema.get('name', f'col_{i}')
-                    column_map[column_name] = i
+                # Resolve expected columns to response positions (cached per schema)
+                indices = _build_index_map(_schema_column_names(query_records), expected)
                 
                 # Process rows
                 rows = query_records.get('rows', [])
                 for row in rows:
-                    record = {}
-                    for col_name in expected_columns:
-                        col_index = column_map.get(col_name)
-                        if col_index is not None and col_index < len(row):
-                            record[col_name] = row[col_index]
-                        else:
-                            record[col_name] = None
-                    records.append(record)
-            
-            self.logger.debug(f"Parsed {len(records)} records from response")
+                    n = len(row)
+                    records.append(dict(zip(expected, [row[i] if 0 <= i < n else None for i in indices])))
+            
+            self.logger.debug("Parsed %s records from response", len(records))
             return records
             
         except Exception as e:
             raise GreptimeQueryError(f"Failed to parse query response: {e}")
     
+    def _iter_rows(self, result: Dict[str, Any], expected_columns: List[str]) -> Iterator[Tuple[Any, ...]]:
+        """
+        Yield response rows as tuples ordered like expected_columns
+        
+        Streaming counterpart of _parse_query_response for large results: no
+        per-row dicts or intermediate record list are built.
+        
+        Raises:
+            GreptimeQueryError: If the response reports an error
+        """
+        if 'code' in result and result['code'] != 0:
+            raise GreptimeQueryError(f"Query failed: {result}")
+        
+        expected = tuple(expected_columns)
+        for output_block in result.get('output') or []:
+            query_records = output_block.get('records')
+            if not query_records:
+                continue
+            indices = _build_index_map(_schema_column_names(query_records), expected)
+            for row in query_records.get('rows', []):
+                n = len(row)
+                yield tuple(row[i] if 0 <= i < n else None for i in indices)
+    
+    def _iter_column(self, result: Dict[str, Any], column: str) -> Iterator[Any]:
+        """
+        Yield the values of a single response column
+        
+        Single-column variant of _iter_rows that skips the per-row tuple.
+        
+        Raises:
+            GreptimeQueryError: If the response reports an error
+        """
+        if 'code' in result and result['code'] != 0:
+            raise GreptimeQueryError(f"Query failed: {result}")
+        
+        for output_block in result.get('output') or []:
+            query_records = output_block.get('records')
+            if not query_records:
+                continue
+            i = _build_index_map(_schema_column_names(query_records), (column,))[0]
+            if i < 0:
+                continue
+            for row in query_records.get('rows', []):
+                if i < len(row):
+                    yield row[i]
+    
+    @staticmethod
+    def _rows_to_series(rows: Iterable[Tuple[Any, Any]], asset_symbol: str) -> AssetTimeSeries:
+        """
+        Pack (ts, value) rows into an array-backed AssetTimeSeries
+        
+        Rows with a null timestamp or value are skipped. Values are appended to
+        typed buffers and wrapped as NumPy arrays without per-point boxing.
+        """
+        ts_buf = array('q')
+        val_buf = array('d')
+        for timestamp_ms, value in rows:
+            if timestamp_ms is not None and value is not None:
+                ts_buf.append(int(timestamp_ms))
+                val_buf.append(safe_float(value))
+        return AssetTimeSeries.from_arrays(
+            asset_symbol,
+            np.frombuffer(ts_buf, dtype=np.int64),
+            np.frombuffer(val_buf, dtype=np.float64)
+        )
+    
+    def _ensure_tables_cache(self) -> Optional[frozenset]:
+        """
+        Return the cached set of lowercase table names, refreshing it via
+        SHOW TABLES when missing or older than the cache TTL.
+        
+        Returns:
+            Frozenset of table names, or None if the listing is unavailable
+        """
+        with self._tables_lock:
+            now = time.monotonic()
+            if self._tables_cache is not None and now - self._tables_cache_at < self._tables_cache_ttl:
+                return self._tables_cache
+            try:
+                names = self._show_tables()
+            except Exception as e:
+                self.logger.debug("SHOW TABLES failed, falling back to DESCRIBE probes: %s", e)
+                return None
+            if names is None:
+                self.logger.debug("SHOW TABLES returned an error, falling back to DESCRIBE probes")
+                return None
+            self._tables_cache = frozenset(str(t).split(".")[-1].lower() for t in names if t)
+            self._tables_cache_at = now
+            return self._tables_cache
+    
+    def invalidate_tables_cache(self) -> None:
+        """Drop the cached table list so the next lookup re-reads SHOW TABLES"""
+        with self._tables_lock:
+            self._tables_cache = None
+            self._tables_cache_at = 0.0
+        with self._show_tables_lock:
+            self._show_tables_cache = None
+    
     def _table_exists(self, table_name: str) -> bool:
         """
         Check if a table exists
         
+        Args:
+            table_name: Table name to check
+            
+        Returns:
+            True if table exists
+        """
+        tables = self._ensure_tables_cache()
+        if tables is not None:
+            return table_name.lower() in tables
+        return self._describe_table_exists(table_name)
+    
+    def _filter_existing_tables(self, table_names: List[str]) -> List[str]:
+        """
+        Keep the tables that exist, checked against one catalog snapshot
+        
+        Uses the cached SHOW TABLES listing once for the whole list rather than
+        a lookup per table; falls back to per-table probes if it is unavailable.
+        
+        Args:
+            table_names: Candidate table names
+            
+        Returns:
+            Existing table names, in input order
+        """
+        tables = self._ensure_tables_cache()
+        if tables is None:
+            return [t for t in table_names if self._describe_table_exists(t)]
+        return [t for t in table_names if t.lower() in tables]
+    
+    def _describe_table_exists(self, table_name: str) -> bool:
+        """
+        Check if a table exists with a direct DESCRIBE TABLE probe
+        
         Args:
             table_name: Table name to check
             
@@ -246,33 +602,24 @@ class GreptimeReader:
             True if table exists
         """
         # Use a direct request (no backoff) so missing tables return quickly
-        sql = f"DESCRIBE TABLE {table_name}"
-        data = {'sql': sql}
-        if self.config.database:
-            data['db'] = self.config.database
+        body = self._encode_body(f"DESCRIBE TABLE {table_name}")
         try:
-            resp = self.session.post(self.sql_endpoint, data=data, timeout=self.config.timeout)
+            resp = self.session.post(self.sql_endpoint, data=body, timeout=self.config.timeout)
         except requests.exceptions.RequestException as e:
-            self.logger.debug(f"_table_exists request error for {table_name}: {e}")
+            self.logger.debug("_table_exists request error for %s: %s", table_name, e)
             return False
 
+        # Existence probes only need a marker, not a full JSON parse
+        content = resp.content or b""
         if resp.status_code == 200:
-            try:
-                result = resp.json()
-            except json.JSONDecodeError:
-                return False
-            return bool(result.get('output'))
+            return _NON_EMPTY_OUTPUT_RE.search(content) is not None
 
-        # Non-200: check if it's a standard 'table not found' error
-        try:
-            payload = resp.json()
-            msg = str(payload)
-        except Exception:
-            msg = resp.text or ""
-        if 'Table not found' in msg:
-            return False
-        # For other errors, be conservative and return False, but log
-        self.logger.debug(f"_table_exists unexpected response {resp.status_code} for {table_name}: {msg}")
+        # Non-200: a standard 'table not found' error is expected; log anything else
+        if b'Table not found' not in content:
+            self.logger.debug(
+                "_table_exists unexpected response %s for %s: %s",
+                resp.status_code, table_name, content[:256].decode('utf-8', 'replace')
+            )
         return False
     
     def fetch_asset_series(
@@ -301,10 +648,10 @@ class GreptimeReader:
         
         # Check if table exists
         if not self._table_exists(table_name):
-            self.logger.warning(f"Table not found for asset={asset_symbol}, skipping")
+            self.logger.warning("Table not found for asset=%s, skipping", asset_symbol)
             return None
         
-        self.logger.info(f"Fetching series for asset={asset_symbol.upper()}")
+        self.logger.info("Fetching series for asset=%s", asset_symbol.upper())
         
         try:
             # Build date range filter
@@ -325,24 +672,14 @@ class GreptimeReader:
             result = self._execute_sql(sql)
             
             # Parse results
-            records = self._parse_query_response(result, ['ts', 'usd_value_sum'])
+            rows = self._iter_rows(result, ['ts', 'usd_value_sum'])
             
-            # Convert to time series
-            series_data = {}
-            for record in records:
-                timestamp_ms = record.get('ts')
-                usd_value = record.get('usd_value_sum')
-                
-                if timestamp_ms is not None and usd_value is not None:
-                    dt = timestamp_to_datetime(int(timestamp_ms))
-                    series_data[dt] = safe_float(usd_value)
+            # Convert to array-backed time series
+            series = self._rows_to_series(rows, asset_symbol.upper())
             
-            self.logger.info(f"Retrieved {len(series_data)} data points for {asset_symbol.upper()}")
+            self.logger.info("Retrieved %s data points for %s", len(series.series), asset_symbol.upper())
             
-            return AssetTimeSeries(
-                asset_symbol=asset_symbol.upper(),
-                series=series_data
-            )
+            return series
             
         except Exception as e:
             error_msg = f"Failed to fetch series for {asset_symbol}: {e}"
@@ -360,12 +697,11 @@ class GreptimeReader:
         Returns AssetTimeSeries with series mapping ts -> total_units (float).
         """
         table_name = self._get_table_name(asset_symbol)
-        from .utils import validate_table_name, build_date_range_filter, timestamp_to_datetime, safe_float
         # Validate and existence
         if not validate_table_name(table_name, self.table_prefix):
             raise GreptimeQueryError(f"Invalid table name: {table_name}")
         if not self._table_exists(table_name):
-            self.logger.warning(f"Table not found for asset={asset_symbol}, skipping units fetch")
+            self.logger.warning("Table not found for asset=%s, skipping units fetch", asset_symbol)
             return None
         try:
             date_filter = ""
@@ -379,16 +715,8 @@ class GreptimeReader:
             ORDER BY ts ASC
             """
             result = self._execute_sql(sql)
-            records = self._parse_query_response(result, ['ts', 'units_sum'])
-            series_data = {}
-            for record in records:
-                ts_ms = record.get('ts')
-                units = record.get('units_sum')
-                if ts_ms is None or units is None:
-                    continue
-                dt = timestamp_to_datetime(int(ts_ms))
-                series_data[dt] = safe_float(units)
-            return AssetTimeSeries(asset_symbol=asset_symbol.upper(), series=series_data)
+            rows = self._iter_rows(result, ['ts', 'units_sum'])
+            return self._rows_to_series(rows, asset_symbol.upper())
         except Exception as e:
             error_msg = f"Failed to fetch units series for {asset_symbol}: {e}"
             self.logger.error(error_msg)
@@ -411,7 +739,7 @@ class GreptimeReader:
         if not validate_table_name(table_name, self.table_prefix):
             raise GreptimeQueryError(f"Invalid table name: {table_name}")
         if not self._table_exists(table_name):
-            self.logger.warning(f"Table not found for asset={asset_symbol}, skipping price fetch")
+            self.logger.warning("Table not found for asset=%s, skipping price fetch", asset_symbol)
             return None
         try:
             date_filter = ""
@@ -424,16 +752,8 @@ class GreptimeReader:
             ORDER BY ts ASC
             """
             result = self._execute_sql(sql)
-            records = self._parse_query_response(result, ['ts', 'price_usd'])
-            series_data = {}
-            for record in records:
-                ts_ms = record.get('ts')
-                price = record.get('price_usd')
-                if ts_ms is None or price is None:
-                    continue
-                dt = timestamp_to_datetime(int(ts_ms))
-                series_data[dt] = safe_float(price)
-            return AssetTimeSeries(asset_symbol=asset_symbol.upper(), series=series_data)
+            rows = self._iter_rows(result, ['ts', 'price_usd'])
+            return self._rows_to_series(rows, asset_symbol.upper())
         except Exception as e:
             error_msg = f"Failed to fetch price series for {asset_symbol}: {e}"
             self.logger.error(error_msg)
@@ -454,7 +774,7 @@ class GreptimeReader:
         if not validate_table_name(table_name, self.table_prefix):
             raise GreptimeQueryError(f"Invalid table name: {table_name}")
         if not self._table_exists(table_name):
-            self.logger.warning(f"Table not found for asset={asset_symbol}, skipping dual price fetch")
+            self.logger.warning("Table not found for asset=%s, skipping dual price fetch", asset_symbol)
             return None
         try:
             date_filter = ""
@@ -467,23 +787,10 @@ class GreptimeReader:
             ORDER BY ts ASC
             """
             result = self._execute_sql(sql)
-            records = self._parse_query_response(result, ['ts', 'price_usd', 'ada_usd'])
-            series_usd = {}
-            series_ada = {}
-            for record in records:
-                ts_ms = record.get('ts')
-                p_usd = record.get('price_usd')
-                a_usd = record.get('ada_usd')
-                if ts_ms is None:
-                    continue
-                dt = timestamp_to_datetime(int(ts_ms))
-                if p_usd is not None:
-                    series_usd[dt] = safe_float(p_usd)
-                if a_usd is not None:
-                    series_ada[dt] = safe_float(a_usd)
+            rows = list(self._iter_rows(result, ['ts', 'price_usd', 'ada_usd']))
             return (
-                AssetTimeSeries(asset_symbol=asset_symbol.upper(), series=series_usd),
-                AssetTimeSeries(asset_symbol=asset_symbol.upper(), series=series_ada),
+                self._rows_to_series(((ts, usd) for ts, usd, _ in rows), asset_symbol.upper()),
+                self._rows_to_series(((ts, ada) for ts, _, ada in rows), asset_symbol.upper()),
             )
         except Exception as e:
             error_msg = f"Failed to fetch dual price series for {asset_symbol}: {e}"
@@ -507,15 +814,11 @@ class GreptimeReader:
             ORDER BY ts DESC
             LIMIT 1
             """
-            result = self._execute_sql(sql)
-            records = self._parse_query_response(result, ['price_usd'])
-            if not records:
-                return None
-            val = records[0].get('price_usd')
-            from .utils import safe_float
+            result = self._execute_sql(sql, bypass_cache=True)
+            val = next(self._iter_column(result, 'price_usd'), None)
             return safe_float(val) if val is not None else None
         except Exception as e:
-            self.logger.debug(f"fetch_latest_price_usd failed for {asset_symbol}: {e}")
+            self.logger.debug("fetch_latest_price_usd failed for %s: %s", asset_symbol, e)
             return None
 
     
@@ -550,10 +853,10 @@ class GreptimeReader:
         
         # Check if table exists
         if not self._table_exists(table_name):
-            self.logger.warning(f"Table not found for asset={asset_symbol}, skipping")
+            self.logger.warning("Table not found for asset=%s, skipping", asset_symbol)
             return {}
         
-        self.logger.info(f"Fetching per-wallet series for asset={asset_symbol.upper()}")
+        self.logger.info("Fetching per-wallet series for asset=%s", asset_symbol.upper())
         
         try:
             # Build date range filter
@@ -573,39 +876,26 @@ class GreptimeReader:
             # Execute query
             result = self._execute_sql(sql)
             
-            # Parse results
-            records = self._parse_query_response(result, ['ts', 'wallet_address', 'usd_value_sum'])
-            
-            # Group by wallet address
-            wallet_series = {}
-            for record in records:
-                timestamp_ms = record.get('ts')
-                wallet_addr = record.get('wallet_address')
-                usd_value = record.get('usd_value_sum')
-                
-                if timestamp_ms is not None and wallet_addr and usd_value is not None:
-                    dt = timestamp_to_datetime(int(timestamp_ms))
-                    
-                    # Initialize wallet series if first time seeing this wallet
-                    if wallet_addr not in wallet_series:
-                        wallet_series[wallet_addr] = {}
-                    
-                    wallet_series[wallet_addr][dt] = safe_float(usd_value)
-            
-            # Convert to AssetTimeSeries objects
-            result_dict = {}
-            for wallet_addr, series_data in wallet_series.items():
-                result_dict[wallet_addr] = AssetTimeSeries(
-                    asset_symbol=asset_symbol.upper(),
-                    series=series_data
-                )
+            # Collect valid rows into parallel arrays, then slice per wallet
+            rows = [
+                row for row in self._iter_rows(result, ['ts', 'wallet_address', 'usd_value_sum'])
+                if row[0] is not None and row[1] and row[2] is not None
+            ]
+            result_dict: Dict[str, AssetTimeSeries] = {}
+            if rows:
+                ts_col, wallet_col, value_col = zip(*rows)
+                ts_arr = np.fromiter(ts_col, dtype=np.int64, count=len(rows))
+                val_arr = np.fromiter(map(safe_float, value_col), dtype=np.float64, count=len(rows))
+                display_symbol = asset_symbol.upper()
+                for wallet, idx in _group_wallet_rows(wallet_col):
+                    result_dict[wallet] = AssetTimeSeries.from_arrays(display_symbol, ts_arr[idx], val_arr[idx])
             
-            num_wallets = len(result_dict)
-            total_points = sum(len(ts.series) for ts in result_dict.values())
-            self.logger.info(
-                f"Retrieved {total_points} data points across {num_wallets} wallets "
-                f"for {asset_symbol.upper()}"
-            )
+            if self.logger.isEnabledFor(logging.INFO):
+                total_points = sum(len(ts.series) for ts in result_dict.values())
+                self.logger.info(
+                    "Retrieved %s data points across %s wallets for %s",
+                    total_points, len(result_dict), asset_symbol.upper()
+                )
             
             return result_dict
             
@@ -617,14 +907,19 @@ class GreptimeReader:
     def fetch_all_assets(
         self,
         asset_symbols: List[str],
-        date_range: Optional[DateRange] = None
+        date_range: Optional[DateRange] = None,
+        max_workers: int = 8
     ) -> Dict[str, AssetTimeSeries]:
         """
         Fetch time series data for multiple assets
         
+        Queries are I/O bound, so they are dispatched concurrently over the
+        shared session; results are returned in the order of asset_symbols.
+        
         Args:
             asset_symbols: List of asset symbols to fetch
             date_range: Optional date range filter
+            max_workers: Maximum number of concurrent queries
             
         Returns:
             Dictionary mapping asset symbols to their time series
@@ -632,41 +927,169 @@ class GreptimeReader:
         Raises:
             GreptimeError: If critical error occurs
         """
-        self.logger.info(f"Fetching data for {len(asset_symbols)} assets")
+        self.logger.info("Fetching data for %s assets", len(asset_symbols))
         
-        results = {}
+        fetched: Dict[str, AssetTimeSeries] = {}
         progress = ProgressTracker(len(asset_symbols), "Fetching asset data")
         
-        for asset_symbol in asset_symbols:
-            try:
-                series = self.fetch_asset_series(asset_symbol, date_range)
-                if series:
-                    results[series.asset_symbol] = series
-                progress.update()
-                
-            except GreptimeError as e:
-                self.logger.error(f"Failed to fetch {asset_symbol}: {e}")
+        workers = max(1, min(max_workers, len(asset_symbols)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(self.fetch_asset_series, asset_symbol, date_range): asset_symbol
+                for asset_symbol in asset_symbols
+            }
+            for future in as_completed(futures):
+                asset_symbol = futures[future]
+                try:
+                    series = future.result()
+                    if series:
+                        fetched[asset_symbol] = series
+                except GreptimeError as e:
+                    # Continue with other assets
+                    self.logger.error("Failed to fetch %s: %s", asset_symbol, e)
                 progress.update()
-                # Continue with other assets
-                continue
         
         progress.finish()
         
+        # Preserve the caller's ordering regardless of completion order
+        results = {}
+        for asset_symbol in asset_symbols:
+            series = fetched.get(asset_symbol)
+            if series:
+                results[series.asset_symbol] = series
+        
         if not results:
             self.logger.warning("No asset data retrieved")
         else:
-            self.logger.info(f"Successfully retrieved data for {len(results)} assets")
+            self.logger.info("Successfully retrieved data for %s assets", len(results))
         
         return results
 
+    async def fetch_all_assets_async(
+        self,
+        asset_symbols: List[str],
+        date_range: Optional[DateRange] = None,
+        max_concurrency: int = 16
+    ) -> Dict[str, AssetTimeSeries]:
+        """
+        Awaitable variant of fetch_all_assets for callers running an event loop
+        
+        Each asset query runs on the pooled session in a worker thread, with at
+        most max_concurrency in flight. Results follow the order of asset_symbols.
+        
+        Args:
+            asset_symbols: List of asset symbols to fetch
+            date_range: Optional date range filter
+            max_concurrency: Maximum number of concurrent queries
+            
+        Returns:
+            Dictionary mapping asset symbols to their time series
+        """
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        
+        async def _fetch_one(asset_symbol: str) -> Optional[AssetTimeSeries]:
+            async with semaphore:
+                try:
+                    return await asyncio.to_thread(self.fetch_asset_series, asset_symbol, date_range)
+                except GreptimeError as e:
+                    # Continue with other assets
+                    self.logger.error("Failed to fetch %s: %s", asset_symbol, e)
+                    return None
+        
+        fetched = await asyncio.gather(*(_fetch_one(asset_symbol) for asset_symbol in asset_symbols))
+        
+        results = {}
+        for series in fetched:
+            if series:
+                results[series.asset_symbol] = series
+        
+        if not results:
+            self.logger.warning("No asset data retrieved")
+        else:
+            self.logger.info("Successfully retrieved data for %s assets", len(results))
+        
+        return results
+
+    def fetch_all_assets_batched(
+        self,
+        asset_symbols: List[str],
+        date_range: Optional[DateRange] = None
+    ) -> Dict[str, AssetTimeSeries]:
+        """
+        Fetch time series data for multiple assets in a single round-trip
+
+        Missing tables are filtered out via the cached table list, then the
+        per-asset aggregations are combined into one UNION ALL query tagged
+        with a constant symbol column.
+
+        Args:
+            asset_symbols: List of asset symbols to fetch
+            date_range: Optional date range filter
+
+        Returns:
+            Dictionary mapping asset symbols to their time series
+
+        Raises:
+            GreptimeError: If the batched query fails
+        """
+        # Map normalized symbol -> display symbol, keeping caller order
+        selected: Dict[str, str] = {}
+        for asset_symbol in asset_symbols:
+            symbol = normalize_asset_symbol(asset_symbol)
+            table_name = self._get_table_name(asset_symbol)
+            if not validate_table_name(table_name, self.table_prefix):
+                raise GreptimeQueryError(f"Invalid table name: {table_name}")
+            if not self._table_exists(table_name):
+                self.logger.warning("Table not found for asset=%s, skipping", asset_symbol)
+                continue
+            selected.setdefault(symbol, asset_symbol.upper())
+
+        if not selected:
+            self.logger.warning("No asset data retrieved")
+            return {}
+
+        self.logger.info("Fetching data for %s assets in one batched query", len(selected))
+
+        date_filter = ""
+        if date_range:
+            date_filter = build_date_range_filter(date_range.start, date_range.end)
+
+        selects = []
+        for symbol in selected:
+            literal = symbol.replace("'", "''")
+            selects.append(
+                f"SELECT '{literal}' AS sym, ts, SUM(COALESCE(usd_value, underlying_units * price_usd, 0)) AS v "
+                f"FROM {self.table_prefix}{symbol} {date_filter} GROUP BY ts"
+            )
+        sql = " UNION ALL ".join(selects) + " ORDER BY sym, ts ASC"
+
+        try:
+            result = self._execute_sql(sql)
+            rows = list(self._iter_rows(result, ['sym', 'ts', 'v']))
+        except Exception as e:
+            error_msg = f"Failed to fetch batched series: {e}"
+            self.logger.error(error_msg)
+            raise GreptimeError(error_msg)
+
+        buckets: Dict[str, List[Tuple[Any, Any]]] = {symbol: [] for symbol in selected}
+        for sym, ts, value in rows:
+            bucket = buckets.get(sym)
+            if bucket is not None:
+                bucket.append((ts, value))
+
+        results = {}
+        for symbol, display in selected.items():
+            results[display] = self._rows_to_series(buckets[symbol], display)
+
+        self.logger.info("Successfully retrieved data for %s assets", len(results))
+        return results
+
     # ================= Transactions (deposits/withdrawals) =================
     def _get_deposits_table(self, asset_symbol: str, deposits_prefix: str) -> str:
-        from .utils import normalize_asset_symbol
         normalized = normalize_asset_symbol(asset_symbol)
         return f"{deposits_prefix}{normalized}"
 
     def _get_withdrawals_table(self, asset_symbol: str, withdrawals_prefix: str) -> str:
-        from .utils import normalize_asset_symbol
         normalized = normalize_asset_symbol(asset_symbol)
         return f"{withdrawals_prefix}{normalized}"
 
@@ -681,7 +1104,9 @@ class GreptimeReader:
         """
         Fetch deposit and withdrawal transactions for a single asset from Greptime.
 
-        Returns a merged, timestamp-ordered list of Transaction objects.
+        Returns a merged, timestamp-ordered list of Transaction objects, fetched
+        with a single UNION ALL query over whichever of the two tables exist
+        (one query per table if their column types make the UNION fail).
         Expected table schema (production): ts, created_at, wallet_address, market_id, amount, notes
         
         Args:
@@ -691,9 +1116,6 @@ class GreptimeReader:
             date_range: Optional date range filter
             wallet_address: Optional wallet address filter (for per-wallet queries)
         """
-        from .utils import validate_table_name, build_date_range_filter, timestamp_to_datetime, safe_float
-        from .utils import normalize_asset_symbol
-
         deposits_table = self._get_deposits_table(asset_symbol, deposits_prefix)
         withdrawals_table = self._get_withdrawals_table(asset_symbol, withdrawals_prefix)
 
@@ -702,96 +1124,162 @@ class GreptimeReader:
             raise GreptimeQueryError(f"Invalid deposits table name: {deposits_table}")
         if not validate_table_name(withdrawals_table, withdrawals_prefix):
             raise GreptimeQueryError(f"Invalid withdrawals table name: {withdrawals_table}")
+        # GreptimeDB's HTTP SQL API has no bind parameters, so the address is
+        # whitelisted before being embedded as a literal
+        if wallet_address and not validate_wallet_address(wallet_address):
+            raise GreptimeQueryError(f"Invalid wallet address: {wallet_address!r}")
+
+        # Only include branches for tables that exist (table list is cached)
+        branches = [
+            (table, tx_type)
+            for table, tx_type in ((deposits_table, "deposit"), (withdrawals_table, "withdrawal"))
+            if self._table_exists(table)
+        ]
+        if not branches:
+            return []
+
+        # Build WHERE clause shared by both branches
+        where_clauses = []
+        if date_range:
+            date_filter = build_date_range_filter(date_range.start, date_range.end)
+            if date_filter:
+                # Remove "WHERE" if present, we'll add it back
+                date_filter = date_filter.replace("WHERE", "").strip()
+                where_clauses.append(date_filter)
+
+        if wallet_address:
+            where_clauses.append(f"wallet_address = '{wallet_address}'")
+
+        where = ""
+        if where_clauses:
+            where = "WHERE " + " AND ".join(where_clauses)
+
+        columns = ["ts", "created_at", "wallet_address", "market_id", "amount", "notes", "tx_type"]
+        selects = [
+            f"SELECT ts, created_at, wallet_address, market_id, amount, notes, '{tx_type}' AS tx_type "
+            f"FROM {table} {where}"
+            for table, tx_type in branches
+        ]
+
+        def _query_rows(sql: str) -> List[Tuple[Any, ...]]:
+            # Transactions change on every sync; never serve them from the query cache
+            result = self._execute_sql(sql, bypass_cache=True)
+            return [
+                r for r in self._iter_rows(result, columns)
+                if r[0] is not None and r[6] in ("deposit", "withdrawal")
+            ]
+
+        # One round-trip for both tables; the server merges and orders by ts
+        # (deposits before withdrawals on equal timestamps, as before)
+        try:
+            rows = _query_rows(" UNION ALL ".join(selects) + " ORDER BY ts ASC, tx_type ASC")
+        except GreptimeQueryError as e:
+            if len(selects) < 2:
+                raise
+            # UNION ALL needs matching column types; tables created at different
+            # times may differ, so query each table and merge locally
+            self.logger.warning("Transaction UNION query failed for %s, querying tables individually: %s", asset_symbol, e)
+            rows = [r for sql in selects for r in _query_rows(sql + " ORDER BY ts ASC")]
+            rows.sort(key=lambda r: (int(r[0]), r[6]))
+        symbol = normalize_asset_symbol(asset_symbol)
+
+        # Convert timestamps in bulk (created_at falls back to ts)
+        ts_values = timestamps_to_datetimes([int(r[0]) for r in rows])
+        created_values = timestamps_to_datetimes([
+            int(r[1]) if r[1] is not None else int(r[0])
+            for r in rows
+        ])
 
         txs: List[Transaction] = []
+        for (_, _, wallet, market_id, amount, notes, tx_type), ts, created_at in zip(
+            rows, ts_values, created_values
+        ):
+            wallet = wallet or ""
+            market_id = market_id or ""
+            amount_val = safe_float(amount, 0.0)
 
-        # Helper to run a single-table fetch
-        def _fetch_from_table(table: str, tx_type: str) -> None:
-            if not self._table_exists(table):
-                return
-            
-            # Build WHERE clause
-            where_clauses = []
-            if date_range:
-                date_filter = build_date_range_filter(date_range.start, date_range.end)
-                if date_filter:
-                    # Remove "WHERE" if present, we'll add it back
-                    date_filter = date_filter.replace("WHERE", "").strip()
-                    where_clauses.append(date_filter)
-            
-            if wallet_address:
-                where_clauses.append(f"wallet_address = '{wallet_address}'")
-            
-            where = ""
-            if where_clauses:
-                where = "WHERE " + " AND ".join(where_clauses)
-            
-            sql = (
-                f"SELECT ts, created_at, wallet_address, market_id, amount, notes "
-                f"FROM {table} {where} ORDER BY ts ASC"
-            )
-            result = self._execute_sql(sql)
-            records = self._parse_query_response(
-                result, ["ts", "created_at", "wallet_address", "market_id", "amount", "notes"]
-            )
-            for r in records:
-                ts_ms = r.get("ts")
-                created_ms = r.get("created_at")
-                wallet = r.get("wallet_address") or ""
-                market_id = r.get("market_id") or ""
-                amount_val = safe_float(r.get("amount"), 0.0)
-                notes = r.get("notes")
-
-                # Convert timestamps
-                if ts_ms is None:
-                    continue
-                ts = timestamp_to_datetime(int(ts_ms))
-                created_at = timestamp_to_datetime(int(created_ms)) if created_ms is not None else ts
-
-                # Normalize amount sign for withdrawals (ensure negative)
-                if tx_type == "withdrawal" and amount_val > 0:
-                    amount_val = -amount_val
-
-                # Build Transaction
-                tx = Transaction(
-                    timestamp=ts,
-                    wallet_address=str(wallet),
-                    market_id=str(market_id),
-                    asset_symbol=normalize_asset_symbol(asset_symbol),
-                    amount=amount_val,
-                    transaction_type=tx_type,
-                    notes=str(notes) if notes is not None else None,
-                    created_at=created_at,
-                )
-                txs.append(tx)
+            # Normalize amount sign for withdrawals (ensure negative)
+            if tx_type == "withdrawal" and amount_val > 0:
+                amount_val = -amount_val
 
-        # Fetch deposits then withdrawals
-        _fetch_from_table(deposits_table, "deposit")
-        _fetch_from_table(withdrawals_table, "withdrawal")
+            # Build Transaction
+            tx = Transaction(
+                timestamp=ts,
+                wallet_address=sys.intern(str(wallet)),
+                market_id=str(market_id),
+                asset_symbol=symbol,
+                amount=amount_val,
+                transaction_type=tx_type,
+                notes=str(notes) if notes is not None else None,
+                created_at=created_at,
+            )
+            txs.append(tx)
 
-        # Sort merged transactions by timestamp
-        txs.sort(key=lambda t: t.timestamp)
         return txs
 
-    def _show_tables(self) -> List[str]:
-        result = self._execute_sql("SHOW TABLES")
+    def _show_tables(self) -> Optional[List[str]]:
+        """
+        List table names via SHOW TABLES, memoized for the table cache TTL
+        
+        Returns:
+            List of table names as reported by the server, or None if the
+            server answered with an error (not memoized)
+        """
+        with self._show_tables_lock:
+            now = time.monotonic()
+            cached = self._show_tables_cache
+            if cached is not None and now - cached[0] < self._tables_cache_ttl:
+                return list(cached[1])
+            table_names = self._query_show_tables()
+            if table_names is None:
+                return None
+            self._show_tables_cache = (now, table_names)
+            return list(table_names)
+    
+    def _query_show_tables(self) -> Optional[List[str]]:
+        result = self._execute_sql("SHOW TABLES", bypass_cache=True)
+        # An error payload is not an empty listing; only trust code 0 + output
+        if not isinstance(result, dict) or result.get('code', 0) != 0:
+            return None
+        outputs = result.get('output')
+        if not isinstance(outputs, list):
+            return None
         table_names: List[str] = []
-        try:
-            outputs = result.get('output', []) if isinstance(result, dict) else []
-            for output_block in outputs:
-                records = output_block.get('records') if isinstance(output_block, dict) else None
-                if not isinstance(records, dict):
-                    continue
-                rows = records.get('rows', [])
-                if not isinstance(rows, list):
-                    continue
-                for row in rows:
-                    if isinstance(row, list) and len(row) > 0 and row[0] is not None:
-                        table_names.append(str(row[0]))
-        except Exception:
-            table_names = []
+        for output_block in outputs:
+            records = output_block.get('records') if isinstance(output_block, dict) else None
+            if not isinstance(records, dict):
+                continue
+            rows = records.get('rows', [])
+            if not isinstance(rows, list):
+                continue
+            for row in rows:
+                if isinstance(row, list) and len(row) > 0 and row[0] is not None:
+                    table_names.append(str(row[0]))
         return table_names
     
+    @staticmethod
+    def _match_prefixed_tables(table_names: List[str], prefix: Optional[str]) -> List[Tuple[str, str]]:
+        """
+        Select tables whose unqualified name starts with prefix (case-insensitive)
+        
+        Args:
+            table_names: Table names from SHOW TABLES (optionally schema-qualified)
+            prefix: Table prefix to match; an empty prefix matches nothing
+            
+        Returns:
+            List of (table_name, lowercase suffix after the prefix) pairs
+        """
+        prefix_lower = str(prefix or "").lower()
+        if not prefix_lower:
+            return []
+        plen = len(prefix_lower)
+        return [
+            (t, base[plen:])
+            for t in table_names if t
+            for base in (t.rpartition(".")[2].lower(),)
+            if base.startswith(prefix_lower)
+        ]
+    
     def discover_asset_tables(self) -> List[str]:
         """
         Discover available asset tables in the database
@@ -807,25 +1295,15 @@ class GreptimeReader:
             
             # Use SHOW TABLES to find liqwid_supply_positions_* tables
             table_names = self._show_tables()
+            if table_names is None:
+                raise GreptimeQueryError("SHOW TABLES returned an error response")
 
-            asset_symbols = []
-            prefix = str(self.table_prefix or "")
-            prefix_lower = prefix.lower()
-            for table_name in table_names:
-                t = str(table_name or "")
-                if not t:
-                    continue
-                base = t.split(".")[-1]
-                base_lower = base.lower()
-                if prefix_lower and base_lower.startswith(prefix_lower):
-                    asset_symbol = base_lower[len(prefix_lower):]
-                    if asset_symbol:
-                        asset_symbols.append(asset_symbol)
-            
             # Sort for consistent ordering
-            asset_symbols = sorted(set(asset_symbols))
+            asset_symbols = sorted({
+                suffix for _, suffix in self._match_prefixed_tables(table_names, self.table_prefix) if suffix
+            })
             
-            self.logger.info(f"Discovered {len(asset_symbols)} asset tables: {', '.join(asset_symbols).upper()}")
+            self.logger.info("Discovered %s asset tables: %s", len(asset_symbols), ', '.join(asset_symbols).upper())
             return asset_symbols
             
         except Exception as e:
@@ -857,70 +1335,185 @@ class GreptimeReader:
         wallet_addresses = set()
         
         try:
-            self.logger.info(f"Discovering wallet addresses from tables with prefix '{prefix}'...")
+            self.logger.info("Discovering wallet addresses from tables with prefix '%s'...", prefix)
             
             # First, get all tables matching the prefix
             table_names = self._show_tables()
+            if table_names is None:
+                raise GreptimeQueryError("SHOW TABLES returned an error response")
             
             # Find tables matching our prefix
-            matching_tables = []
-            prefix_lower = str(prefix or "").lower()
-            for table_name in table_names:
-                t = str(table_name or "")
-                if not t:
-                    continue
-                base = t.split(".")[-1]
-                if prefix_lower and base.lower().startswith(prefix_lower):
-                    matching_tables.append(t)
+            matching_tables = [t for t, _ in self._match_prefixed_tables(table_names, prefix)]
             
             if not matching_tables:
-                self.logger.warning(f"No tables found with prefix '{prefix}'")
+                self.logger.warning("No tables found with prefix '%s'", prefix)
                 return []
             
-            self.logger.info(f"Scanning {len(matching_tables)} tables for wallet addresses...")
+            self.logger.info("Scanning %s tables for wallet addresses...", len(matching_tables))
             
-            # Query each table for unique wallet addresses
-            for table_name in matching_tables:
+            # One UNION ALL query per batch of tables, deduplicated server-side
+            batch_size = self._wallet_discovery_batch_size
+            for i in range(0, len(matching_tables), batch_size):
+                batch = matching_tables[i:i + batch_size]
+                union = " UNION ALL ".join(
+                    f"SELECT wallet_address FROM {t} WHERE wallet_address IS NOT NULL"
+                    for t in batch
+                )
+                sql = f"SELECT wallet_address FROM ({union}) u GROUP BY wallet_address"
                 try:
-                    # Query for distinct wallet addresses in this table
-                    sql = f"SELECT DISTINCT wallet_address FROM {table_name} WHERE wallet_address IS NOT NULL"
                     result = self._execute_sql(sql)
-                    records = self._parse_query_response(result, ['wallet_address'])
-                    
-                    # Collect non-empty wallet addresses
-                    for record in records:
-                        wallet = record.get('wallet_address', '').strip()
-                        if wallet:  # Filter out empty strings
-                            wallet_addresses.add(wallet)
-                    
-                    self.logger.debug(f"Table {table_name}: found {len(records)} wallet entries")
-                    
                 except Exception as e:
-                    # Log but continue with other tables
-                    self.logger.warning(f"Failed to query wallet addresses from {table_name}: {e}")
+                    # A single bad table fails the whole UNION; retry this batch per table
+                    self.logger.warning(
+                        "Batched wallet discovery failed for %s tables, falling back per table: %s", len(batch), e
+                    )
+                    for table_name in batch:
+                        wallet_addresses.update(self._discover_table_wallets(table_name))
                     continue
+                
+                count = self._collect_wallets(result, wallet_addresses)
+                self.logger.debug("Wallet discovery batch of %s tables: %s wallet entries", len(batch), count)
 
             # Convert to sorted list for consistent ordering
             wallet_list = sorted(wallet_addresses)
 
-            self.logger.info(f"Discovered {len(wallet_list)} unique wallet addresses across all tables")
-            if wallet_list:
+            self.logger.info("Discovered %s unique wallet addresses across all tables", len(wallet_list))
+            if wallet_list and self.logger.isEnabledFor(logging.DEBUG):
                 preview = [f"{w[:20]}..." for w in wallet_list[:5]]
-                self.logger.debug(f"Sample wallets: {', '.join(preview)}")
+                self.logger.debug("Sample wallets: %s", ', '.join(preview))
 
             return wallet_list
 
         except Exception as e:
             # Don't raise, just log and return empty list to allow fallback
-            self.logger.error(f"Failed to discover wallet addresses: {e}")
+            self.logger.error("Failed to discover wallet addresses: %s", e)
             return []
     
-    def get_data_timespan(self, asset_symbols: List[str]) -> Tuple[Optional[datetime], Optional[datetime]]:
+    def _collect_wallets(self, result: Dict[str, Any], wallet_addresses: set) -> int:
+        """
+        Add non-empty wallet_address values from a query result to a set
+        
+        Returns:
+            Number of rows read
+        """
+        count = 0
+        for wallet in self._iter_column(result, 'wallet_address'):
+            count += 1
+            if wallet:
+                wallet = wallet.strip()
+                if wallet:  # Filter out empty strings
+                    wallet_addresses.add(sys.intern(wallet))
+        return count
+    
+    def _discover_table_wallets(self, table_name: str) -> set:
+        """
+        Query a single table for its distinct wallet addresses
+        
+        Args:
+            table_name: Fully qualified table name
+            
+        Returns:
+            Set of wallet addresses (empty on error)
+        """
+        wallet_addresses: set = set()
+        try:
+            sql = f"SELECT wallet_address FROM {table_name} WHERE wallet_address IS NOT NULL GROUP BY wallet_address"
+            result = self._execute_sql(sql)
+            count = self._collect_wallets(result, wallet_addresses)
+            self.logger.debug("Table %s: found %s wallet entries", table_name, count)
+        except Exception as e:
+            # Log but continue with other tables
+            self.logger.warning("Failed to query wallet addresses from %s: %s", table_name, e)
+        return wallet_addresses
+    
+    def _timespan_for_asset(self, asset_symbol: str) -> Tuple[Optional[datetime], Optional[datetime]]:
+        """
+        Get the (earliest, latest) timestamps for a single asset table
+        
+        Args:
+            asset_symbol: Asset symbol to check
+            
+        Returns:
+            Tuple of (earliest, latest), with None for a missing table, empty
+            table, or failed query
+        """
+        table_name = self._get_table_name(asset_symbol)
+        
+        if not self._table_exists(table_name):
+            return None, None
+        
+        try:
+            sql = f"SELECT MIN(ts) as min_ts, MAX(ts) as max_ts FROM {table_name}"
+            result = self._execute_sql(sql)
+            row = next(self._iter_rows(result, ['min_ts', 'max_ts']), None)
+        except Exception as e:
+            self.logger.warning("Failed to get timespan for %s: %s", asset_symbol, e)
+            return None, None
+        
+        if row is None:
+            return None, None
+        min_ts, max_ts = row
+        return (
+            timestamp_to_datetime(int(min_ts)) if min_ts else None,
+            timestamp_to_datetime(int(max_ts)) if max_ts else None,
+        )
+    
+    def _timespans_union(
+        self,
+        asset_symbols: List[str]
+    ) -> Optional[List[Tuple[Optional[datetime], Optional[datetime]]]]:
+        """
+        Get per-table (earliest, latest) timestamps with a single UNION ALL query
+        
+        Args:
+            asset_symbols: Asset symbols to check
+            
+        Returns:
+            List of (earliest, latest) per existing table, or None if the
+            combined query failed and callers should query per asset
+        """
+        candidates = []
+        for asset_symbol in asset_symbols:
+            table_name = self._get_table_name(asset_symbol)
+            if table_name not in candidates and validate_table_name(table_name, self.table_prefix):
+                candidates.append(table_name)
+        tables = self._filter_existing_tables(candidates)
+        if not tables:
+            return []
+        
+        sql = " UNION ALL ".join(
+            f"SELECT '{t}' AS asset, MIN(ts) AS min_ts, MAX(ts) AS max_ts FROM {t}" for t in tables
+        )
+        try:
+            result = self._execute_sql(sql)
+            rows = list(self._iter_rows(result, ['asset', 'min_ts', 'max_ts']))
+        except Exception as e:
+            self.logger.warning("Combined timespan query failed, querying assets individually: %s", e)
+            return None
+        
+        spans = []
+        for _, min_ts, max_ts in rows:
+            spans.append((
+                timestamp_to_datetime(int(min_ts)) if min_ts else None,
+                timestamp_to_datetime(int(max_ts)) if max_ts else None,
+            ))
+        return spans
+    
+    def get_data_timespan(
+        self,
+        asset_symbols: List[str],
+        max_workers: int = 8
+    ) -> Tuple[Optional[datetime], Optional[datetime]]:
         """
         Get the overall timespan of available data across assets
         
+        Issues one UNION ALL of per-table MIN/MAX over the existing asset
+        tables; if that statement fails, per-asset queries are dispatched
+        concurrently instead. Results are reduced to a global range.
+        
         Args:
             asset_symbols: Asset symbols to check
+            max_workers: Maximum number of concurrent queries
             
         Returns:
             Tuple of (earliest_timestamp, latest_timestamp) or (None, None) if no data
@@ -930,37 +1523,26 @@ class GreptimeReader:
         min_timestamp = None
         max_timestamp = None
         
-        for asset_symbol in asset_symbols:
-            table_name = self._get_table_name(asset_symbol)
-            
-            if not self._table_exists(table_name):
-                continue
-            
-            try:
-                sql = f"SELECT MIN(ts) as min_ts, MAX(ts) as max_ts FROM {table_name}"
-                result = self._execute_sql(sql)
-                records = self._parse_query_response(result, ['min_ts', 'max_ts'])
-                
-                if records and records[0]:
-                    min_ts = records[0].get('min_ts')
-                    max_ts = records[0].get('max_ts')
-                    
-                    if min_ts:
-                        asset_min = timestamp_to_datetime(int(min_ts))
-                        if min_timestamp is None or asset_min < min_timestamp:
-                            min_timestamp = asset_min
-                    
-                    if max_ts:
-                        asset_max = timestamp_to_datetime(int(max_ts))
-                        if max_timestamp is None or asset_max > max_timestamp:
-                            max_timestamp = asset_max
-                            
-            except Exception as e:
-                self.logger.warning(f"Failed to get timespan for {asset_symbol}: {e}")
-                continue
+        spans = self._timespans_union(asset_symbols)
+        if spans is not None:
+            for asset_min, asset_max in spans:
+                if asset_min is not None and (min_timestamp is None or asset_min < min_timestamp):
+                    min_timestamp = asset_min
+                if asset_max is not None and (max_timestamp is None or asset_max > max_timestamp):
+                    max_timestamp = asset_max
+        elif asset_symbols:
+            workers = max(1, min(max_workers, len(asset_symbols)))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(self._timespan_for_asset, s) for s in asset_symbols]
+                for future in as_completed(futures):
+                    asset_min, asset_max = future.result()
+                    if asset_min is not None and (min_timestamp is None or asset_min < min_timestamp):
+                        min_timestamp = asset_min
+                    if asset_max is not None and (max_timestamp is None or asset_max > max_timestamp):
+                        max_timestamp = asset_max
         
         if min_timestamp and max_timestamp:
-            self.logger.info(f"Data timespan: {min_timestamp} to {max_timestamp}")
+            self.logger.info("Data timespan: %s to %s", min_timestamp, max_timestamp)
         else:
             self.logger.warning("No timespan data available")
         
@@ -12,18 +12,38 @@ See instructions in:
 - client/instructions/depositwithdrawals.md
 """
 
+import gzip
 import logging
-import json
-from urllib.parse import urljoin
+import threading
+from collections import deque
+from operator import attrgetter
+from urllib.parse import urlencode, urljoin
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime
-from typing import Dict, List, Literal
-from .utils import datetime_to_timestamp, normalize_asset_symbol
+from typing import Deque, Dict, List, Literal, Optional, Set, Tuple
+from .utils import datetime_to_timestamp, decode_json_bytes, normalize_asset_symbol
 
 from .config import GreptimeConnConfig
 from .models import Transaction
 
 
+# Column order matches _build_create_table_sql
+_INSERT_TEMPLATE = (
+    "INSERT INTO {table} (\n"
+    "    ts, created_at, wallet_address, market_id, amount, notes\n"
+    ") VALUES {values}"
+)
+
+
+def _sql_str(value) -> str:
+    """Render a value as a quoted SQL string literal, or NULL for None."""
+    if value is None:
+        return "NULL"
+    return "'" + str(value).replace("'", "''") + "'"
+
+
 class GreptimeWriter:
     """
     Scaffold for a minimal, safe writer to GreptimeDB.
@@ -47,6 +67,9 @@ class GreptimeWriter:
         self.deposits_prefix = deposits_prefix
         self.withdrawals_prefix = withdrawals_prefix
         self.test_prefix = test_prefix
+        # Fixed for the writer's lifetime; computed once rather than per statement
+        base_db = config.database or ""
+        self._effective_db = f"test_{base_db}" if test_prefix and base_db else base_db
 
         # Build URLs and HTTP session (mirror greptime_reader)
         self.base_url = f"{config.host}:{config.port}"
@@ -54,8 +77,31 @@ class GreptimeWriter:
         self.session = requests.Session()
         self.session.headers.update({
             'Content-Type': 'application/x-www-form-urlencoded',
-            'User-Agent': 'LiqwidClientWriter/1.0'
+            'User-Agent': 'LiqwidClientWriter/1.0',
+            'Connection': 'keep-alive'
         })
+        # Pooled keep-alive connections. Only connection failures are retried:
+        # the request never reached the server, whereas retrying a read
+        # timeout or 5xx on an INSERT could write the same rows twice.
+        adapter = HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=32,
+            max_retries=Retry(
+                total=3,
+                connect=3,
+                read=0,
+                status=0,
+                backoff_factor=0.2,
+                raise_on_status=False,
+            ),
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        # Lowercase names of tables known to exist: seeded from SHOW TABLES on
+        # first use, then extended as this writer creates tables (None = unseeded)
+        self._known_tables: Optional[Set[str]] = None
+        self._ensured_databases: Set[str] = set()
 
         self.logger.info(
             "Initialized GreptimeWriter with db=%s, test_prefix=%s",
@@ -71,16 +117,22 @@ class GreptimeWriter:
         """
         try:
             data = {'sql': sql}
-            eff_db = self.get_effective_database()
-            if use_effective_db and eff_db:
-                data['db'] = eff_db
-            self.logger.debug("Executing SQL: %s", sql.splitlines()[0][:120])
-            resp = self.session.post(self.sql_endpoint, data=data, timeout=self.config.timeout)
+            if use_effective_db and self._effective_db:
+                data['db'] = self._effective_db
+            self.logger.debug("Executing SQL: %s", sql[:120].partition("\n")[0])
+            body = urlencode(data).encode('utf-8')
+            headers = None
+            # Large multi-row INSERTs compress well; small bodies are not worth the CPU
+            gzip_min = self.config.request_gzip_min_bytes
+            if gzip_min and len(body) >= gzip_min:
+                body = gzip.compress(body, compresslevel=5)
+                headers = {'Content-Encoding': 'gzip'}
+            resp = self.session.post(self.sql_endpoint, data=body, headers=headers, timeout=self.config.timeout)
             if resp.status_code != 200:
                 raise RuntimeError(f"HTTP {resp.status_code}: {resp.text}")
             try:
-                result = resp.json()
-            except json.JSONDecodeError as e:
+                result = decode_json_bytes(resp.content)
+            except ValueError as e:
                 raise RuntimeError(f"Invalid JSON response: {e}")
             # Greptime success usually has 'output' or code==0
             if isinstance(result, dict) and (result.get('code') == 0 or 'output' in result):
@@ -110,10 +162,50 @@ class GreptimeWriter:
     def ensure_transaction_table(self, asset_symbol: str, tx_type: Literal["deposit", "withdrawal"]) -> None:
         """
         Create the transaction table if it does not exist, with the required schema.
+        Tables already listed by SHOW TABLES or created by this writer are skipped.
         """
         table = self._get_transaction_table_name(asset_symbol, tx_type)
+        if self._is_known_table(table):
+            return
         ddl = self._build_create_table_sql(table)
         self._execute_sql(ddl)
+        self._mark_known_table(table)
+
+    def invalidate_table_cache(self) -> None:
+        """
+        Forget known tables/databases so the next insert re-reads SHOW TABLES.
+        """
+        self._known_tables = None
+        self._ensured_databases.clear()
+
+    def _refresh_known_tables(self) -> None:
+        """
+        Seed the known-table set with one SHOW TABLES on the effective database.
+        Failures (e.g. the database does not exist yet) leave the set empty, so
+        DDL is simply issued as before.
+        """
+        known: Set[str] = set()
+        try:
+            result = self._execute_sql("SHOW TABLES")
+            for block in (result.get('output') or []) if isinstance(result, dict) else []:
+                recs = block.get('records') if isinstance(block, dict) else None
+                rows = recs.get('rows') if isinstance(recs, dict) else None
+                for row in rows or []:
+                    if isinstance(row, list) and row and row[0]:
+                        known.add(str(row[0]).rpartition(".")[2].lower())
+        except Exception as e:
+            self.logger.debug("SHOW TABLES failed, tables will be ensured with DDL: %s", e)
+        self._known_tables = known
+
+    def _is_known_table(self, table: str) -> bool:
+        if self._known_tables is None:
+            self._refresh_known_tables()
+        return table.lower() in self._known_tables
+
+    def _mark_known_table(self, table: str) -> None:
+        if self._known_tables is None:
+            self._known_tables = set()
+        self._known_tables.add(table.lower())
 
     def ensure_database_exists(self) -> None:
         """
@@ -121,17 +213,17 @@ class GreptimeWriter:
         Uses CREATE DATABASE IF NOT EXISTS <db>.
         """
         eff_db = self.get_effective_database()
-        if not eff_db:
+        if not eff_db or eff_db in self._ensured_databases:
             return
         # Use a raw call without binding the 'db' param, since the DB may not exist yet.
         self._execute_sql(f"CREATE DATABASE IF NOT EXISTS {eff_db}", use_effective_db=False)
+        self._ensured_databases.add(eff_db)
 
     def get_effective_database(self) -> str:
         """
-        Compute the effective database name applying test_ prefix if enabled.
+        Effective database name, with the test_ prefix applied if enabled.
         """
-        base_db = self.config.database or ""
-        return f"test_{base_db}" if self.test_prefix and base_db else base_db
+        return self._effective_db
 
     def count_transactions(self, asset_symbol: str, tx_type: Literal["deposit", "withdrawal"]) -> int:
         """
@@ -166,32 +258,22 @@ class GreptimeWriter:
         """
         if not txs:
             return ""
-        # Helper to escape single quotes in strings
-        def esc(s: str) -> str:
-            if s is None:
-                return "NULL"
-            return "'" + str(s).replace("'", "''") + "'"
+        # Convert every timestamp up front in one pass instead of two
+        # _format_timestamp calls per row
+        times = list(map(attrgetter('timestamp', 'created_at'), txs))
+        if not all(isinstance(ts, datetime) and isinstance(ca, datetime) for ts, ca in times):
+            raise TypeError("dt must be a datetime")
+        ts_ms_list = [datetime_to_timestamp(ts) for ts, _ in times]
+        created_ms_list = [datetime_to_timestamp(ca) for _, ca in times]
 
-        values_rows: List[str] = []
-        for t in txs:
-            ts_ms = self._format_timestamp(t.timestamp)
-            created_ms = self._format_timestamp(t.created_at)
-            row = (
-                str(ts_ms),            # ts
-                str(created_ms),       # created_at
-                esc(t.wallet_address), # wallet_address
-                esc(t.market_id),      # market_id
-                str(float(t.amount)),  # amount
-                esc(t.notes),          # notes
-            )
-            values_rows.append(f"({', '.join(row)})")
-
-        sql = (
-            f"INSERT INTO {table} (\n"
-            f"    ts, created_at, wallet_address, market_id, amount, notes\n"
-            f") VALUES {', '.join(values_rows)}"
-        )
-        return sql
+        # One f-string per row: ts, created_at, wallet_address, market_id, amount, notes
+        values_rows: List[str] = [
+            f"({ts_ms}, {created_ms}, {_sql_str(t.wallet_address)}, "
+            f"{_sql_str(t.market_id)}, {float(t.amount)!r}, {_sql_str(t.notes)})"
+            for t, ts_ms, created_ms in zip(txs, ts_ms_list, created_ms_list)
+        ]
+
+        return _INSERT_TEMPLATE.format(table=table, values=", ".join(values_rows))
 
     # Internal helper for dry-run DDL preview
     def _build_create_table_sql(self, table: str) -> str:
@@ -227,19 +309,64 @@ class GreptimeWriter:
         results: Dict[str, int] = {}
         # Ensure database exists prior to creating tables or inserting
         self.ensure_database_exists()
+        # Collect DDL for tables not yet ensured plus every INSERT, then send
+        # them together as one multi-statement request
+        new_tables: List[str] = []
+        inserts: List[Tuple[str, str]] = []
+        stmts: List[str] = []
         for asset, group in groups.items():
             table = self._get_transaction_table_name(asset, tx_type)
-            # Ensure table exists
-            self.ensure_transaction_table(asset, tx_type)
-            # Build SQL and execute
+            if not self._is_known_table(table):
+                new_tables.append(table)
+                stmts.append(self._build_create_table_sql(table).rstrip(";"))
             sql = self._build_transaction_insert_sql(table, group)
             if not sql.strip():
                 results[table] = 0
                 continue
-            self._execute_sql(sql)
+            stmts.append(sql)
+            inserts.append((table, sql))
             results[table] = len(group)
+        try:
+            self._execute_statements(stmts)
+        except RuntimeError as e:
+            if "not found" not in str(e).lower():
+                raise
+            # A known table was dropped out-of-band: forget the catalog. With a
+            # single INSERT nothing else can have been written, so recreate the
+            # table and retry; otherwise re-raise rather than risk duplicates.
+            self._known_tables = None
+            if len(inserts) != 1:
+                raise
+            table, sql = inserts[0]
+            self.logger.warning("Table %s missing on insert (%s); recreating and retrying", table, e)
+            self._execute_statements([self._build_create_table_sql(table).rstrip(";"), sql])
+            self._mark_known_table(table)
+        for table in new_tables:
+            self._mark_known_table(table)
         return results
 
+    def _execute_statements(self, stmts: List[str]) -> None:
+        """
+        Execute several statements in one /v1/sql request.
+        GreptimeDB parses the whole batch before executing any of it, so a
+        parse/syntax rejection is retried statement by statement; any other
+        error is raised as-is to avoid re-running statements that succeeded.
+        """
+        if not stmts:
+            return
+        if len(stmts) == 1:
+            self._execute_sql(stmts[0])
+            return
+        try:
+            self._execute_sql(";\n".join(stmts) + ";")
+        except RuntimeError as e:
+            msg = str(e).lower()
+            if "parse" not in msg and "syntax" not in msg:
+                raise
+            self.logger.warning("Multi-statement request rejected (%s); executing statements individually", e)
+            for stmt in stmts:
+                self._execute_sql(stmt)
+
     def record_deposit(self, tx: Transaction) -> bool:
         """
         Convenience wrapper for inserting a single deposit transaction.
@@ -253,3 +380,109 @@ class GreptimeWriter:
         """
         res = self.insert_transactions([tx], "withdrawal")
         return sum(res.values()) == 1
+
+
+class BufferedGreptimeWriter:
+    """
+    Coalesce single-transaction writes into batched inserts.
+
+    record_deposit/record_withdrawal only enqueue; buffered transactions are
+    written with one insert_transactions call per type once max_rows are
+    pending, every max_seconds from a background thread, or on flush/close.
+
+    A batch whose insert fails is not re-queued (part of it may already be
+    written); it is kept in ``failed`` for the caller to inspect or retry.
+    """
+
+    def __init__(self, writer: GreptimeWriter, max_rows: int = 1000, max_seconds: float = 1.0) -> None:
+        if max_rows <= 0:
+            raise ValueError("max_rows must be positive")
+        if max_seconds <= 0:
+            raise ValueError("max_seconds must be positive")
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.writer = writer
+        self.max_rows = max_rows
+        self.max_seconds = max_seconds
+        self.failed: List[Tuple[str, List[Transaction]]] = []
+        self._buffers: Dict[str, Deque[Transaction]] = {"deposit": deque(), "withdrawal": deque()}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=self.__class__.__name__, daemon=True)
+        self._thread.start()
+
+    def append(self, tx: Transaction, tx_type: Literal["deposit", "withdrawal"]) -> None:
+        """
+        Enqueue a transaction, flushing its buffer once max_rows are pending.
+        """
+        if tx_type not in self._buffers:
+            raise ValueError("tx_type must be 'deposit' or 'withdrawal'")
+        with self._lock:
+            buf = self._buffers[tx_type]
+            buf.append(tx)
+            full = len(buf) >= self.max_rows
+        if full:
+            self.flush(tx_type)
+
+    def record_deposit(self, tx: Transaction) -> bool:
+        """
+        Enqueue a single deposit transaction.
+        """
+        self.append(tx, "deposit")
+        return True
+
+    def record_withdrawal(self, tx: Transaction) -> bool:
+        """
+        Enqueue a single withdrawal transaction.
+        """
+        self.append(tx, "withdrawal")
+        return True
+
+    def pending(self) -> int:
+        """
+        Number of transactions waiting to be written.
+        """
+        with self._lock:
+            return sum(len(buf) for buf in self._buffers.values())
+
+    def flush(self, tx_type: Optional[str] = None) -> Dict[str, int]:
+        """
+        Write buffered transactions now (one type, or all when tx_type is None).
+        Returns a mapping of table_name -> rows_inserted.
+        """
+        results: Dict[str, int] = {}
+        kinds = [tx_type] if tx_type else list(self._buffers)
+        with self._flush_lock:
+            for kind in kinds:
+                with self._lock:
+                    batch = list(self._buffers[kind])
+                    self._buffers[kind].clear()
+                if not batch:
+                    continue
+                try:
+                    inserted = self.writer.insert_transactions(batch, kind)  # type: ignore[arg-type]
+                except Exception as e:
+                    self.failed.append((kind, batch))
+                    self.logger.error("Failed to write %d buffered %s transactions: %s", len(batch), kind, e)
+                    continue
+                for table, count in inserted.items():
+                    results[table] = results.get(table, 0) + count
+        return results
+
+    def close(self) -> None:
+        """
+        Stop the background thread and write anything still buffered.
+        """
+        self._stop.set()
+        self._thread.join()
+        self.flush()
+
+    def __enter__(self) -> "BufferedGreptimeWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.max_seconds):
+            self.flush()
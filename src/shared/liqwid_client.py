@@ -6,18 +6,93 @@ Implements retry logic, error handling, and response parsing.
 """
 
 import requests
-import time
 import json
-from datetime import datetime, UTC, timedelta
-from typing import List, Dict, Optional, Any, Tuple
+import logging
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from datetime import datetime, UTC
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
 from dataclasses import dataclass
 
 from .models import Market, PricePoint, WalletAsset
 from .logging_setup import get_logger
+from .utils import decode_json_bytes, encode_json_bytes
 
 logger = get_logger(__name__)
 
-@dataclass
+_T = TypeVar('_T')
+
+_JSON_HEADERS = {'Content-Type': 'application/json'}
+
+
+def _dig(data: Any, *keys: Any, default: Any = None) -> Any:
+    """
+    Walk nested dicts/lists by key without allocating placeholder dicts
+    
+    Args:
+        data: Decoded JSON document
+        *keys: Keys (or list indices) to follow in order
+        default: Value returned when any step is missing or null
+        
+    Returns:
+        The nested value, or default
+    """
+    try:
+        for key in keys:
+            data = data[key]
+    except (KeyError, IndexError, TypeError):
+        return default
+    return default if data is None else data
+
+# Upper bound on concurrent per-wallet requests; kept <= the adapter pool size
+_MAX_WALLET_WORKERS = 16
+# Addresses sent per Koios address_assets POST
+_ADDRESS_BATCH_SIZE = 50
+# Longest single retry wait, in seconds
+_MAX_BACKOFF = 30
+# Default start of the transaction history window. Liqwid V2 API historical
+# data starts ~November 2023; October 1, 2023 safely captures all of it.
+_HISTORY_START = '2023-10-01T00:00:00Z'
+
+
+def _retrying_adapter(retry_attempts: int, retry_backoff: float, pool_maxsize: int = _MAX_WALLET_WORKERS) -> HTTPAdapter:
+    """
+    Build a pooled HTTPAdapter that retries transient failures
+    
+    retry_attempts counts total attempts (as before), so urllib3 gets
+    retry_attempts - 1 retries. Connect/read errors and 429/5xx responses are
+    retried with exponential backoff (urllib3 retries the first failure
+    immediately, then waits retry_backoff * 2**n and honours Retry-After);
+    other 4xx responses are returned at once. On urllib3 2.x each wait gets
+    up to retry_backoff/2 seconds of random jitter, so clients polling the same
+    API do not retry in lockstep, and is capped at _MAX_BACKOFF seconds.
+    
+    Args:
+        retry_attempts: Total number of attempts per request
+        retry_backoff: Base backoff time between retries
+        pool_maxsize: Maximum pooled connections per host
+        
+    Returns:
+        Configured HTTPAdapter
+    """
+    retry_kwargs = dict(
+        total=max(0, retry_attempts - 1),
+        backoff_factor=retry_backoff,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(["GET", "POST"]),
+        raise_on_status=False,
+    )
+    try:
+        retry = Retry(**retry_kwargs, backoff_jitter=retry_backoff / 2, backoff_max=_MAX_BACKOFF)
+    except TypeError:  # urllib3 1.x: no jitter, fixed 120 s cap
+        retry = Retry(**retry_kwargs)
+    return HTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize, max_retries=retry)
+
+@dataclass(slots=True)
 class APIResponse:
     """Generic API response wrapper"""
     success: bool
@@ -28,7 +103,8 @@ class APIResponse:
 class LiqwidClient:
     """Client for Liqwid GraphQL API"""
     
-    def __init__(self, endpoint: str, timeout: int = 30, retry_attempts: int = 3, retry_backoff: int = 5):
+    def __init__(self, endpoint: str, timeout: int = 30, retry_attempts: int = 3, retry_backoff: int = 5,
+                 markets_ttl: float = 600.0, prices_ttl: float = 60.0):
         """
         Initialize Liqwid client
         
@@ -37,17 +113,41 @@ class LiqwidClient:
             timeout: Request timeout in seconds
             retry_attempts: Number of retry attempts
             retry_backoff: Base backoff time between retries
+            markets_ttl: Seconds a fetched market list is reused (0 disables)
+            prices_ttl: Seconds fetched asset prices are reused (0 disables)
         """
         self.endpoint = endpoint
         self.timeout = timeout
         self.retry_attempts = retry_attempts
         self.retry_backoff = retry_backoff
+        # Markets and prices change slowly; memoize parsed results per client
+        self.markets_ttl = markets_ttl
+        self.prices_ttl = prices_ttl
+        self._markets_cache: Optional[Tuple[float, List[Market]]] = None
+        self._prices_cache: Optional[Tuple[float, datetime, Dict[str, float]]] = None
+        self._cache_lock = threading.Lock()
+        # In-flight fetches by key, so concurrent cold-cache callers share one request
+        self._inflight: Dict[str, Future] = {}
         self.session = requests.Session()
         self.session.headers.update({
             'Content-Type': 'application/json',
             'Accept': 'application/json',
             'User-Agent': 'LiqwidQueryDaemon/1.0'
         })
+        # Keep-alive pool with transport-level retry/backoff
+        adapter = _retrying_adapter(retry_attempts, retry_backoff)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+    
+    def close(self) -> None:
+        """Close the underlying HTTP session"""
+        self.session.close()
+    
+    def __enter__(self) -> "LiqwidClient":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
     
     def _make_request(self, query: str, variables: Optional[Dict] = None) -> APIResponse:
         """
@@ -65,73 +165,112 @@ class LiqwidClient:
             'variables': variables or {}
         }
         
-        last_error = None
-        
-        for attempt in range(self.retry_attempts):
-            try:
-                logger.debug(f"Making GraphQL request (attempt {attempt + 1}/{self.retry_attempts})")
-                logger.debug(f"Endpoint: {self.endpoint}")
-                logger.debug(f"Timeout: {self.timeout}s")
-                
-                # Use direct requests.post instead of session to avoid any connection pooling issues
-                response = requests.post(
-                    self.endpoint,
-                    json=payload,
-                    headers={
-                        'Content-Type': 'application/json',
-                        'Accept': 'application/json'
-                    },
-                    timeout=self.timeout
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    
-                    # Check for GraphQL errors
-                    if 'errors' in data:
-                        error_msg = '; '.join([err.get('message', 'Unknown GraphQL error') for err in data['errors']])
-                        logger.error(f"GraphQL errors: {error_msg}")
-                        return APIResponse(success=False, error=error_msg, status_code=200)
-                    
-                    logger.debug("GraphQL request successful")
-                    return APIResponse(success=True, data=data.get('data'), status_code=200)
-                
-                else:
-                    error_msg = f"HTTP {response.status_code}: {response.text}"
-                    logger.warning(f"Request failed: {error_msg}")
-                    last_error = error_msg
-                    
-            except requests.exceptions.Timeout:
-                last_error = f"Request timeout after {self.timeout}s"
-                logger.warning(f"Attempt {attempt + 1} timed out")
+        try:
+            logger.debug("Making GraphQL request to %s (timeout %ss)", self.endpoint, self.timeout)
+            
+            # Pooled session: reuses the TCP/TLS connection; the adapter retries
+            # connection errors and 429/5xx responses with backoff
+            response = self.session.post(self.endpoint, data=encode_json_bytes(payload), timeout=self.timeout)
+            
+            if response.status_code == 200:
+                data = decode_json_bytes(response.content)
                 
-            except requests.exceptions.ConnectionError as e:
-                last_error = f"Connection error: {str(e)}"
-                logger.warning(f"Attempt {attempt + 1} connection failed")
+                # Check for GraphQL errors
+                if 'errors' in data:
+                    error_msg = '; '.join([err.get('message', 'Unknown GraphQL error') for err in data['errors']])
+                    logger.error(f"GraphQL errors: {error_msg}")
+                    return APIResponse(success=False, error=error_msg, status_code=200)
                 
-            except Exception as e:
-                last_error = f"Unexpected error: {str(e)}"
-                logger.error(f"Attempt {attempt + 1} failed unexpectedly: {e}")
+                logger.debug("GraphQL request successful")
+                return APIResponse(success=True, data=data.get('data'), status_code=200)
+            
+            error_msg = f"HTTP {response.status_code}: {response.text}"
+            logger.error(f"GraphQL request failed after {self.retry_attempts} attempt(s): {error_msg}")
+            return APIResponse(success=False, error=error_msg, status_code=response.status_code)
             
-            # Exponential backoff before retry (except on last attempt)
-            if attempt < self.retry_attempts - 1:
-                backoff_time = self.retry_backoff * (2 ** attempt)
-                logger.debug(f"Retrying in {backoff_time}s...")
-                time.sleep(backoff_time)
+        except requests.exceptions.Timeout:
+            last_error = f"Request timeout after {self.timeout}s"
+        except requests.exceptions.ConnectionError as e:
+            last_error = f"Connection error: {str(e)}"
+        except Exception as e:
+            last_error = f"Unexpected error: {str(e)}"
         
         logger.error(f"All {self.retry_attempts} attempts failed. Last error: {last_error}")
         return APIResponse(success=False, error=last_error)
     
+    def _single_flight(self, key: str, fetch: Callable[[], _T]) -> _T:
+        """
+        Run fetch() once for concurrent callers using the same key
+        
+        The first caller runs fetch in its own thread; callers arriving while
+        it is in flight block on its Future and receive the same result (or
+        exception).
+        
+        Args:
+            key: In-flight key (one per cached resource)
+            fetch: Zero-argument callable doing the actual request
+            
+        Returns:
+            fetch() result
+        """
+        with self._cache_lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+        
+        if not leader:
+            return future.result()
+        
+        try:
+            result = fetch()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._cache_lock:
+                self._inflight.pop(key, None)
+    
+    def invalidate_cache(self) -> None:
+        """Drop cached markets and prices so the next call hits the API"""
+        with self._cache_lock:
+            self._markets_cache = None
+            self._prices_cache = None
+    
+    def ping(self) -> bool:
+        """
+        Lightweight connectivity check
+        
+        Returns:
+            True if the endpoint answered a trivial GraphQL query
+        """
+        return self._make_request("query Ping { __typename }").success
+    
     def fetch_markets(self) -> List[Market]:
         """
         Fetch all Liqwid supply markets
         
+        Results are reused for markets_ttl seconds.
+        
         Returns:
             List of Market objects
             
         Raises:
             Exception: If markets cannot be fetched after all retries
         """
+        with self._cache_lock:
+            cached = self._markets_cache
+            if cached is not None and time.monotonic() - cached[0] < self.markets_ttl:
+                return list(cached[1])
+        
+        return list(self._single_flight('markets', self._query_markets))
+    
+    def _query_markets(self) -> List[Market]:
+        """Run the markets GraphQL query, parse the results and cache them"""
         logger.info("Fetching Liqwid markets...")
         
         query = """
@@ -173,7 +312,7 @@ class LiqwidClient:
         if not response.success:
             raise Exception(f"Failed to fetch markets: {response.error}")
         
-        markets_data = response.data.get('liqwid', {}).get('data', {}).get('markets', {}).get('results', [])
+        markets_data = _dig(response.data, 'liqwid', 'data', 'markets', 'results', default=[])
         if not markets_data:
             logger.warning("No markets returned from GraphQL query")
             return []
@@ -181,26 +320,32 @@ class LiqwidClient:
         markets = []
         for market_data in markets_data:
             try:
+                asset = market_data['asset']
+                receipt = market_data['receiptAsset']
+                policy_id = receipt['policyId']
                 market = Market(
                     id=market_data['id'],
                     name=market_data['displayName'],
-                    underlying_symbol=market_data['asset']['symbol'],
-                    underlying_decimals=int(market_data['asset']['decimals']),
-                    underlying_price=market_data['asset'].get('price'),  # May be None
+                    underlying_symbol=asset['symbol'],
+                    underlying_decimals=int(asset['decimals']),
+                    underlying_price=asset.get('price'),  # May be None
                     # Normalize policy ID to lowercase for consistent matching
-                    qtoken_policy=market_data['receiptAsset']['policyId'].lower() if market_data['receiptAsset'].get('policyId') else market_data['receiptAsset']['policyId'],
-                    qtoken_symbol=market_data['receiptAsset']['symbol'],
-                    qtoken_decimals=int(market_data['receiptAsset']['decimals']),
+                    qtoken_policy=policy_id.lower() if policy_id else policy_id,
+                    qtoken_symbol=receipt['symbol'],
+                    qtoken_decimals=int(receipt['decimals']),
                     exchange_rate=float(market_data['exchangeRate'])
                 )
                 markets.append(market)
                 
             except (KeyError, ValueError, TypeError) as e:
                 logger.error(f"Failed to parse market data: {e}")
-                logger.debug(f"Market data: {market_data}")
+                logger.debug("Market data: %s", market_data)
                 continue
         
         logger.info(f"Successfully fetched {len(markets)} markets")
+        if markets and self.markets_ttl > 0:
+            with self._cache_lock:
+                self._markets_cache = (time.monotonic(), markets)
         return markets
     
     def fetch_asset_prices(self, symbols: List[str]) -> Dict[str, PricePoint]:
@@ -216,7 +361,41 @@ class LiqwidClient:
         if not symbols:
             return {}
         
-        logger.info(f"Fetching prices for {len(symbols)} assets: {symbols}")
+        snapshot = self._price_snapshot()
+        if snapshot is None:
+            return {}
+        timestamp, all_prices = snapshot
+        
+        # Filter to requested symbols that have a price: one dict probe per
+        # symbol, never a scan of the symbols list per asset
+        prices = {
+            symbol: PricePoint(symbol=symbol, price=all_prices[symbol], timestamp=timestamp)
+            for symbol in symbols
+            if symbol in all_prices
+        }
+        logger.info(f"Successfully fetched prices for {len(prices)} assets")
+        return prices
+    
+    def _price_snapshot(self) -> Optional[Tuple[datetime, Dict[str, float]]]:
+        """
+        Return (fetch time, symbol -> price) for all Liqwid assets
+        
+        The assets query does not depend on the requested symbols, so one
+        snapshot serves every fetch_asset_prices call for prices_ttl seconds.
+        
+        Returns:
+            Snapshot tuple, or None if the query failed
+        """
+        with self._cache_lock:
+            cached = self._prices_cache
+            if cached is not None and time.monotonic() - cached[0] < self.prices_ttl:
+                return cached[1], cached[2]
+        
+        return self._single_flight('prices', self._query_prices)
+    
+    def _query_prices(self) -> Optional[Tuple[datetime, Dict[str, float]]]:
+        """Run the assets GraphQL query, parse prices and cache the snapshot"""
+        logger.info("Fetching Liqwid asset prices...")
         
         # Use Liqwid assets query to get prices
         query = """
@@ -238,10 +417,10 @@ class LiqwidClient:
         
         if not response.success:
             logger.error(f"Failed to fetch prices: {response.error}")
-            return {}
+            return None
         
-        assets_data = response.data.get('liqwid', {}).get('data', {}).get('assets', {}).get('results', [])
-        prices = {}
+        assets_data = _dig(response.data, 'liqwid', 'data', 'assets', 'results', default=[])
+        all_prices: Dict[str, float] = {}
         timestamp = datetime.now(UTC)
         
         for asset_data in assets_data:
@@ -249,20 +428,18 @@ class LiqwidClient:
                 symbol = asset_data['symbol']
                 price = asset_data.get('price')
                 
-                # Filter to requested symbols and only if price exists
-                if symbol in symbols and price is not None:
-                    prices[symbol] = PricePoint(
-                        symbol=symbol,
-                        price=float(price),
-                        timestamp=timestamp
-                    )
+                # Only keep assets that have a price
+                if price is not None:
+                    all_prices[symbol] = float(price)
                     
             except (KeyError, ValueError, TypeError) as e:
                 logger.error(f"Failed to parse price data for {asset_data}: {e}")
                 continue
         
-        logger.info(f"Successfully fetched prices for {len(prices)} assets")
-        return prices
+        if all_prices and self.prices_ttl > 0:
+            with self._cache_lock:
+                self._prices_cache = (time.monotonic(), timestamp, all_prices)
+        return timestamp, all_prices
     
     def fetch_historical_transactions(
         self,
@@ -303,24 +480,23 @@ class LiqwidClient:
         logger.info(f"Fetching historical transactions for wallet {wallet_address[:20]}...")
         
         # Set default date range if not provided (all available API history)
-        # Liqwid V2 API historical data starts ~November 2023
-        # Use October 1, 2023 as safe earliest date to capture all available data
         if not start_date:
-            start = datetime(2023, 10, 1, tzinfo=UTC)
-            start_date = start.replace(tzinfo=None).isoformat() + 'Z'
+            start_date = _HISTORY_START
         elif not start_date.endswith('Z'):
             # Convert YYYY-MM-DD to ISO timestamp with Z suffix
             start_date = f"{start_date}T00:00:00Z"
         
         if not end_date:
-            end_date = datetime.now(UTC).replace(tzinfo=None).isoformat() + 'Z'
+            end_date = datetime.now(UTC).strftime('%Y-%m-%dT%H:%M:%SZ')
         elif not end_date.endswith('Z'):
             # Convert YYYY-MM-DD to ISO timestamp with Z suffix
             end_date = f"{end_date}T23:59:59Z"
         
         logger.info(f"Date range: {start_date} to {end_date}")
         
-        # GraphQL query - must include pagination fields for API to work properly
+        # GraphQL query - must include pagination fields for API to work properly.
+        # Only the fields consumers read are selected: the response is the largest
+        # this client handles and the unused loan/health fields quadrupled it.
         query = """
         query Transactions($input: HistoricalTransactionInput) {
           historical {
@@ -335,21 +511,6 @@ class LiqwidClient:
                 displayName
                 time
                 amount
-                logo
-                amountUSD
-                principal
-                principalUSD
-                oraclePrice
-                exchangeRate
-                qAmount
-                minInterest
-                healthFactor
-                loanOriginationFee
-                beforeHealthFactor
-                beforePrincipal
-                beforePrincipalUSD
-                totalCollateralUSD
-                beforetotalCollateralUSD
               }
             }
           }
@@ -372,14 +533,11 @@ class LiqwidClient:
         variables = {"input": input_data}
         
         # Debug: Log the actual request
-        logger.debug(f"GraphQL variables: {json.dumps(variables, indent=2)}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("GraphQL variables: %s", json.dumps(variables, indent=2))
         
         response = self._make_request(query, variables)
         
-        # Debug: Log full response
-        if response.success:
-            logger.debug(f"Full API response data: {json.dumps(response.data, indent=2)}")
-        
         if not response.success:
             logger.error(f"Failed to fetch transactions: {response.error}")
             return {
@@ -391,24 +549,24 @@ class LiqwidClient:
         
         # Parse response
         try:
-            historical_data = response.data.get('historical', {})
-            transactions_data = historical_data.get('transactions', {})
+            historical_data = _dig(response.data, 'historical')
+            transactions_data = _dig(historical_data, 'transactions', default={})
             
             # Debug: Log the full structure
-            logger.debug(f"Response structure - historical: {historical_data is not None}")
-            logger.debug(f"Response structure - transactions keys: {list(transactions_data.keys())[:5]}")
-            logger.debug(f"Full transactions_data: {transactions_data}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Response structure - historical: %s", historical_data is not None)
+                logger.debug("Response structure - transactions keys: %s", list(transactions_data.keys())[:5])
             
             results = transactions_data.get('results', [])
             total_count = transactions_data.get('totalCount', 0)
             
             logger.info(f"Successfully fetched {len(results)} transactions (totalCount: {total_count})")
             
-            # Log transaction type breakdown
-            supply_count = sum(1 for tx in results if tx.get('type') == 'SUPPLY')
-            withdraw_count = sum(1 for tx in results if tx.get('type') == 'WITHDRAW')
-            logger.debug(f"Transaction breakdown: {supply_count} SUPPLY (deposits), "
-                        f"{withdraw_count} WITHDRAW (withdrawals)")
+            # Log transaction type breakdown (debug only)
+            if logger.isEnabledFor(logging.DEBUG):
+                type_counts = Counter(tx.get('type') for tx in results)
+                logger.debug("Transaction breakdown: %d SUPPLY (deposits), %d WITHDRAW (withdrawals)",
+                             type_counts['SUPPLY'], type_counts['WITHDRAW'])
             
             return {
                 'status': 'success',
@@ -451,6 +609,9 @@ class KoiosClient:
         self.session.headers.update({
             'User-Agent': 'LiqwidQueryDaemon/1.0'
         })
+        adapter = _retrying_adapter(retry_attempts, retry_backoff)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
     
     def _make_request(self, path: str, method: str = 'GET', data: Optional[Any] = None) -> APIResponse:
         """
@@ -465,51 +626,38 @@ class KoiosClient:
             APIResponse with success status and data/error
         """
         url = f"{self.endpoint}/{path.lstrip('/')}"
-        last_error = None
         
-        for attempt in range(self.retry_attempts):
-            try:
-                logger.debug(f"Making Koios {method} request to {path} (attempt {attempt + 1}/{self.retry_attempts})")
-                
-                if method == 'GET':
-                    response = self.session.get(url, timeout=self.timeout)
-                elif method == 'POST':
-                    response = self.session.post(url, json=data, timeout=self.timeout)
-                else:
-                    raise ValueError(f"Unsupported HTTP method: {method}")
-                
-                if response.status_code == 200:
-                    try:
-                        data = response.json()
-                        logger.debug(f"Koios request successful, got {len(data) if isinstance(data, list) else 1} item(s)")
-                        return APIResponse(success=True, data=data, status_code=200)
-                    except json.JSONDecodeError as e:
-                        error_msg = f"Invalid JSON response: {e}"
-                        logger.error(error_msg)
-                        return APIResponse(success=False, error=error_msg, status_code=200)
-                
-                else:
-                    error_msg = f"HTTP {response.status_code}: {response.text}"
-                    logger.warning(f"Koios request failed: {error_msg}")
-                    last_error = error_msg
-                    
-            except requests.exceptions.Timeout:
-                last_error = f"Request timeout after {self.timeout}s"
-                logger.warning(f"Attempt {attempt + 1} timed out")
-                
-            except requests.exceptions.ConnectionError as e:
-                last_error = f"Connection error: {str(e)}"
-                logger.warning(f"Attempt {attempt + 1} connection failed")
-                
-            except Exception as e:
-                last_error = f"Unexpected error: {str(e)}"
-                logger.error(f"Attempt {attempt + 1} failed unexpectedly: {e}")
+        try:
+            logger.debug("Making Koios %s request to %s", method, path)
             
-            # Exponential backoff before retry (except on last attempt)
-            if attempt < self.retry_attempts - 1:
-                backoff_time = self.retry_backoff * (2 ** attempt)
-                logger.debug(f"Retrying in {backoff_time}s...")
-                time.sleep(backoff_time)
+            # The mounted adapter retries connection errors and 429/5xx responses
+            if method == 'GET':
+                response = self.session.get(url, timeout=self.timeout)
+            elif method == 'POST':
+                response = self.session.post(url, data=encode_json_bytes(data), headers=_JSON_HEADERS, timeout=self.timeout)
+            else:
+                raise ValueError(f"Unsupported HTTP method: {method}")
+            
+            if response.status_code == 200:
+                try:
+                    data = decode_json_bytes(response.content)
+                    logger.debug("Koios request successful, got %d item(s)", len(data) if isinstance(data, list) else 1)
+                    return APIResponse(success=True, data=data, status_code=200)
+                except ValueError as e:
+                    error_msg = f"Invalid JSON response: {e}"
+                    logger.error(error_msg)
+                    return APIResponse(success=False, error=error_msg, status_code=200)
+            
+            error_msg = f"HTTP {response.status_code}: {response.text}"
+            logger.error(f"Koios request failed after {self.retry_attempts} attempt(s): {error_msg}")
+            return APIResponse(success=False, error=error_msg, status_code=response.status_code)
+            
+        except requests.exceptions.Timeout:
+            last_error = f"Request timeout after {self.timeout}s"
+        except requests.exceptions.ConnectionError as e:
+            last_error = f"Connection error: {str(e)}"
+        except Exception as e:
+            last_error = f"Unexpected error: {str(e)}"
         
         logger.error(f"All {self.retry_attempts} attempts failed. Last error: {last_error}")
         return APIResponse(success=False, error=last_error)
@@ -527,53 +675,143 @@ class KoiosClient:
         Raises:
             Exception: If wallet assets cannot be fetched after all retries
         """
-        logger.info(f"Fetching assets for wallet: {wallet_address[:20]}...")
+        addr_short = wallet_address[:20]
+        logger.info(f"Fetching assets for wallet: {addr_short}...")
+        assets = self._fetch_address_assets_batch([wallet_address])[wallet_address]
+        logger.info(f"Found {len(assets)} assets for wallet {addr_short}...")
+        return assets
+    
+    def fetch_wallet_assets_many(self, wallet_addresses: List[str]) -> Dict[str, List[WalletAsset]]:
+        """
+        Fetch assets for several wallets
         
-        # Use Koios address_assets endpoint with correct format
+        Koios address_assets accepts an address array, so wallets are sent in
+        batches of up to _ADDRESS_BATCH_SIZE per POST (one round-trip for typical
+        wallet counts). Batches run concurrently on the pooled session; a batch
+        that fails falls back to per-wallet requests for its addresses.
+        
+        Args:
+            wallet_addresses: Cardano wallet addresses
+            
+        Returns:
+            Dictionary mapping wallet address to its WalletAsset list. Wallets
+            whose fetch failed are logged and omitted.
+        """
+        addresses = list(dict.fromkeys(wallet_addresses))
+        if not addresses:
+            return {}
+        
+        batches = [addresses[i:i + _ADDRESS_BATCH_SIZE] for i in range(0, len(addresses), _ADDRESS_BATCH_SIZE)]
+        results: Dict[str, List[WalletAsset]] = {}
+        retry_single: List[str] = []
+        
+        with ThreadPoolExecutor(max_workers=min(_MAX_WALLET_WORKERS, len(batches))) as ex:
+            futures = {ex.submit(self._fetch_address_assets_batch, batch): batch for batch in batches}
+            for fut in as_completed(futures):
+                try:
+                    results.update(fut.result())
+                except Exception as e:
+                    batch = futures[fut]
+                    logger.warning(f"Batched asset fetch for {len(batch)} wallet(s) failed, retrying per wallet: {e}")
+                    retry_single.extend(batch)
+        
+        if retry_single:
+            with ThreadPoolExecutor(max_workers=min(_MAX_WALLET_WORKERS, len(retry_single))) as ex:
+                futures = {ex.submit(self.fetch_wallet_assets, addr): addr for addr in retry_single}
+                for fut in as_completed(futures):
+                    addr = futures[fut]
+                    try:
+                        results[addr] = fut.result()
+                    except Exception as e:
+                        logger.error(f"Failed to fetch assets for wallet {addr[:20]}...: {e}")
+        
+        logger.info(f"Fetched assets for {len(results)}/{len(addresses)} wallets")
+        return results
+    
+    def _fetch_address_assets_batch(self, addresses: List[str]) -> Dict[str, List[WalletAsset]]:
+        """
+        Fetch assets for a batch of addresses in a single address_assets POST
+        
+        Args:
+            addresses: Cardano wallet addresses (one request)
+            
+        Returns:
+            Dictionary mapping every requested address to its WalletAsset list
+            (empty when Koios returned nothing for it)
+            
+        Raises:
+            Exception: If the request fails after all retries
+        """
         response = self._make_request(
             'address_assets',
             method='POST',
-            data={"_addresses": [wallet_address]}
+            data={"_addresses": addresses}
         )
 
         if not response.success:
             raise Exception(f"Failed to fetch wallet assets: {response.error}")
 
+        results: Dict[str, List[WalletAsset]] = {addr: [] for addr in addresses}
         raw_payload = response.data
         if not raw_payload:
-            logger.info(f"No assets found for wallet {wallet_address[:20]}...")
-            return []
+            logger.info(f"No assets found for {len(addresses)} wallet(s)")
+            return results
 
         # Determine response shape
-        assets_raw: List[dict] = []
-        try:
-            first = raw_payload[0] if isinstance(raw_payload, list) and raw_payload else None
-        except Exception:
-            first = None
+        first = _dig(raw_payload, 0) if isinstance(raw_payload, list) else None
 
-        shape = 'unknown'
         if first and isinstance(first, dict):
             if 'asset_list' in first:  # Address wrapped shape
-                shape = 'address_wrapped'
                 logger.debug('Detected Koios response shape: address_wrapped')
-                # Find the matching address entry (prefer exact address); fallback to first with asset_list
-                target_entry = None
+                fallback_entry = None
                 for entry in raw_payload:
-                    if isinstance(entry, dict) and entry.get('address') == wallet_address and entry.get('asset_list'):
-                        target_entry = entry
-                        break
-                    if not target_entry and isinstance(entry, dict) and entry.get('asset_list'):
-                        target_entry = entry
-                assets_raw = target_entry.get('asset_list', []) if target_entry else []
+                    if not isinstance(entry, dict) or not entry.get('asset_list'):
+                        continue
+                    addr = entry.get('address')
+                    if addr in results:
+                        results[addr] = self._parse_wallet_assets(entry['asset_list'])
+                    elif fallback_entry is None:
+                        fallback_entry = entry
+                # Single-address request: accept the entry even if Koios echoed a
+                # differently formatted address
+                if len(addresses) == 1 and not results[addresses[0]] and fallback_entry is not None:
+                    results[addresses[0]] = self._parse_wallet_assets(fallback_entry['asset_list'])
             elif 'policy_id' in first:  # Flat asset list shape
-                shape = 'flat_asset_list'
                 logger.debug('Detected Koios response shape: flat_asset_list')
-                assets_raw = raw_payload
+                if len(addresses) == 1:
+                    results[addresses[0]] = self._parse_wallet_assets(raw_payload)
+                else:
+                    raise Exception("Koios returned a flat asset list for a multi-address request")
             else:
                 logger.warning(f"Unrecognized Koios asset response keys: {list(first.keys())[:5]}")
         else:
             logger.warning("Unrecognized Koios asset response structure (non-dict first element)")
 
+        if not any(results.values()):
+            logger.warning(f"Parsed 0 assets from Koios payload size {len(raw_payload)} for {len(addresses)} wallet(s)")
+
+        return results
+    
+    @staticmethod
+    def _parse_wallet_assets(assets_raw: List[dict]) -> List[WalletAsset]:
+        """Parse Koios asset entries into WalletAsset objects, skipping malformed ones"""
+        # Fast path: well-formed payloads parse in one comprehension; any bad
+        # entry drops to the row-by-row loop below, which logs and skips it
+        try:
+            return [
+                WalletAsset(
+                    policy_id=a['policy_id'].lower(),
+                    asset_name=a.get('asset_name', ''),
+                    fingerprint=a.get('fingerprint', ''),
+                    decimals=a.get('decimals', 0) or 0,
+                    # Koios sometimes returns quantity as string
+                    quantity=int(a['quantity'])
+                )
+                for a in assets_raw
+            ]
+        except (KeyError, ValueError, TypeError, AttributeError):
+            pass
+        
         assets: List[WalletAsset] = []
         for asset_data in assets_raw:
             try:
@@ -592,13 +830,8 @@ class KoiosClient:
                 assets.append(asset)
             except (KeyError, ValueError, TypeError) as e:
                 logger.error(f"Failed to parse asset data: {e}")
-                logger.debug(f"Asset data: {asset_data}")
+                logger.debug("Asset data: %s", asset_data)
                 continue
-
-        if raw_payload and not assets:
-            logger.warning(f"Parsed 0 assets from Koios payload size {len(raw_payload)} (shape={shape}) for wallet {wallet_address[:20]}...")
-
-        logger.info(f"Found {len(assets)} assets for wallet {wallet_address[:20]}...")
         return assets
     
     def fetch_asset_metadata(self, policy_id: str, asset_name: str = '') -> Optional[Dict[str, Any]]:
@@ -612,7 +845,7 @@ class KoiosClient:
         Returns:
             Asset metadata dictionary or None if not found
         """
-        logger.debug(f"Fetching metadata for asset {policy_id}{asset_name}")
+        logger.debug("Fetching metadata for asset %s%s", policy_id, asset_name)
         
         # Use asset_info endpoint
         asset_identifier = policy_id + asset_name if asset_name else policy_id
@@ -662,11 +895,15 @@ class APIClientManager:
         """
         self.logger.info("Testing API connections...")
         
-        # Test Liqwid with simple query
+        # The two probes are independent; overlap their round-trips
+        with ThreadPoolExecutor(max_workers=2) as ex:
+            liqwid_fut = ex.submit(self.liqwid.ping)
+            koios_fut = ex.submit(self.koios._make_request, 'tip')
+        
+        # Test Liqwid with a trivial query (no market payload)
         liqwid_ok = False
         try:
-            markets = self.liqwid.fetch_markets()
-            liqwid_ok = len(markets) >= 0  # Even empty response is OK
+            liqwid_ok = liqwid_fut.result()
             self.logger.info(f"Liqwid connection: {'OK' if liqwid_ok else 'FAILED'}")
         except Exception as e:
             self.logger.error(f"Liqwid connection failed: {e}")
@@ -674,10 +911,31 @@ class APIClientManager:
         # Test Koios with info endpoint (no wallet needed)
         koios_ok = False
         try:
-            response = self.koios._make_request('tip')
+            response = koios_fut.result()
             koios_ok = response.success
             self.logger.info(f"Koios connection: {'OK' if koios_ok else 'FAILED'}")
         except Exception as e:
             self.logger.error(f"Koios connection failed: {e}")
         
         return liqwid_ok, koios_ok
+    
+    def fetch_markets_and_prices(self, symbols: List[str]) -> Tuple[List[Market], Dict[str, PricePoint]]:
+        """
+        Fetch Liqwid markets and asset prices concurrently
+        
+        Both GraphQL queries share the client's pooled session, so issuing them
+        from two threads costs roughly one round-trip instead of two.
+        
+        Args:
+            symbols: Asset symbols to fetch prices for
+            
+        Returns:
+            Tuple of (markets, prices keyed by symbol)
+            
+        Raises:
+            Exception: If markets cannot be fetched (see LiqwidClient.fetch_markets)
+        """
+        with ThreadPoolExecutor(max_workers=2) as ex:
+            markets_fut = ex.submit(self.liqwid.fetch_markets)
+            prices_fut = ex.submit(self.liqwid.fetch_asset_prices, symbols)
+            return markets_fut.result(), prices_fut.result()
@@ -3,12 +3,24 @@
 import logging
 from .colored_logging import setup_colored_logging
 
-def get_logger(name: str) -> logging.Logger:
-    logger = logging.getLogger(name)
-    if not logger.handlers:
+# Root logger is configured at most once per process; named loggers propagate to it
+_configured = False
+
+
+def _configure_root() -> None:
+    global _configured
+    if _configured:
+        return
+    _configured = True
+    # Leave an already configured root (entry point, tests) untouched
+    if not logging.getLogger().handlers:
         setup_colored_logging(
             level=logging.INFO,
             fmt='%(asctime)s - %(levelname)s - [%(name)s:%(module)s.%(funcName)s:%(lineno)d] - %(message)s',
             datefmt='%Y-%m-%d %H:%M:%S'
         )
-    return logger
+
+
+def get_logger(name: str) -> logging.Logger:
+    _configure_root()
+    return logging.getLogger(name)
@@ -5,12 +5,118 @@ Domain Models for Liqwid Client Aggregator
 Defines core data structures for time series aggregation and reporting.
 """
 
-from dataclasses import dataclass, field
-from datetime import datetime, timezone
-from typing import Dict, Optional
+from collections.abc import Mapping
+from dataclasses import dataclass, field, fields
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
 
+import numpy as np
 
-@dataclass
+from .utils import timestamps_to_datetimes
+
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_ONE_MICROSECOND = timedelta(microseconds=1)
+_UTC = timezone.utc
+
+
+def _utc_now() -> datetime:
+    return datetime.now(_UTC)
+
+
+def _cache_field_names(cls):
+    """
+    Class decorator (applied above @dataclass) adding a cached field-name tuple
+    
+    Stores cls._field_names once and adds to_dict(), a shallow field -> value
+    mapping that avoids dataclasses.asdict's per-call field introspection and
+    recursive deepcopy. Container values are shared, not copied.
+    """
+    names = tuple(f.name for f in fields(cls))
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in names}
+    
+    cls._field_names = names
+    cls.to_dict = to_dict
+    return cls
+
+
+class SortedSeries(Mapping):
+    """
+    Read-only timestamp -> value mapping backed by parallel arrays
+    
+    Stores epoch-millisecond timestamps (int64) and values (float64) as two
+    NumPy arrays sorted by timestamp, and behaves like the Dict[datetime, float]
+    it stands in for. Point lookups use a binary search; datetime keys are only
+    materialized when the mapping is iterated.
+    """
+    
+    def __init__(self, ts_ms: np.ndarray, vals: np.ndarray):
+        ts = np.asarray(ts_ms, dtype=np.int64)
+        v = np.asarray(vals, dtype=np.float64)
+        if ts.shape != v.shape or ts.ndim != 1:
+            raise ValueError("ts_ms and vals must be 1-D arrays of the same length")
+        if ts.size > 1:
+            # SQL results arrive ORDER BY ts ASC; only sort when they do not
+            if np.any(ts[1:] < ts[:-1]):
+                order = np.argsort(ts, kind="stable")
+                ts = ts[order]
+                v = v[order]
+            # Duplicate timestamps: keep the last value, as dict assignment would
+            keep = np.ones(ts.size, dtype=bool)
+            keep[:-1] = ts[1:] != ts[:-1]
+            if not keep.all():
+                ts = ts[keep]
+                v = v[keep]
+        self.ts_ms = ts
+        self.vals = v
+        self._keys: Optional[List[datetime]] = None
+    
+    def _datetimes(self) -> List[datetime]:
+        if self._keys is None:
+            self._keys = timestamps_to_datetimes(self.ts_ms)
+        return self._keys
+    
+    def timestamps64(self) -> np.ndarray:
+        """Zero-copy datetime64[ms] (UTC) view of the timestamps"""
+        return self.ts_ms.view("datetime64[ms]")
+    
+    @staticmethod
+    def _key_to_ms(key: Any) -> Optional[int]:
+        # Naive datetimes never equal the tz-aware keys, mirroring dict semantics
+        if not isinstance(key, datetime) or key.tzinfo is None:
+            return None
+        us = (key - _EPOCH) // _ONE_MICROSECOND
+        if us % 1000:
+            return None
+        return us // 1000
+    
+    def __getitem__(self, key: datetime) -> float:
+        ms = self._key_to_ms(key)
+        if ms is not None:
+            i = int(np.searchsorted(self.ts_ms, ms))
+            if i < self.ts_ms.size and self.ts_ms[i] == ms:
+                return float(self.vals[i])
+        raise KeyError(key)
+    
+    def __iter__(self) -> Iterator[datetime]:
+        return iter(self._datetimes())
+    
+    def __len__(self) -> int:
+        return int(self.ts_ms.size)
+    
+    def values(self) -> List[float]:  # type: ignore[override]
+        return self.vals.tolist()
+    
+    def items(self) -> List[Tuple[datetime, float]]:  # type: ignore[override]
+        return list(zip(self._datetimes(), self.vals.tolist()))
+    
+    def __repr__(self) -> str:
+        return f"SortedSeries(points={len(self.ts_ms)})"
+
+
+@dataclass(frozen=True, slots=True, eq=False)
 class TimePointAssetValue:
     """
     Represents asset values at a specific timestamp
@@ -21,7 +127,8 @@ class TimePointAssetValue:
     values: Dict[str, float]  # asset_symbol -> usd_value
 
 
-@dataclass
+@_cache_field_names
+@dataclass(slots=True)
 class AggregatedRow:
     """
     Represents a complete aggregated row for output
@@ -33,7 +140,54 @@ class AggregatedRow:
     total: float
 
 
-@dataclass
+@dataclass(slots=True)
+class AggregatedFrame:
+    """
+    Column-oriented aggregation result (structure of arrays)
+    
+    values[i, j] is the USD value of symbols[j] at timestamps[i] and totals[i]
+    the sum over the row. NaN marks a missing point when gaps are not filled
+    with zero. Replaces one AggregatedRow (plus its dict) per timestamp.
+    """
+    timestamps: List[datetime]
+    symbols: Tuple[str, ...]
+    values: np.ndarray  # shape (T, A), float64
+    totals: np.ndarray  # shape (T,), float64
+    
+    def __len__(self) -> int:
+        return len(self.timestamps)
+    
+    def asset_index(self) -> Dict[str, int]:
+        """Map asset symbol to its column in values"""
+        return {sym: j for j, sym in enumerate(self.symbols)}
+    
+    @classmethod
+    def from_rows(cls, rows: List["AggregatedRow"]) -> "AggregatedFrame":
+        """Build a frame from row objects (assets missing from a row become NaN)"""
+        symbols = tuple(sorted({sym for row in rows for sym in row.asset_values}))
+        values = np.full((len(rows), len(symbols)), np.nan)
+        index = {sym: j for j, sym in enumerate(symbols)}
+        for i, row in enumerate(rows):
+            for sym, value in row.asset_values.items():
+                values[i, index[sym]] = value
+        totals = np.array([row.total for row in rows], dtype=np.float64)
+        return cls([row.timestamp for row in rows], symbols, values, totals)
+    
+    def to_rows(self) -> List["AggregatedRow"]:
+        """Materialize AggregatedRow objects for row-oriented consumers"""
+        symbols = self.symbols
+        return [
+            AggregatedRow(
+                timestamp=ts,
+                asset_values={sym: v for sym, v in zip(symbols, row_vals) if v == v},  # skip NaN
+                total=total,
+            )
+            for ts, row_vals, total in zip(self.timestamps, self.values.tolist(), self.totals.tolist())
+        ]
+
+
+@_cache_field_names
+@dataclass(slots=True)
 class GainsRow:
     """
     Represents gains data at a specific timestamp
@@ -48,7 +202,7 @@ class GainsRow:
     reference_value: float = 0.0  # Base value for percentage calculations
 
 
-@dataclass
+@dataclass(slots=True)
 class GainStats:
     """
     Statistics for all-time gains calculation
@@ -66,7 +220,7 @@ class GainStats:
             raise ValueError("initial_total cannot be negative")
 
 
-@dataclass
+@dataclass(slots=True)
 class AssetTimeSeries:
     """
     Time series data for a single asset
@@ -74,15 +228,46 @@ class AssetTimeSeries:
     Maps timestamps to USD values for aggregation processing
     """
     asset_symbol: str
-    series: Dict[datetime, float]  # timestamp -> usd_value
+    series: Union[Dict[datetime, float], SortedSeries]  # timestamp -> usd_value
     
     def __post_init__(self):
         """Validate asset symbol is non-empty"""
         if not self.asset_symbol or not self.asset_symbol.strip():
             raise ValueError("asset_symbol cannot be empty")
+    
+    @classmethod
+    def from_arrays(cls, asset_symbol: str, ts_ms: np.ndarray, vals: np.ndarray) -> "AssetTimeSeries":
+        """Build a series from epoch-ms timestamps and values without per-point boxing"""
+        return cls(asset_symbol=asset_symbol, series=SortedSeries(ts_ms, vals))
+    
+    def as_arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Return (ts_ms int64, values float64) arrays for vectorized consumers
+        
+        Array-backed series are returned as-is; dict-backed series are converted
+        in timestamp order.
+        """
+        if isinstance(self.series, SortedSeries):
+            return self.series.ts_ms, self.series.vals
+        keys = sorted(self.series)
+        ts_ms = np.array([int(round(k.timestamp() * 1000)) for k in keys], dtype=np.int64)
+        vals = np.array([self.series[k] for k in keys], dtype=np.float64)
+        return ts_ms, vals
+    
+    def sorted_points(self) -> Tuple[List[datetime], List[float]]:
+        """
+        Return (timestamps, values) in timestamp order
+        
+        Array-backed series already hold sorted parallel arrays, so this avoids
+        the sort-then-lookup-each-key pattern (one binary search per point).
+        """
+        if isinstance(self.series, SortedSeries):
+            return list(self.series._datetimes()), self.series.vals.tolist()
+        keys = sorted(self.series)
+        return keys, [float(self.series[k]) for k in keys]
 
 
-@dataclass
+@dataclass(slots=True)
 class ProcessingStats:
     """
     Statistics about the data processing operation
@@ -102,7 +287,8 @@ class ProcessingStats:
             raise ValueError("Counts cannot be negative")
 
 
-@dataclass
+@_cache_field_names
+@dataclass(slots=True)
 class Transaction:
     """
     Represents a deposit or withdrawal transaction
@@ -117,7 +303,9 @@ class Transaction:
     amount: float  # Positive for deposits, negative for withdrawals
     transaction_type: str  # 'deposit' or 'withdrawal'
     notes: Optional[str] = None
-    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    # Bookkeeping only: excluded from equality so identical transactions compare equal
+    # Batch producers should pass one shared created_at rather than rely on the default
+    created_at: datetime = field(default_factory=_utc_now, compare=False, repr=False)
     
     def __post_init__(self):
         """Validate transaction data"""
@@ -141,7 +329,7 @@ class Transaction:
             raise ValueError("withdrawal amount must be negative")
 
 
-@dataclass
+@dataclass(frozen=True, slots=True, eq=False)
 class WalletBreakdown:
     """
     Per-wallet Wmax breakdown for multi-wallet asset decisions
@@ -152,6 +340,7 @@ class WalletBreakdown:
     wallet_address: str
     wmax_usd: float
     v_t1_usd: float
+    _abbrev: str = field(init=False, repr=False)
     
     def abbreviated_address(self) -> str:
         """
@@ -161,13 +350,12 @@ class WalletBreakdown:
         Returns:
             Abbreviated address string, or full address if <= 17 chars
         """
-        if len(self.wallet_address) <= 17:
-            return self.wallet_address
-        return f"{self.wallet_address[:11]}...{self.wallet_address[-6:]}"
+        return self._abbrev
     
     def __post_init__(self):
-        """Validate wallet breakdown data"""
-        if not self.wallet_address or not self.wallet_address.strip():
+        """Validate wallet breakdown data and precompute the abbreviated address"""
+        addr = self.wallet_address
+        if not addr or not addr.strip():
             raise ValueError("wallet_address cannot be empty")
         
         if self.wmax_usd < 0:
@@ -175,9 +363,13 @@ class WalletBreakdown:
 
         if self.v_t1_usd < 0:
             raise ValueError("v_t1_usd cannot be negative")
+        
+        # Frozen dataclass: derived state is set through object.__setattr__
+        object.__setattr__(self, '_abbrev', addr if len(addr) <= 17 else f"{addr[:11]}...{addr[-6:]}")
 
 
-@dataclass
+@_cache_field_names
+@dataclass(slots=True)
 class AdjustedSupplyPosition:
     """
     Supply position adjusted for deposits/withdrawals using correct formula
@@ -207,11 +399,69 @@ class AdjustedSupplyPosition:
             
         if self.cumulative_withdrawals > 0:
             raise ValueError("cumulative_withdrawals must be negative or zero")
+    
+    @classmethod
+    def from_validated(
+        cls,
+        timestamp: datetime,
+        asset_symbol: str,
+        raw_position: float,
+        cumulative_deposits: float,
+        cumulative_withdrawals: float,
+        adjusted_position: float,
+        net_gain: float,
+    ) -> "AdjustedSupplyPosition":
+        """
+        Build an instance without re-running __post_init__ checks
+        
+        Only for batch producers that already passed the same values through
+        validate_arrays; every other caller should use the constructor.
+        """
+        self = object.__new__(cls)
+        self.timestamp = timestamp
+        self.asset_symbol = asset_symbol
+        self.raw_position = raw_position
+        self.cumulative_deposits = cumulative_deposits
+        self.cumulative_withdrawals = cumulative_withdrawals
+        self.adjusted_position = adjusted_position
+        self.net_gain = net_gain
+        return self
+    
+    @staticmethod
+    def validate_arrays(
+        asset_symbol: str,
+        raw_positions: Any,
+        cumulative_deposits: Any,
+        cumulative_withdrawals: Any,
+    ) -> None:
+        """
+        Validate a batch of adjusted-position fields in one vectorized pass
+        
+        Args:
+            asset_symbol: Asset symbol shared by the batch
+            raw_positions: Raw position values
+            cumulative_deposits: Cumulative deposits (must be >= 0)
+            cumulative_withdrawals: Cumulative withdrawals as stored (must be <= 0)
+            
+        Raises:
+            ValueError: On the first violated invariant
+        """
+        if not asset_symbol or not asset_symbol.strip():
+            raise ValueError("asset_symbol cannot be empty")
+            
+        if np.any(np.asarray(raw_positions, dtype=np.float64) < 0):
+            raise ValueError("raw_position cannot be negative")
+            
+        if np.any(np.asarray(cumulative_deposits, dtype=np.float64) < 0):
+            raise ValueError("cumulative_deposits cannot be negative")
+            
+        if np.any(np.asarray(cumulative_withdrawals, dtype=np.float64) > 0):
+            raise ValueError("cumulative_withdrawals must be negative or zero")
 
 
 # ===== Additional dataclasses used by API clients =====
 
-@dataclass
+@dataclass(frozen=True, slots=True, eq=False)
 class Market:
     """Liqwid market metadata used by GraphQL client"""
     id: str
@@ -225,7 +475,7 @@ class Market:
     exchange_rate: Optional[float] = None
 
 
-@dataclass
+@dataclass(frozen=True, slots=True, eq=False)
 class PricePoint:
     """Simple price point for an asset symbol"""
     symbol: str
@@ -233,7 +483,7 @@ class PricePoint:
     timestamp: datetime
 
 
-@dataclass
+@dataclass(frozen=True, slots=True, eq=False)
 class WalletAsset:
     """Koios wallet asset entry used by Koios client"""
     policy_id: str
@@ -9,8 +9,15 @@ Resolves a user-provided asset identifier into a canonical pair
 """
 from __future__ import annotations
 
-from typing import Optional, Tuple, Dict, Any, List
+from typing import Optional, Sequence, Tuple, Dict, Any, List
 import logging
+import time
+
+UNIFIED_TABLE = "liqwid_supply_positions"
+# Row cap for the unified index scan; keys beyond it are looked up with a WHERE
+UNIFIED_SCAN_LIMIT = 500
+# Shared result for empty/unparseable responses (callers only iterate or index-check)
+_EMPTY_ROWS: Tuple[Tuple[Any, ...], ...] = ()
 
 
 class Resolver:
@@ -24,9 +31,224 @@ class Resolver:
         self.greptime_reader = greptime_reader
         self.liqwid_client = liqwid_client
         self.cache = cache if cache is not None else {}
+        # (monotonic time, lowercased basename -> table name) from SHOW TABLES
+        self._tables_cache: Optional[Tuple[float, Dict[str, str]]] = None
+        self._tables_ttl = 60.0
+        # (monotonic time, unified table name, lowercased key -> (market_id, asset_symbol), truncated)
+        self._index_cache: Optional[Tuple[float, str, Dict[str, Tuple[str, str]], bool]] = None
+        # (monotonic time, asset list, lowercased key -> (market_id, asset_symbol)) from per-asset probes
+        self._probe_cache: Optional[Tuple[float, Tuple[str, ...], Dict[str, Tuple[str, str]]]] = None
         self.logger.info("Initialized Resolver — Greptime-first strategy enabled; Liqwid fallback when provided")
 
+    def _parse_rows(self, result: Dict[str, Any], expected: List[str]) -> Sequence[Tuple[Any, ...]]:
+        """Safe parse into tuples ordered like expected, via GreptimeReader's row iterator if available"""
+        try:
+            if self.greptime_reader and hasattr(self.greptime_reader, "_iter_rows"):
+                return list(self.greptime_reader._iter_rows(result, expected))  # type: ignore[attr-defined]
+        except Exception:
+            pass
+
+        # Fallback minimal parser
+        outputs = result.get("output") if isinstance(result, dict) else None
+        if not outputs:
+            return _EMPTY_ROWS
+        rows_out: List[Tuple[Any, ...]] = []
+        try:
+            for block in outputs:
+                recs = block.get("records", {}) if isinstance(block, dict) else {}
+                schema = recs.get("schema", {})
+                cols = schema.get("column_schemas", [])
+                name_to_idx: Dict[str, int] = {}
+                for i, col in enumerate(cols):
+                    nm = col.get("name", f"col_{i}")
+                    name_to_idx[nm] = i
+                # Resolve expected columns to positions once per block, not per row
+                positions = [name_to_idx.get(col, -1) for col in expected]
+                rows = recs.get("rows", [])
+                rows_out.extend(
+                    tuple(row[idx] if 0 <= idx < len(row) else None for idx in positions)
+                    for row in rows
+                )
+        except Exception:
+            return _EMPTY_ROWS
+        return rows_out
+
+    def _get_tables(self) -> Dict[str, str]:
+        """
+        Map lowercased table basenames to table names as listed by SHOW TABLES
+        
+        Built at most once per TTL window so repeated resolves do not rescan
+        (and re-split) the whole table list.
+        """
+        now = time.monotonic()
+        cached = self._tables_cache
+        if cached is not None and now - cached[0] < self._tables_ttl:
+            return cached[1]
+
+        reader = self.greptime_reader
+        if hasattr(reader, "_show_tables"):
+            names = reader._show_tables()  # type: ignore[attr-defined]
+            if names is None:
+                # Listing failed server-side; do not cache it as "no tables"
+                return {}
+        else:
+            show = reader._execute_sql("SHOW TABLES")  # type: ignore[attr-defined]
+            names = [row[0] for row in self._parse_rows(show, ["Tables"])]
+
+        tables: Dict[str, str] = {}
+        for t in names:
+            if isinstance(t, str):
+                tables.setdefault(t.rsplit(".", 1)[-1].strip().lower(), t)
+        self._tables_cache = (now, tables)
+        return tables
+
+    @staticmethod
+    def _unified_pair(row: Tuple[Any, ...]) -> Optional[Tuple[str, Tuple[str, ...]]]:
+        """Return ((market_id, asset_symbol), lowercased keys) for a (market_id, market_name, asset_symbol) row, or None"""
+        market_id = str(row[0] or "").strip()
+        market_name = str(row[1] or "").strip()
+        asset_symbol = str(row[2] or "").strip().lower()
+        if not market_id and not market_name:
+            return None
+        return (market_id or market_name, asset_symbol), (market_id.lower(), market_name.lower(), asset_symbol)
+
+    def _unified_index(self, table_name: str) -> Tuple[Dict[str, Tuple[str, str]], bool]:
+        """
+        Inverted index over the unified mapping table
+        
+        Maps each lowercased market_id, market_name and asset_symbol to its
+        (market_id, asset_symbol) pair; the first row claiming a key wins, as
+        the row scan did. Built from one SELECT DISTINCT per TTL window instead
+        of one query plus a row scan per resolve.
+        
+        Returns:
+            (index, truncated) where truncated means the scan hit UNIFIED_SCAN_LIMIT
+        
+        Raises:
+            Exception: Propagates query failures (nothing is cached)
+        """
+        now = time.monotonic()
+        cached = self._index_cache
+        if cached is not None and cached[1] == table_name and now - cached[0] < self._tables_ttl:
+            return cached[2], cached[3]
+
+        result = self.greptime_reader._execute_sql(  # type: ignore[union-attr]
+            f"SELECT DISTINCT market_id, market_name, asset_symbol FROM {table_name} LIMIT {UNIFIED_SCAN_LIMIT}"
+        )
+        rows = self._parse_rows(result, ["market_id", "market_name", "asset_symbol"])
+        index: Dict[str, Tuple[str, str]] = {}
+        for row in rows:
+            entry = self._unified_pair(row)
+            if entry is None:
+                continue
+            pair, names = entry
+            for name in names:
+                if name:
+                    index.setdefault(name, pair)
+        truncated = len(rows) >= UNIFIED_SCAN_LIMIT
+        self._index_cache = (now, table_name, index, truncated)
+        return index, truncated
+
+    def _unified_lookup(self, table_name: str, key_lower: str) -> Optional[Tuple[str, str]]:
+        """
+        Look a single key up in the unified mapping table with a server-side filter
+        
+        Used when the index scan was truncated. Greptime's HTTP SQL API has no
+        bound parameters, so the key is passed as an escaped string literal.
+        """
+        literal = "'" + key_lower.replace("'", "''") + "'"
+        result = self.greptime_reader._execute_sql(  # type: ignore[union-attr]
+            f"SELECT market_id, market_name, asset_symbol FROM {table_name} "
+            f"WHERE LOWER(market_id) = {literal} OR LOWER(market_name) = {literal} "
+            f"OR LOWER(asset_symbol) = {literal} LIMIT 1"
+        )
+        for row in self._parse_rows(result, ["market_id", "market_name", "asset_symbol"]):
+            entry = self._unified_pair(row)
+            if entry is not None:
+                return entry[0]
+        return None
+
+    def _asset_probe_index(self, assets: Tuple[str, ...]) -> Dict[str, Tuple[str, str]]:
+        """
+        Map lowercased symbol, market_id and market_name of each asset table to its pair
+        
+        The first asset (in discovery order) claiming a key wins. A batched probe
+        result is kept for the TTL window per asset list, so later misses reuse
+        the parsed index instead of rebuilding, re-sending and re-parsing the
+        UNION ALL query; per-table fallback results are not cached.
+        """
+        now = time.monotonic()
+        cached = self._probe_cache
+        if cached is not None and cached[1] == assets and now - cached[0] < self._tables_ttl:
+            return cached[2]
+
+        cacheable = True
+        try:
+            probes = self._probe_asset_tables(list(assets))
+        except Exception:
+            # e.g. one table lacks market_name; probe tables one by one
+            probes = [p for p in map(self._probe_asset_table, assets) if p is not None]
+            cacheable = False
+        by_key: Dict[str, Tuple[str, str]] = {}
+        for symbol, market_id, market_name in probes:
+            symbol_lower = symbol.lower()
+            pair = (market_id or market_name or symbol.upper(), symbol_lower)
+            for name in (symbol_lower, market_id.lower(), market_name.lower()):
+                by_key.setdefault(name, pair)
+        if cacheable:
+            self._probe_cache = (now, assets, by_key)
+        return by_key
+
+    def _probe_asset_tables(self, assets: List[str]) -> List[Tuple[str, str, str]]:
+        """
+        Read one (symbol, market_id, market_name) row per asset table in one round-trip
+        
+        Raises:
+            Exception: Propagates query failures, e.g. when any table lacks a column
+        """
+        selects = []
+        for symbol in assets:
+            table = self.greptime_reader._get_table_name(symbol)  # type: ignore[union-attr]
+            literal = symbol.replace("'", "''")
+            selects.append(f"(SELECT '{literal}' AS symbol, market_id, market_name FROM {table} LIMIT 1)")
+        result = self.greptime_reader._execute_sql(" UNION ALL ".join(selects))  # type: ignore[union-attr]
+        rows = self._parse_rows(result, ["symbol", "market_id", "market_name"])
+        # Keep discovery order regardless of the order branches come back in
+        by_sym = {str(row[0]): row for row in rows}
+        return [
+            (symbol, str(row[1] or "").strip(), str(row[2] or "").strip())
+            for symbol in assets
+            if (row := by_sym.get(symbol)) is not None
+        ]
+
+    def _probe_asset_table(self, symbol: str) -> Optional[Tuple[str, str, str]]:
+        """Per-table probe for (symbol, market_id, market_name); None if empty or failing"""
+        try:
+            table = self.greptime_reader._get_table_name(symbol)  # type: ignore[union-attr]
+            # Prefer both market_id and market_name if available
+            result = self.greptime_reader._execute_sql(
+                f"SELECT market_id, market_name FROM {table} LIMIT 1"
+            )  # type: ignore[union-attr]
+            rows = self._parse_rows(result, ["market_id", "market_name"])
+            if not rows:
+                # Try only market_id if market_name missing
+                result = self.greptime_reader._execute_sql(
+                    f"SELECT market_id FROM {table} LIMIT 1"
+                )  # type: ignore[union-attr]
+                rows = [(row[0], None) for row in self._parse_rows(result, ["market_id"])]
+        except Exception:
+            return None
+        if not rows:
+            return None
+        market_id, market_name = rows[0]
+        return symbol, str(market_id or "").strip(), str(market_name or "").strip()
+
     def resolve_asset(self, input_str: str) -> Tuple[str, str]:
+        # Fast path: cache keys are already normalized, so an exact hit skips str/strip/lower
+        hit = self.cache.get(input_str) if isinstance(input_str, str) else None
+        if hit is not None:
+            return hit
+
         if not input_str or not str(input_str).strip():
             raise ValueError("input_str cannot be empty")
 
@@ -37,113 +259,42 @@ class Resolver:
         if key_lower in self.cache:
             return self.cache[key_lower]
 
-        # Helper: safe parse using GreptimeReader's parser if available
-        def parse_result(result: Dict[str, Any], expected: List[str]) -> List[Dict[str, Any]]:
-            try:
-                if self.greptime_reader and hasattr(self.greptime_reader, "_parse_query_response"):
-                    return self.greptime_reader._parse_query_response(result, expected)  # type: ignore[attr-defined]
-            except Exception:
-                pass
-
-            # Fallback minimal parser
-            records_out: List[Dict[str, Any]] = []
-            try:
-                outputs = result.get("output", []) if isinstance(result, dict) else []
-                for block in outputs:
-                    recs = block.get("records", {}) if isinstance(block, dict) else {}
-                    schema = recs.get("schema", {})
-                    cols = schema.get("column_schemas", [])
-                    name_to_idx: Dict[str, int] = {}
-                    for i, col in enumerate(cols):
-                        nm = col.get("name", f"col_{i}")
-                        name_to_idx[nm] = i
-                    rows = recs.get("rows", [])
-                    for row in rows:
-                        rec: Dict[str, Any] = {}
-                        for col in expected:
-                            idx = name_to_idx.get(col)
-                            rec[col] = row[idx] if idx is not None and idx < len(row) else None
-                        records_out.append(rec)
-            except Exception:
-                return []
-            return records_out
-
         # 1) Greptime-first strategy
         if self.greptime_reader and hasattr(self.greptime_reader, "_execute_sql"):
-            # 1a) Check unified table presence via SHOW TABLES first
-            unified_exists = False
-            unified_table_name = "liqwid_supply_positions"
+            # 1a) Check unified table presence via (cached) SHOW TABLES first
+            unified_table_name = None
             try:
-                if hasattr(self.greptime_reader, "_show_tables"):
-                    table_names = self.greptime_reader._show_tables()  # type: ignore[attr-defined]
-                    for t in table_names:
-                        base = str(t).split(".")[-1].strip().lower()
-                        if base == "liqwid_supply_positions":
-                            unified_exists = True
-                            unified_table_name = str(t)
-                            break
-                else:
-                    show = self.greptime_reader._execute_sql("SHOW TABLES")  # type: ignore[attr-defined]
-                    tables = set()
-                    for rec in parse_result(show, ["Tables"]):
-                        t = rec.get("Tables")
-                        if isinstance(t, str):
-                            tables.add(t)
-                    if "liqwid_supply_positions" in tables:
-                        unified_exists = True
+                unified_table_name = self._get_tables().get(UNIFIED_TABLE)
             except Exception:
-                unified_exists = False
+                pass
+            unified_exists = unified_table_name is not None
 
             # 1b) Try unified mapping only if present
             if unified_exists:
                 try:
-                    result = self.greptime_reader._execute_sql(
-                        f"SELECT DISTINCT market_id, market_name, asset_symbol FROM {unified_table_name} LIMIT 500"
-                    )  # type: ignore[attr-defined]
-                    rows = parse_result(result, ["market_id", "market_name", "asset_symbol"]) or []
-                    for rec in rows:
-                        market_id = str(rec.get("market_id") or "").strip()
-                        market_name = str(rec.get("market_name") or "").strip()
-                        asset_symbol = str(rec.get("asset_symbol") or "").strip().lower()
-                        if not market_id and not market_name:
-                            continue
-                        if key_lower in {market_id.lower(), market_name.lower(), asset_symbol.lower()}:
-                            self.cache[key_lower] = (market_id or market_name, asset_symbol)
-                            return self.cache[key_lower]
+                    index, truncated = self._unified_index(unified_table_name)
+                    hit = index.get(key_lower)
+                    if hit is None and truncated:
+                        hit = self._unified_lookup(unified_table_name, key_lower)
+                    if hit is not None:
+                        self.cache[key_lower] = hit
+                        return hit
                 except Exception:
                     # If unified query fails, fall through to per-asset discovery
                     pass
 
-            # 1c) Iterate per-asset tables discovered via SHOW TABLES
+            # 1c) Probe per-asset tables discovered via SHOW TABLES
             try:
                 # Discover asset symbols
                 assets = []
                 if hasattr(self.greptime_reader, "discover_asset_tables"):
                     assets = self.greptime_reader.discover_asset_tables()  # type: ignore[attr-defined]
                 # If discovery failed/empty, no assumptions; stop here for Greptime path
-                for symbol in assets:
-                    table = self.greptime_reader._get_table_name(symbol)  # type: ignore[attr-defined]
-                    try:
-                        # Prefer both market_id and market_name if available
-                        result = self.greptime_reader._execute_sql(
-                            f"SELECT market_id, market_name FROM {table} LIMIT 1"
-                        )  # type: ignore[attr-defined]
-                        rows = parse_result(result, ["market_id", "market_name"]) or []
-                        if not rows:
-                            # Try only market_id if market_name missing
-                            result = self.greptime_reader._execute_sql(
-                                f"SELECT market_id FROM {table} LIMIT 1"
-                            )  # type: ignore[attr-defined]
-                            rows = parse_result(result, ["market_id"]) or []
-                        if rows:
-                            rec = rows[0]
-                            market_id = str(rec.get("market_id") or "").strip()
-                            market_name = str(rec.get("market_name") or "").strip()
-                            if key_lower in {symbol.lower(), market_id.lower(), market_name.lower()}:
-                                self.cache[key_lower] = (market_id or market_name or symbol.upper(), symbol.lower())
-                                return self.cache[key_lower]
-                    except Exception:
-                        continue
+                if assets:
+                    hit = self._asset_probe_index(tuple(assets)).get(key_lower)
+                    if hit is not None:
+                        self.cache[key_lower] = hit
+                        return hit
             except Exception:
                 pass
 
@@ -156,8 +307,12 @@ class Resolver:
                         market_id = getattr(m, "id", "") or getattr(m, "symbol", "") or ""
                         display_name = getattr(m, "name", "") or getattr(m, "displayName", "") or ""
                         asset_symbol = getattr(m, "underlying_symbol", "") or getattr(getattr(m, "asset", None), "symbol", "") or ""
-                        if key_lower in {str(market_id).lower(), str(display_name).lower(), str(asset_symbol).lower()}:
-                            asset_symbol_norm = str(asset_symbol).strip().lower()
+                        symbol_lower = str(asset_symbol).lower()
+                        # Plain equality chain: no per-market set or eager lowering of every field
+                        if (key_lower == symbol_lower
+                                or key_lower == str(market_id).lower()
+                                or key_lower == str(display_name).lower()):
+                            asset_symbol_norm = symbol_lower.strip()
                             if not asset_symbol_norm:
                                 continue
                             self.cache[key_lower] = (str(market_id), asset_symbol_norm)
@@ -5,14 +5,68 @@ Utility Functions for Liqwid Client Aggregator
 Shared helpers for logging, time handling, and data processing.
 """
 
+import atexit
+import json
 import logging
+import queue
+import random
+import re
+import sys
 import time
-from datetime import datetime, timezone
+from functools import lru_cache
+from itertools import repeat
+from logging.handlers import QueueHandler, QueueListener
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Optional, List, Callable, Any, Dict
+from typing import Optional, List, Callable, Any, Dict, Iterable
+
+import numpy as np
+
 from .colored_logging import ColoredFormatter
-from typing import Optional, Dict, Any
-from pathlib import Path
+
+try:
+    import orjson as _orjson
+except ImportError:  # Optional speedup; the stdlib decoder is used otherwise
+    _orjson = None
+
+# JSONDecoder is stateless, so one instance serves every call (and thread)
+_JSON_DECODER = json.JSONDecoder()
+
+
+# Accepted string formats, tried in order when the fast path does not apply
+_DATETIME_FORMATS = (
+    "%Y-%m-%dT%H:%M:%SZ",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%d",
+)
+
+
+# Zero-padded shapes of _DATETIME_FORMATS that fromisoformat parses identically
+_ISO_FAST_RE = re.compile(r"[0-9]{4}-[0-9]{2}-[0-9]{2}(?:T[0-9]{2}:[0-9]{2}:[0-9]{2}Z?| [0-9]{2}:[0-9]{2}:[0-9]{2})?")
+
+
+@lru_cache(maxsize=4096)
+def _parse_datetime_str(value: str) -> datetime:
+    """
+    Parse one of _DATETIME_FORMATS (memoized; row timestamps repeat across assets)
+    
+    Canonical zero-padded inputs go through the C-level fromisoformat; anything
+    else falls back to strptime, which keeps its exact acceptance rules.
+    """
+    if _ISO_FAST_RE.fullmatch(value):
+        try:
+            return datetime.fromisoformat(value[:-1] if value.endswith("Z") else value)
+        except ValueError:
+            pass  # e.g. day out of range; strptime raises the same way below
+    
+    for fmt in _DATETIME_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    
+    raise ValueError(f"Invalid datetime format: {value}. Expected ISO format like '2025-02-01T00:00:00Z'")
 
 
 def parse_datetime(value: Any) -> Optional[datetime]:
@@ -35,25 +89,15 @@ def parse_datetime(value: Any) -> Optional[datetime]:
         return value
     
     if isinstance(value, str):
-        # Try common ISO formats
-        formats = [
-            "%Y-%m-%dT%H:%M:%SZ",
-            "%Y-%m-%dT%H:%M:%S",
-            "%Y-%m-%d %H:%M:%S",
-            "%Y-%m-%d"
-        ]
-        
-        for fmt in formats:
-            try:
-                return datetime.strptime(value, fmt)
-            except ValueError:
-                continue
-        
-        raise ValueError(f"Invalid datetime format: {value}. Expected ISO format like '2025-02-01T00:00:00Z'")
+        return _parse_datetime_str(value)
     
     raise ValueError(f"Datetime must be string or datetime object, got {type(value)}")
 
 
+# Background writer started by setup_logging
+_log_listener: Optional[QueueListener] = None
+
+
 def setup_logging(level: str = "INFO", log_file: Optional[str] = None) -> logging.Logger:
     """
     Setup logging configuration
@@ -83,19 +127,37 @@ def setup_logging(level: str = "INFO", log_file: Optional[str] = None) -> loggin
         file_handler.setFormatter(logging.Formatter(fmt=log_format, datefmt=date_format))
         handlers.append(file_handler)
     
-    # Remove existing handlers
+    # Remove existing handlers (and stop a listener from a previous call)
+    global _log_listener
     root = logging.getLogger()
     for handler in root.handlers[:]:
         root.removeHandler(handler)
+    if _log_listener is not None:
+        _log_listener.stop()
+        # The listener owned the previous console/file handlers; release their streams
+        for handler in _log_listener.handlers:
+            handler.close()
+    
+    # Callers only enqueue records; a background thread does the console/file I/O
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    _log_listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _log_listener.start()
     
-    # Add new handlers
     root.setLevel(getattr(logging, level.upper()))
-    for handler in handlers:
-        root.addHandler(handler)
+    root.addHandler(QueueHandler(log_queue))
     
     return logging.getLogger("LiqwidClient")
 
 
+def _stop_log_listener() -> None:
+    """Drain queued records on interpreter exit"""
+    if _log_listener is not None:
+        _log_listener.stop()
+
+
+atexit.register(_stop_log_listener)
+
+
 def timestamp_to_datetime(timestamp_ms: int) -> datetime:
     """
     Convert millisecond timestamp to UTC datetime
@@ -109,17 +171,86 @@ def timestamp_to_datetime(timestamp_ms: int) -> datetime:
     return datetime.fromtimestamp(timestamp_ms / 1000.0, tz=timezone.utc)
 
 
+def timestamps_to_datetimes(timestamps_ms: Any) -> List[datetime]:
+    """
+    Convert a batch of millisecond timestamps to UTC datetimes
+    
+    Vectorized equivalent of calling timestamp_to_datetime per element: the
+    ms -> seconds division runs once in NumPy and the constructor is mapped
+    without per-element Python frames.
+    
+    Args:
+        timestamps_ms: Sequence or int64 array of timestamps in milliseconds
+        
+    Returns:
+        List of UTC datetime objects
+    """
+    seconds = (np.asarray(timestamps_ms, dtype=np.int64) / 1000.0).tolist()
+    return list(map(datetime.fromtimestamp, seconds, repeat(timezone.utc)))
+
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_ONE_MS = timedelta(milliseconds=1)
+
+
 def datetime_to_timestamp(dt: datetime) -> int:
     """
     Convert datetime to millisecond timestamp
     
+    Exact integer timedelta division; going through the float from
+    dt.timestamp() can round the millisecond down.
+    
     Args:
-        dt: Datetime object
+        dt: Datetime object (naive values are local time, as dt.timestamp())
         
     Returns:
         Timestamp in milliseconds since epoch
     """
-    return int(dt.timestamp() * 1000)
+    if dt.tzinfo is None:
+        # Whole local seconds are exact in a float; add the milliseconds as ints
+        return int(dt.replace(microsecond=0).timestamp()) * 1000 + dt.microsecond // 1000
+    return (dt - _EPOCH) // _ONE_MS
+
+
+def decode_json_bytes(content: bytes) -> Any:
+    """
+    Decode a JSON document straight from raw HTTP response bytes
+    
+    Uses orjson when it is installed (it parses bytes directly and is several
+    times faster on large row sets), otherwise a shared stdlib decoder. Either
+    way requests' Response.text round-trip (encoding detection plus a second
+    decode pass) is skipped.
+    
+    Args:
+        content: UTF-8 encoded JSON
+        
+    Returns:
+        Decoded document
+        
+    Raises:
+        ValueError: If content is not valid JSON
+    """
+    if _orjson is not None:
+        return _orjson.loads(content)
+    return _JSON_DECODER.decode(content.decode('utf-8'))
+
+
+def encode_json_bytes(obj: Any) -> bytes:
+    """
+    Encode a JSON request body as compact UTF-8 bytes
+    
+    Counterpart of decode_json_bytes: orjson when installed, otherwise the
+    stdlib encoder with compact separators.
+    
+    Args:
+        obj: JSON-serializable object (str keys)
+        
+    Returns:
+        UTF-8 encoded JSON
+    """
+    if _orjson is not None:
+        return _orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':')).encode('utf-8')
 
 
 def format_datetime_for_output(dt: datetime, format_type: str = "iso") -> str:
@@ -133,10 +264,11 @@ def format_datetime_for_output(dt: datetime, format_type: str = "iso") -> str:
     Returns:
         Formatted datetime string
     """
+    # Built from the fields directly; strftime re-parses its format on every call
     if format_type == "iso":
-        return dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+        return f"{dt.year:04d}-{dt.month:02d}-{dt.day:02d}T{dt.hour:02d}:{dt.minute:02d}:{dt.second:02d}Z"
     elif format_type == "human":
-        return dt.strftime("%Y-%m-%d %H:%M")
+        return f"{dt.year:04d}-{dt.month:02d}-{dt.day:02d} {dt.hour:02d}:{dt.minute:02d}"
     else:
         raise ValueError(f"Unknown format_type: {format_type}")
 
@@ -151,7 +283,11 @@ def sanitize_filename_timestamp(dt: datetime) -> str:
     Returns:
         Filename-safe timestamp string
     """
-    return dt.strftime("%Y%m%d_%H%M%S")
+    return f"{dt.year:04d}{dt.month:02d}{dt.day:02d}_{dt.hour:02d}{dt.minute:02d}{dt.second:02d}"
+
+
+# Minimum spacing between repeated progress/retry log lines
+_LOG_THROTTLE_NS = 100_000_000
 
 
 def retry_with_backoff(
@@ -159,7 +295,8 @@ def retry_with_backoff(
     max_attempts: int = 3,
     base_delay: float = 1.0,
     backoff_factor: float = 2.0,
-    exceptions: tuple = (Exception,)
+    exceptions: tuple = (Exception,),
+    jitter: float = 0.0
 ):
     """
     Retry function with exponential backoff
@@ -170,6 +307,8 @@ def retry_with_backoff(
         base_delay: Initial delay in seconds
         backoff_factor: Multiplier for delay on each retry
         exceptions: Tuple of exceptions to catch and retry
+        jitter: Extra random delay as a fraction of each backoff step
+            (0.5 sleeps between 1x and 1.5x); 0 keeps the schedule fixed
         
     Returns:
         Function result
@@ -177,7 +316,11 @@ def retry_with_backoff(
     Raises:
         Last exception if all retries fail
     """
+    logger = logging.getLogger()
+    # Backoff schedule is fixed for the call; compute it once
+    delays = [base_delay * (backoff_factor ** i) for i in range(max_attempts - 1)]
     last_exception = None
+    last_warn_ns = -_LOG_THROTTLE_NS
     
     for attempt in range(max_attempts):
         try:
@@ -186,13 +329,19 @@ def retry_with_backoff(
             last_exception = e
             
             if attempt < max_attempts - 1:
-                delay = base_delay * (backoff_factor ** attempt)
-                logging.getLogger().warning(
-                    f"Attempt {attempt + 1} failed: {e}. Retrying in {delay:.1f}s..."
-                )
+                delay = delays[attempt]
+                if jitter > 0:
+                    delay += delay * jitter * random.random()
+                # Only sub-100ms schedules can hit this; the final error always logs
+                now = time.perf_counter_ns()
+                if now - last_warn_ns >= _LOG_THROTTLE_NS:
+                    last_warn_ns = now
+                    logger.warning(
+                        f"Attempt {attempt + 1} failed: {e}. Retrying in {delay:.1f}s..."
+                    )
                 time.sleep(delay)
             else:
-                logging.getLogger().error(f"All {max_attempts} attempts failed")
+                logger.error(f"All {max_attempts} attempts failed")
     
     if last_exception:
         raise last_exception
@@ -209,6 +358,9 @@ def safe_float(value: Any, default: float = 0.0) -> float:
     Returns:
         Float value or default
     """
+    # Reader rows are mostly JSON floats already; skip the float() call for them
+    if type(value) is float:
+        return value
     if value is None:
         return default
     
@@ -218,9 +370,13 @@ def safe_float(value: Any, default: float = 0.0) -> float:
         return default
 
 
+@lru_cache(maxsize=256)
 def normalize_asset_symbol(symbol: str) -> str:
     """
-    Normalize asset symbol for consistency
+    Normalize asset symbol for consistency (memoized; symbols are a small set)
+    
+    The result is interned, so every spelling of a symbol ('USDC', ' usdc')
+    maps to one shared string object across series, rows and transactions.
     
     Args:
         symbol: Asset symbol to normalize
@@ -231,12 +387,13 @@ def normalize_asset_symbol(symbol: str) -> str:
     if not symbol:
         return ""
     
-    return str(symbol).strip().lower()
+    return sys.intern(str(symbol).strip().lower())
 
 
+@lru_cache(maxsize=256)
 def canonicalize_minswap_asset(name: str) -> str:
     """
-    Canonicalize asset names for Minswap usage.
+    Canonicalize asset names for Minswap usage (memoized like normalize_asset_symbol).
 
     Purpose:
     - Ensure aliases like 'usdc' and 'usdt' map to wrapped variants
@@ -270,28 +427,46 @@ def canonicalize_minswap_asset(name: str) -> str:
 
 _BECH32_CHARSET = "qpzry9x8gf2tvdw0s3jn54khce6mua7l"
 _BECH32_CHARSET_REV = {c: i for i, c in enumerate(_BECH32_CHARSET)}
+# bytes.translate table: ASCII code -> 5-bit value, 0xFF for characters outside the charset
+_BECH32_CHARSET_LUT = bytes(_BECH32_CHARSET_REV.get(chr(i), 0xFF) for i in range(256))
 _BECH32_CONST = 1
 _BECH32M_CONST = 0x2bc830a3
 
 
-def _bech32_hrp_expand(hrp: str) -> list[int]:
-    return [ord(x) >> 5 for x in hrp] + [0] + [ord(x) & 31 for x in hrp]
+def _build_polymod_table() -> tuple[int, ...]:
+    # Entry b is the XOR of the generators selected by the 5 bits of b
+    generator = (0x3b6a57b2, 0x26508e6d, 0x1ea119fa, 0x3d4233dd, 0x2a1462b3)
+    table = []
+    for b in range(32):
+        g = 0
+        for i in range(5):
+            if (b >> i) & 1:
+                g ^= generator[i]
+        table.append(g)
+    return tuple(table)
+
+
+_BECH32_POLYMOD_GEN = _build_polymod_table()
 
 
-def _bech32_polymod(values: list[int]) -> int:
-    generator = [0x3b6a57b2, 0x26508e6d, 0x1ea119fa, 0x3d4233dd, 0x2a1462b3]
-    chk = 1
+def _bech32_polymod(values: Iterable[int], chk: int = 1) -> int:
+    gen = _BECH32_POLYMOD_GEN
     for v in values:
-        b = chk >> 25
-        chk = (chk & 0x1ffffff) << 5 ^ v
-        for i in range(5):
-            if (b >> i) & 1:
-                chk ^= generator[i]
+        chk = ((chk & 0x1ffffff) << 5) ^ v ^ gen[chk >> 25]
     return chk
 
 
-def _bech32_verify_checksum(hrp: str, data: list[int]) -> int | None:
-    const = _bech32_polymod(_bech32_hrp_expand(hrp) + data)
+@lru_cache(maxsize=16)
+def _bech32_hrp_polymod(hrp: str) -> int:
+    """Polymod state after the expanded HRP (high bits, 0, low bits); HRPs are a tiny set"""
+    raw = hrp.encode('ascii')
+    chk = _bech32_polymod(x >> 5 for x in raw)
+    chk = _bech32_polymod((0,), chk)
+    return _bech32_polymod((x & 31 for x in raw), chk)
+
+
+def _bech32_verify_checksum(hrp: str, data: bytes) -> int | None:
+    const = _bech32_polymod(data, _bech32_hrp_polymod(hrp))
     if const == _BECH32_CONST:
         return _BECH32_CONST
     if const == _BECH32M_CONST:
@@ -299,23 +474,25 @@ def _bech32_verify_checksum(hrp: str, data: list[int]) -> int | None:
     return None
 
 
-def _bech32_decode(bech: str) -> tuple[str | None, list[int] | None, int | None]:
+def _bech32_decode(bech: str) -> tuple[str | None, bytes | None, int | None]:
     if not isinstance(bech, str):
         return None, None, None
-    if any(ord(x) < 33 or ord(x) > 126 for x in bech):
+    # Printable ASCII without spaces (codes 33..126), checked in C
+    if not (bech.isascii() and bech.isprintable()) or ' ' in bech:
         return None, None, None
     # Disallow mixed case
-    if any(c.isupper() for c in bech) and any(c.islower() for c in bech):
+    lower = bech.lower()
+    if bech != lower and bech != bech.upper():
         return None, None, None
-    bech = bech.lower()
+    bech = lower
     pos = bech.rfind('1')
     if pos < 1 or pos + 7 > len(bech):
         return None, None, None
     hrp = bech[:pos]
     data_part = bech[pos + 1:]
-    try:
-        data = [_BECH32_CHARSET_REV[c] for c in data_part]
-    except KeyError:
+    # Characters are printable ASCII here, so encode + translate maps them in C
+    data = data_part.encode('ascii').translate(_BECH32_CHARSET_LUT)
+    if 0xFF in data:
         return None, None, None
     spec = _bech32_verify_checksum(hrp, data)
     if spec is None:
@@ -323,7 +500,7 @@ def _bech32_decode(bech: str) -> tuple[str | None, list[int] | None, int | None]
     return hrp, data[:-6], spec
 
 
-def _convertbits(data: list[int], frombits: int, tobits: int, pad: bool = True) -> list[int] | None:
+def _convertbits(data: Iterable[int], frombits: int, tobits: int, pad: bool = True) -> list[int] | None:
     acc = 0
     bits = 0
     ret = []
@@ -345,6 +522,37 @@ def _convertbits(data: list[int], frombits: int, tobits: int, pad: bool = True)
     return ret
 
 
+def _convertbits_5to8(data: bytes) -> bytes | None:
+    """
+    _convertbits(data, 5, 8, pad=False) specialized for decoded bech32 data
+    
+    Inputs come from the charset table, so every value is already < 32 and the
+    range check is skipped. Eight 5-bit symbols are exactly five bytes, so full
+    groups are packed into one 40-bit integer and emitted with to_bytes; only
+    the final (< 8 symbol) tail needs the padding check.
+    """
+    n = len(data)
+    full = n - n % 8
+    out = bytearray()
+    for i in range(0, full, 8):
+        a0, a1, a2, a3, a4, a5, a6, a7 = data[i:i + 8]
+        out += ((a0 << 35) | (a1 << 30) | (a2 << 25) | (a3 << 20)
+                | (a4 << 15) | (a5 << 10) | (a6 << 5) | a7).to_bytes(5, 'big')
+    acc = 0
+    for value in data[full:]:
+        acc = (acc << 5) | value
+    # No padding allowed: fewer than 5 leftover bits, all zero
+    bits = (n - full) * 5
+    rem = bits & 7
+    if rem >= 5 or acc & ((1 << rem) - 1):
+        return None
+    out += (acc >> rem).to_bytes(bits >> 3, 'big')
+    return bytes(out)
+
+
+_CARDANO_ADDRESS_PREFIXES = ("addr1", "addr_test1")
+
+
 def is_valid_cardano_address(addr: str) -> bool:
     """
     Strict Cardano address validator (Bech32/Bech32m):
@@ -354,20 +562,54 @@ def is_valid_cardano_address(addr: str) -> bool:
     """
     if not isinstance(addr, str):
         return False
-    s = addr.strip()
-    if not s:
+    return _is_valid_cardano_address_str(addr.strip())
+
+
+@lru_cache(maxsize=1024)
+def _is_valid_cardano_address_str(s: str) -> bool:
+    """Checksum/payload validation for a stripped address (memoized; wallets repeat)"""
+    # The HRP ends at the last '1' and the charset has no '1', so a valid
+    # address must start with one of these; reject before any checksum work
+    if not s[:10].lower().startswith(_CARDANO_ADDRESS_PREFIXES):
         return False
     hrp, data, enc = _bech32_decode(s)
     if hrp is None or data is None or enc is None:
         return False
     if hrp not in ("addr", "addr_test"):
         return False
-    decoded = _convertbits(data, 5, 8, False)
+    decoded = _convertbits_5to8(data)
     if decoded is None or len(decoded) == 0:
         return False
     return True
 
 
+def are_valid_cardano_addresses(addrs: Iterable[str]) -> List[bool]:
+    """
+    Validate many addresses with is_valid_cardano_address
+    
+    Snapshots repeat the same wallets many times, so each distinct address
+    is checked once and the verdict reused for its duplicates.
+    
+    Args:
+        addrs: Addresses to validate (order preserved)
+        
+    Returns:
+        One bool per input address
+    """
+    verdicts: Dict[Any, bool] = {}
+    out: List[bool] = []
+    for addr in addrs:
+        try:
+            ok = verdicts[addr]
+        except KeyError:
+            ok = verdicts[addr] = is_valid_cardano_address(addr)
+        except TypeError:
+            # Unhashable input is never a valid address
+            ok = False
+        out.append(ok)
+    return out
+
+
 def build_date_range_filter(
     start_dt: Optional[datetime],
     end_dt: Optional[datetime]
@@ -382,26 +624,48 @@ def build_date_range_filter(
     Returns:
         SQL WHERE clause or empty string if no filtering needed
     """
-    conditions = []
-    
     if start_dt:
-        start_ms = datetime_to_timestamp(start_dt)
-        conditions.append(f"ts >= {start_ms}")
+        if end_dt:
+            return f"WHERE ts >= {datetime_to_timestamp(start_dt)} AND ts <= {datetime_to_timestamp(end_dt)}"
+        return f"WHERE ts >= {datetime_to_timestamp(start_dt)}"
     
     if end_dt:
-        end_ms = datetime_to_timestamp(end_dt)
-        conditions.append(f"ts <= {end_ms}")
-    
-    if conditions:
-        return f"WHERE {' AND '.join(conditions)}"
+        return f"WHERE ts <= {datetime_to_timestamp(end_dt)}"
     
     return ""
 
 
+# Cardano addresses (bech32 'addr1...'/'addr_test1...' and base58 Byron) are
+# plain alphanumerics plus the HRP underscore; nothing else may reach SQL
+_WALLET_ADDRESS_RE = re.compile(r"[A-Za-z0-9_]+")
+
+
+def validate_wallet_address(wallet_address: str) -> bool:
+    """
+    Validate a wallet address before it is embedded in a SQL literal
+    
+    Args:
+        wallet_address: Wallet address to validate
+        
+    Returns:
+        True if the address only contains allowed characters
+    """
+    if not isinstance(wallet_address, str):
+        return False
+    return _WALLET_ADDRESS_RE.fullmatch(wallet_address) is not None
+
+
+# Table names are a configured prefix plus a normalized asset symbol: word characters only
+_TABLE_NAME_RE = re.compile(r"[A-Za-z0-9_]+")
+
+
 def validate_table_name(table_name: str, prefix: str = "") -> bool:
     """
     Validate table name for security
     
+    Allow-list check: identifiers made only of ASCII letters, digits and
+    underscores cannot carry statement separators, comments or quotes.
+    
     Args:
         table_name: Table name to validate
         prefix: Expected prefix
@@ -409,22 +673,11 @@ def validate_table_name(table_name: str, prefix: str = "") -> bool:
     Returns:
         True if table name is valid
     """
-    if not table_name:
+    if not isinstance(table_name, str) or _TABLE_NAME_RE.fullmatch(table_name) is None:
         return False
     
-    # Check for SQL injection patterns
-    dangerous_chars = [';', '--', '/*', '*/', 'DROP', 'DELETE', 'INSERT', 'UPDATE']
-    table_upper = table_name.upper()
-    
-    for char in dangerous_chars:
-        if char in table_upper:
-            return False
-    
     # Check prefix if provided
-    if prefix and not table_name.startswith(prefix):
-        return False
-    
-    return True
+    return not prefix or table_name.startswith(prefix)
 
 
 class ProgressTracker:
@@ -435,22 +688,31 @@ class ProgressTracker:
         self.current = 0
         self.description = description
         self.logger = logging.getLogger(self.__class__.__name__)
+        # Smallest counts reaching 25/50/75% (integer ceil of total * pct / 100)
+        self._milestones = [(pct, -(-total * pct // 100)) for pct in (25, 50, 75)]
+        self._next_idx = 0
+        self._last_log_ns = -_LOG_THROTTLE_NS
     
     def update(self, increment: int = 1) -> None:
         """Update progress and log if significant milestone reached"""
         self.current += increment
         
-        # Log progress at 25%, 50%, 75%, 100%
-        percentage = (self.current / self.total) * 100
+        # Log progress at 25%, 50%, 75% (first milestone crossed by this update), then 100%
+        crossed = None
+        milestones = self._milestones
+        while self._next_idx < len(milestones) and self.current >= milestones[self._next_idx][1]:
+            if crossed is None:
+                crossed = milestones[self._next_idx][0]
+            self._next_idx += 1
         
-        if percentage >= 25 and (self.current - increment) / self.total * 100 < 25:
-            self.logger.info(f"{self.description}: 25% complete ({self.current}/{self.total})")
-        elif percentage >= 50 and (self.current - increment) / self.total * 100 < 50:
-            self.logger.info(f"{self.description}: 50% complete ({self.current}/{self.total})")
-        elif percentage >= 75 and (self.current - increment) / self.total * 100 < 75:
-            self.logger.info(f"{self.description}: 75% complete ({self.current}/{self.total})")
+        if crossed is not None:
+            self.logger.info(f"{self.description}: {crossed}% complete ({self.current}/{self.total})")
         elif self.current >= self.total:
-            self.logger.info(f"{self.description}: Complete! ({self.current}/{self.total})")
+            # Updates past the total repeat this line; throttle it
+            now = time.perf_counter_ns()
+            if now - self._last_log_ns >= _LOG_THROTTLE_NS:
+                self._last_log_ns = now
+                self.logger.info(f"{self.description}: Complete! ({self.current}/{self.total})")
     
     def finish(self) -> None:
         """Mark as complete"""
@@ -489,6 +751,19 @@ def calculate_percentage_change(old_value: float, new_value: float) -> Optional[
     return ((new_value - old_value) / old_value) * 100
 
 
+def _mean_std_median(a: np.ndarray) -> tuple[float, float, float]:
+    """
+    Mean, population std and median of a 1-D float array
+    
+    The mean is computed once and reused for the deviations (np.std would
+    recompute it), giving the same values as np.mean/np.std/np.median.
+    """
+    mean = a.mean()
+    d = a - mean
+    std = np.sqrt(np.multiply(d, d, out=d).sum() / a.size)
+    return mean, std, np.median(a)
+
+
 def determine_smart_ylimits(raw_data: list, smoothed_data: Optional[list] = None, 
                            data_type: str = 'percentage') -> tuple[float, float]:
     """
@@ -508,20 +783,17 @@ def determine_smart_ylimits(raw_data: list, smoothed_data: Optional[list] = None
     - For percentage: cap at [-0.1, 5.0] to handle typical gain ranges
     - For absolute: scale based on data but with outlier protection
     """
-    import numpy as np
-    
     # Use smoothed data for scaling if available, otherwise raw data
-    primary_data = smoothed_data if smoothed_data and len(smoothed_data) > 0 else raw_data
+    # (len() checks rather than truthiness so NumPy arrays are accepted too)
+    primary_data = smoothed_data if smoothed_data is not None and len(smoothed_data) > 0 else raw_data
     
-    if not primary_data or len(primary_data) == 0:
+    if primary_data is None or len(primary_data) == 0:
         # Default fallback
         return (-0.1, 5.0) if data_type == 'percentage' else (-100, 1000)
     
-    # Calculate statistics on primary data
-    primary_array = np.array(primary_data)
-    mean_val = np.mean(primary_array)
-    std_val = np.std(primary_array)
-    median_val = np.median(primary_array)
+    # Calculate statistics on primary data (no copy when given a float array)
+    primary_array = np.asarray(primary_data, dtype=float)
+    mean_val, std_val, median_val = _mean_std_median(primary_array)
     
     # Calculate robust range using smoothed data statistics
     # Use mean ± 3*std, but also consider the median for robustness
@@ -626,45 +898,30 @@ def remove_smooth_curve_outliers(smooth_data: list, percentile: float = 95.0) ->
         >>> filtered = remove_smooth_curve_outliers(smooth_values, 99.0)
         >>> # Returns filtered data with extreme values (8.5, -5.2) handled
     """
-    import numpy as np
-    
-    # Handle edge cases
-    if not smooth_data or len(smooth_data) == 0:
+    # Handle edge cases (len() rather than truthiness so NumPy arrays are accepted too)
+    if smooth_data is None or len(smooth_data) == 0:
         return smooth_data
     
-    # Convert to numpy array for easier processing
-    data_array = np.array(smooth_data, dtype=float)
+    # Convert to numpy array for easier processing (no copy when given a float array)
+    data_array = np.asarray(smooth_data, dtype=float)
     
     # Handle case where all values are the same or nearly the same
     if np.std(data_array) < 1e-10:
         return smooth_data  # No outliers if no variation
     
-    # Calculate percentile thresholds
-    lower_threshold = np.percentile(data_array, (100 - percentile) / 2)
-    upper_threshold = np.percentile(data_array, percentile + (100 - percentile) / 2)
+    # Calculate both percentile thresholds in one call
+    tail = (100 - percentile) / 2
+    lower_threshold, upper_threshold = np.percentile(data_array, [tail, percentile + tail])
     
     # Create mask for valid values (within thresholds)
     valid_mask = (data_array >= lower_threshold) & (data_array <= upper_threshold)
     
-    # Create filtered array
-    filtered_data = data_array.copy()
-
-    # Replace outliers with interpolated values or nearest valid values
-    outlier_indices = np.where(~valid_mask)[0]
-    
-    for idx in outlier_indices:
-        # Find nearest valid values for interpolation
-        valid_indices = np.where(valid_mask)[0]
-        
-        if len(valid_indices) == 0:
-            # If no valid values, keep original (shouldn't happen with reasonable data)
-            continue
-            
-        # Find closest valid indices
-        distances = np.abs(valid_indices - idx)
-        closest_idx = valid_indices[np.argmin(distances)]
-        
-        # Use median of valid values as replacement (robust choice)
-        filtered_data[idx] = np.median(data_array[valid_mask])
+    # Replace every outlier with the median of valid values (robust choice);
+    # with no valid values at all, keep the originals. Only copy when
+    # something is replaced, since the input array may be the caller's
+    if valid_mask.any() and not valid_mask.all():
+        filtered_data = data_array.copy()
+        filtered_data[~valid_mask] = np.median(data_array[valid_mask])
+        return filtered_data.tolist()
     
-    return filtered_data.tolist()
+    return data_array.tolist()
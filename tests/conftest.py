@@ -0,0 +1,11 @@
+"""
+Shared pytest fixtures
+"""
+import pytest
+
+
+@pytest.fixture
+def greptime_preflight_ok(monkeypatch):
+    """Let settings preflight pass without a reachable GreptimeDB"""
+    import src.shared.greptime_reader as gr
+    monkeypatch.setattr(gr.GreptimeReader, "test_connection", lambda self: True)
@@ -11,15 +11,29 @@ Tests cover:
 import pytest
 import numpy as np
 from datetime import datetime, timedelta, timezone
-from pathlib import Path
-import sys
-
-# Add parent directory to path for imports
-sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.core.aggregation import aggregate_timeseries, should_aggregate, recommend_time_unit
 
 
+BASE_TIME64 = np.datetime64('2025-11-22T10:00:00', 'ns')
+
+
+def _ts_range(base: np.datetime64, n: int, step: np.timedelta64) -> np.ndarray:
+    """Regularly spaced datetime64 timestamps (no Python datetime objects)"""
+    return base + np.arange(n, dtype=np.int64) * step
+
+
+@pytest.fixture(scope="session")
+def large_ts_values():
+    """10k one-second samples with seeded normal values, built once per session"""
+    timestamps = _ts_range(BASE_TIME64, 10000, np.timedelta64(1, 's'))
+    values = np.random.default_rng(0).normal(100, 10, 10000)
+    # Shared across tests: make accidental in-place edits fail loudly
+    timestamps.setflags(write=False)
+    values.setflags(write=False)
+    return timestamps, values
+
+
 class TestAggregateTimeseries:
     """Test aggregate_timeseries function"""
     
@@ -70,9 +84,8 @@ class TestAggregateTimeseries:
     def test_1h_aggregation(self):
         """Test 1-hour aggregation with dense data"""
         # Create 120 points over 4 hours (every 2 minutes)
-        base_time = datetime(2025, 11, 22, 10, 0, tzinfo=timezone.utc)
-        timestamps = np.array([base_time + timedelta(minutes=i*2) for i in range(120)])
-        values = np.array([100.0 + np.sin(i * 0.1) * 10 for i in range(120)])
+        timestamps = _ts_range(BASE_TIME64, 120, np.timedelta64(2, 'm'))
+        values = 100.0 + np.sin(np.arange(120) * 0.1) * 10
         
         bin_centers, stats = aggregate_timeseries(timestamps, values, "1h")
         
@@ -85,9 +98,8 @@ class TestAggregateTimeseries:
     def test_percentile_calculation(self):
         """Test that percentiles are calculated correctly"""
         # Create controlled data: 10 points in one bin with known values
-        base_time = datetime(2025, 11, 22, 10, 0, tzinfo=timezone.utc)
-        timestamps = np.array([base_time + timedelta(seconds=i) for i in range(10)])
-        values = np.array([float(i) for i in range(10)])  # 0, 1, 2, ..., 9
+        timestamps = _ts_range(BASE_TIME64, 10, np.timedelta64(1, 's'))
+        values = np.arange(10, dtype=float)  # 0, 1, 2, ..., 9
         
         bin_centers, stats = aggregate_timeseries(
             timestamps, values, "1h",
@@ -126,6 +138,26 @@ class TestAggregateTimeseries:
         assert stats['p50'][0] == 100.0
         assert stats['p50'][1] == 200.0
     
+    def test_percentiles_match_numpy_per_bin(self):
+        """Test grouped percentiles equal np.percentile on each bin, NaN bins included"""
+        base_time = datetime(2025, 11, 22, 10, 0, tzinfo=timezone.utc)
+        rng = np.random.default_rng(7)
+        timestamps = np.array([base_time + timedelta(seconds=int(s)) for s in rng.integers(0, 3600, 500)])
+        values = rng.normal(100, 10, 500)
+        values[3] = np.nan
+        
+        bin_centers, stats = aggregate_timeseries(
+            timestamps, values, "5min",
+            percentiles=[0, 10, 33.3, 50, 90, 100]
+        )
+        
+        for i, start in enumerate(bin_centers):
+            in_bin = (timestamps >= start) & (timestamps < start + timedelta(minutes=5))
+            assert stats['count'][i] == in_bin.sum()
+            for p in [0, 10, 33.3, 50, 90, 100]:
+                expected = np.percentile(values[in_bin], p)
+                assert np.array_equal(stats[f'p{int(p)}'][i], expected, equal_nan=True)
+    
     def test_unsorted_input(self):
         """Test that function handles unsorted timestamps"""
         base_time = datetime(2025, 11, 22, 10, 0, tzinfo=timezone.utc)
@@ -142,18 +174,19 @@ class TestAggregateTimeseries:
         assert len(bin_centers) == 1
         assert stats['count'][0] == 3
     
-    def test_all_time_units(self):
+    @pytest.mark.parametrize(
+        "time_unit",
+        ["1min", "5min", "15min", "30min", "1h", "6h", "12h", "1d", "3d", "1w"]
+    )
+    def test_all_time_units(self, time_unit):
         """Test all supported time units"""
-        base_time = datetime(2025, 11, 22, 10, 0, tzinfo=timezone.utc)
-        timestamps = np.array([base_time + timedelta(hours=i) for i in range(48)])
-        values = np.array([100.0 + i for i in range(48)])
-        
-        time_units = ["1min", "5min", "15min", "1h", "6h", "1d"]
+        timestamps = _ts_range(BASE_TIME64, 48, np.timedelta64(1, 'h'))
+        values = 100.0 + np.arange(48)
         
-        for time_unit in time_units:
-            bin_centers, stats = aggregate_timeseries(timestamps, values, time_unit)
-            assert len(bin_centers) > 0, f"Failed for time_unit={time_unit}"
-            assert len(stats['p50']) == len(bin_centers)
+        bin_centers, stats = aggregate_timeseries(timestamps, values, time_unit)
+        assert len(bin_centers) > 0
+        assert len(stats['p50']) == len(bin_centers)
+        assert stats['count'].sum() == 48
     
     def test_invalid_time_unit(self):
         """Test that invalid time_unit falls back to default"""
@@ -168,9 +201,8 @@ class TestAggregateTimeseries:
     
     def test_custom_percentiles(self):
         """Test custom percentile list"""
-        base_time = datetime(2025, 11, 22, 10, 0, tzinfo=timezone.utc)
-        timestamps = np.array([base_time + timedelta(seconds=i) for i in range(100)])
-        values = np.array([float(i) for i in range(100)])
+        timestamps = _ts_range(BASE_TIME64, 100, np.timedelta64(1, 's'))
+        values = np.arange(100, dtype=float)
         
         bin_centers, stats = aggregate_timeseries(
             timestamps, values, "1h",
@@ -181,18 +213,18 @@ class TestAggregateTimeseries:
         assert 'p95' in stats
         assert 'p50' not in stats  # Only requested percentiles
     
-    def test_large_dataset(self):
+    def test_large_dataset(self, large_ts_values):
         """Test performance with large dataset (10k points)"""
-        base_time = datetime(2025, 11, 22, 10, 0, tzinfo=timezone.utc)
-        timestamps = np.array([base_time + timedelta(seconds=i) for i in range(10000)])
-        values = np.random.normal(100, 10, 10000)
+        timestamps, values = large_ts_values
         
         bin_centers, stats = aggregate_timeseries(timestamps, values, "5min")
         
         # Should aggregate significantly
         assert len(bin_centers) < 1000  # Should be much fewer than 10k
         assert len(bin_centers) > 30    # But more than 30 5-min bins (~2.7 hours)
-        # Verify all bins have data
+        # 10000 s at 1 Hz spans exactly 34 five-minute bins, all populated
+        assert len(bin_centers) == 34
+        assert stats['count'].sum() == 10000
         assert all(count > 0 for count in stats['count'])
 
 
@@ -216,6 +248,11 @@ class TestShouldAggregate:
         """Test with custom threshold"""
         assert should_aggregate(500, 1.0, threshold_points=100) is True
         assert should_aggregate(50, 1.0, threshold_points=100) is False
+    
+    def test_array_input(self):
+        """Test batched decision for several series at once"""
+        result = should_aggregate(np.array([500, 1000, 1001, 5000]), np.array([1.0, 7.0, 7.0, 7.0]))
+        assert result.tolist() == [False, False, True, True]
 
 
 class TestRecommendTimeUnit:
@@ -240,6 +277,19 @@ class TestRecommendTimeUnit:
     def test_long_span_over_30_days(self):
         """Test recommendation for > 30 days"""
         assert recommend_time_unit(50000, 45.0) == "1d"
+    
+    def test_thresholds_are_exclusive_upper_bounds(self):
+        """Test that a span equal to a threshold moves to the next unit"""
+        assert recommend_time_unit(1000, 1.0) == "15min"
+        assert recommend_time_unit(1000, 3.0) == "1h"
+        assert recommend_time_unit(1000, 7.0) == "6h"
+        assert recommend_time_unit(1000, 30.0) == "1d"
+    
+    def test_array_input_matches_scalar(self):
+        """Test batched recommendation agrees with the scalar path"""
+        spans = [0.5, 1.0, 2.0, 3.0, 5.0, 7.0, 14.0, 30.0, 45.0, float('nan')]
+        result = recommend_time_unit(np.full(len(spans), 1000), np.array(spans))
+        assert result.tolist() == [recommend_time_unit(1000, s) for s in spans]
 
 
 if __name__ == "__main__":
@@ -0,0 +1,519 @@
+#!/usr/bin/env python3
+"""
+Unit tests for GreptimeReader query orchestration.
+
+The HTTP layer is replaced by an in-memory fake so these tests run offline.
+"""
+import asyncio
+import json
+import pytest
+from datetime import datetime, timezone
+
+from src.shared.config import GreptimeConnConfig
+from src.shared.greptime_reader import GreptimeError, GreptimeReader, GreptimeQueryError
+
+
+def _response(columns, rows):
+    """Build a GreptimeDB-shaped JSON response"""
+    return {
+        'code': 0,
+        'output': [{
+            'records': {
+                'schema': {'column_schemas': [{'name': c} for c in columns]},
+                'rows': rows,
+            }
+        }]
+    }
+
+
+class FakeReader(GreptimeReader):
+    """GreptimeReader with the HTTP layer replaced by canned responses"""
+
+    def __init__(self, tables, series_rows=None, tx_rows=None, wallet_rows=None, table_wallets=None):
+        super().__init__(GreptimeConnConfig(), "liqwid_supply_positions_")
+        self.tables = set(tables)
+        self.series_rows = series_rows or {}
+        self.tx_rows = tx_rows or []
+        self.wallet_rows = wallet_rows or []
+        self.table_wallets = table_wallets or {}
+        self.executed = []
+        self.bypassed = []
+
+    def _table_exists(self, table_name):
+        return table_name in self.tables
+
+    def _show_tables(self):
+        return sorted(self.tables)
+
+    def _execute_sql(self, sql, bypass_cache=False):
+        self.executed.append(sql)
+        self.bypassed.append(bypass_cache)
+        if "GROUP BY ts, wallet_address" in sql:
+            return _response(['ts', 'wallet_address', 'usd_value_sum'], self.wallet_rows)
+        if "SELECT wallet_address FROM" in sql:
+            wallets = []
+            for table, table_wallets in self.table_wallets.items():
+                if f"FROM {table} " in sql:
+                    wallets.extend(table_wallets)
+            if "GROUP BY wallet_address" in sql:
+                wallets = sorted(set(wallets))
+            return _response(['wallet_address'], [[w] for w in wallets])
+        if "AS asset," in sql:
+            rows = []
+            for table, table_rows in self.series_rows.items():
+                if f"FROM {table}" in sql:
+                    ts = [row[0] for row in table_rows] or [None]
+                    rows.append([table, min(ts) if table_rows else None, max(ts) if table_rows else None])
+            return _response(['asset', 'min_ts', 'max_ts'], rows)
+        if "MIN(ts)" in sql:
+            for table, table_rows in self.series_rows.items():
+                if f"FROM {table}" in sql and table_rows:
+                    ts = [row[0] for row in table_rows]
+                    return _response(['min_ts', 'max_ts'], [[min(ts), max(ts)]])
+            return _response(['min_ts', 'max_ts'], [[None, None]])
+        if "AS tx_type" in sql:
+            columns = ['ts', 'created_at', 'wallet_address', 'market_id', 'amount', 'notes', 'tx_type']
+            return _response(columns, self.tx_rows)
+        if " AS sym," in sql:
+            rows = []
+            for table, table_rows in self.series_rows.items():
+                if f"FROM {table} " in sql:
+                    sym = table[len(self.table_prefix):]
+                    rows.extend([sym] + row for row in table_rows)
+            return _response(['sym', 'ts', 'v'], rows)
+        for table, rows in self.series_rows.items():
+            if f"FROM {table}" in sql:
+                return _response(['ts', 'usd_value_sum'], rows)
+        return _response(['ts', 'usd_value_sum'], [])
+
+
+def test_fetch_all_assets_preserves_order_and_skips_missing():
+    reader = FakeReader(
+        tables=['liqwid_supply_positions_usdc', 'liqwid_supply_positions_djed'],
+        series_rows={
+            'liqwid_supply_positions_usdc': [[1_700_000_000_000, 10.0], [1_700_000_060_000, 11.0]],
+            'liqwid_supply_positions_djed': [[1_700_000_000_000, 5.0]],
+        },
+    )
+
+    results = reader.fetch_all_assets(['djed', 'shen', 'usdc'])
+
+    assert list(results.keys()) == ['DJED', 'USDC']
+    assert len(results['USDC'].series) == 2
+    assert results['USDC'].series[datetime.fromtimestamp(1_700_000_060, tz=timezone.utc)] == 11.0
+    ts_ms, vals = results['USDC'].as_arrays()
+    assert ts_ms.tolist() == [1_700_000_000_000, 1_700_000_060_000]
+    assert vals.tolist() == [10.0, 11.0]
+    assert list(results['DJED'].series.values()) == [5.0]
+
+
+def test_fetch_all_assets_async_matches_sync():
+    reader = FakeReader(
+        tables=['liqwid_supply_positions_usdc', 'liqwid_supply_positions_djed'],
+        series_rows={
+            'liqwid_supply_positions_usdc': [[1_700_000_000_000, 10.0]],
+            'liqwid_supply_positions_djed': [[1_700_000_000_000, 5.0]],
+        },
+    )
+
+    results = asyncio.run(reader.fetch_all_assets_async(['usdc', 'shen', 'djed'], max_concurrency=2))
+
+    assert list(results.keys()) == ['USDC', 'DJED']
+    assert list(results['DJED'].series.values()) == [5.0]
+
+
+def test_fetch_all_assets_empty():
+    reader = FakeReader(tables=[])
+    assert reader.fetch_all_assets([]) == {}
+
+
+def test_fetch_all_assets_batched_single_query():
+    reader = FakeReader(
+        tables=['liqwid_supply_positions_usdc', 'liqwid_supply_positions_djed'],
+        series_rows={
+            'liqwid_supply_positions_usdc': [[1_700_000_000_000, 10.0], [1_700_000_060_000, 11.0]],
+            'liqwid_supply_positions_djed': [[1_700_000_000_000, 5.0]],
+        },
+    )
+
+    results = reader.fetch_all_assets_batched(['usdc', 'shen', 'djed'])
+
+    assert len(reader.executed) == 1
+    assert "UNION ALL" in reader.executed[0]
+    assert list(results.keys()) == ['USDC', 'DJED']
+    assert list(results['USDC'].series.values()) == [10.0, 11.0]
+    assert list(results['DJED'].series.values()) == [5.0]
+
+
+def test_table_exists_uses_cached_show_tables():
+    calls = []
+
+    class ListingReader(GreptimeReader):
+        def _show_tables(self):
+            calls.append(1)
+            return ['liqwid.liqwid_supply_positions_usdc', 'liqwid_supply_positions_DJED']
+
+    reader = ListingReader(GreptimeConnConfig(), "liqwid_supply_positions_")
+
+    assert reader._table_exists('liqwid_supply_positions_usdc')
+    assert reader._table_exists('liqwid_supply_positions_djed')
+    assert not reader._table_exists('liqwid_supply_positions_shen')
+    assert len(calls) == 1
+
+    reader.invalidate_tables_cache()
+    assert reader._table_exists('liqwid_supply_positions_usdc')
+    assert len(calls) == 2
+
+
+def test_execute_sql_caches_identical_queries():
+    posts = []
+
+    class FakeResponse:
+        status_code = 200
+        headers = {'Content-Type': 'application/json'}
+        content = json.dumps(_response(['test'], [[1]])).encode('utf-8')
+
+    reader = GreptimeReader(GreptimeConnConfig(), "liqwid_supply_positions_")
+    reader.session.post = lambda *args, **kwargs: posts.append(kwargs) or FakeResponse()
+
+    first = reader._execute_sql("SELECT 1 as test")
+    second = reader._execute_sql("SELECT 1 as test")
+    assert first is second
+    assert len(posts) == 1
+
+    reader._execute_sql("SELECT 1 as test", bypass_cache=True)
+    assert len(posts) == 2
+
+    reader.clear_query_cache()
+    reader._execute_sql("SELECT 1 as test")
+    assert len(posts) == 3
+
+
+def test_query_cache_purges_expired_and_skips_large_results():
+    reader = GreptimeReader(GreptimeConnConfig(), "liqwid_supply_positions_")
+    reader._query_cache_max_rows = 2
+
+    reader._cache_put(('', b'old'), _response(['test'], [[1]]))
+    # Age the entry past the TTL; the next store drops it without a lookup
+    stored_at, result = reader._query_cache[('', b'old')]
+    reader._query_cache[('', b'old')] = (stored_at - reader._query_cache_ttl, result)
+    reader._cache_put(('', b'new'), _response(['test'], [[1], [2]]))
+    assert list(reader._query_cache) == [('', b'new')]
+
+    reader._cache_put(('', b'big'), _response(['test'], [[1], [2], [3]]))
+    assert reader._cache_get(('', b'big')) is None
+
+
+def test_execute_sql_decodes_arrow_file_format():
+    pa = pytest.importorskip("pyarrow")
+    table = pa.table({
+        'ts': pa.array([1_700_000_000_000], type=pa.timestamp('ms')),
+        'usd_value': [12.5],
+    })
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+
+    class FakeResponse:
+        status_code = 200
+        headers = {'Content-Type': 'application/octet-stream'}
+        content = sink.getvalue().to_pybytes()
+
+    reader = GreptimeReader(GreptimeConnConfig(response_format='arrow'), "liqwid_supply_positions_")
+    reader.session.post = lambda *args, **kwargs: FakeResponse()
+
+    records = reader._execute_sql("SELECT ts, usd_value FROM t")['output'][0]['records']
+    assert [c['name'] for c in records['schema']['column_schemas']] == ['ts', 'usd_value']
+    assert records['rows'] == [[1_700_000_000_000, 12.5]]
+    assert reader._use_arrow
+
+
+def test_execute_sql_undecodable_arrow_switches_to_json():
+    pytest.importorskip("pyarrow")
+    posts = []
+
+    class BinaryResponse:
+        status_code = 200
+        headers = {'Content-Type': 'application/octet-stream'}
+        content = b'\x00not arrow'
+
+    class JsonResponse:
+        status_code = 200
+        headers = {'Content-Type': 'application/json'}
+        content = json.dumps(_response(['test'], [[1]])).encode('utf-8')
+
+    def post(*args, **kwargs):
+        posts.append(kwargs.get('params'))
+        return BinaryResponse() if kwargs.get('params') else JsonResponse()
+
+    reader = GreptimeReader(GreptimeConnConfig(response_format='arrow'), "liqwid_supply_positions_")
+    reader.session.post = post
+
+    assert reader._execute_sql("SELECT 1 as test")['output'][0]['records']['rows'] == [[1]]
+    assert posts == [{'format': 'arrow'}, None]
+    assert not reader._use_arrow
+
+
+def test_fetch_transactions_single_union_query():
+    reader = FakeReader(
+        tables=['liqwid_deposits_usdc', 'liqwid_withdrawals_usdc'],
+        tx_rows=[
+            [1_700_000_000_000, None, 'addr1abc', 'usdc', 100.0, None, 'deposit'],
+            [1_700_000_060_000, 1_700_000_050_000, 'addr1abc', 'usdc', 40.0, 'partial', 'withdrawal'],
+        ],
+    )
+
+    txs = reader.fetch_transactions('USDC', 'liqwid_deposits_', 'liqwid_withdrawals_')
+
+    assert len(reader.executed) == 1
+    assert reader.executed[0].count("UNION ALL") == 1
+    # Transactions are never served from the query cache
+    assert reader.bypassed == [True]
+    assert [t.transaction_type for t in txs] == ['deposit', 'withdrawal']
+    assert txs[0].created_at == txs[0].timestamp
+    assert txs[1].amount == -40.0
+    assert txs[1].notes == 'partial'
+    # Wallet addresses are interned, so equal addresses share one object
+    assert txs[0].wallet_address is txs[1].wallet_address
+
+
+def test_fetch_transactions_falls_back_per_table_when_union_fails():
+    class MismatchedReader(FakeReader):
+        def _execute_sql(self, sql, bypass_cache=False):
+            self.executed.append(sql)
+            if "UNION ALL" in sql:
+                raise GreptimeQueryError("column types differ")
+            if "FROM liqwid_deposits_usdc" in sql:
+                return _response(['ts', 'created_at', 'wallet_address', 'market_id', 'amount', 'notes', 'tx_type'],
+                                 [[1_700_000_060_000, None, 'addr1abc', 'usdc', 100.0, None, 'deposit']])
+            return _response(['ts', 'created_at', 'wallet_address', 'market_id', 'amount', 'notes', 'tx_type'],
+                             [[1_700_000_000_000, None, 'addr1abc', 'usdc', 40.0, None, 'withdrawal']])
+
+    reader = MismatchedReader(tables=['liqwid_deposits_usdc', 'liqwid_withdrawals_usdc'])
+
+    txs = reader.fetch_transactions('usdc', 'liqwid_deposits_', 'liqwid_withdrawals_')
+
+    assert len(reader.executed) == 3
+    assert [t.transaction_type for t in txs] == ['withdrawal', 'deposit']
+    assert txs[0].amount == -40.0
+
+
+def test_fetch_transactions_skips_missing_tables():
+    reader = FakeReader(tables=['liqwid_deposits_usdc'])
+
+    assert reader.fetch_transactions('usdc', 'liqwid_deposits_', 'liqwid_withdrawals_') == []
+    assert "UNION ALL" not in reader.executed[0]
+    assert "liqwid_withdrawals_usdc" not in reader.executed[0]
+
+
+def test_fetch_transactions_rejects_unsafe_wallet_address():
+    reader = FakeReader(tables=['liqwid_deposits_usdc'])
+
+    for unsafe in ("addr1' OR '1'='1", "addr1abc\n"):
+        with pytest.raises(GreptimeQueryError):
+            reader.fetch_transactions(
+                'usdc', 'liqwid_deposits_', 'liqwid_withdrawals_',
+                wallet_address=unsafe,
+            )
+    assert reader.executed == []
+
+    reader.fetch_transactions('usdc', 'liqwid_deposits_', 'liqwid_withdrawals_', wallet_address='addr_test1qxyz')
+    assert "wallet_address = 'addr_test1qxyz'" in reader.executed[0]
+
+
+def test_fetch_asset_series_by_wallet_groups_streamed_rows():
+    reader = FakeReader(
+        tables=['liqwid_supply_positions_usdc'],
+        wallet_rows=[
+            [1_700_000_000_000, 'addr1aaa', 1.0],
+            [1_700_000_060_000, 'addr1aaa', 2.0],
+            [1_700_000_000_000, 'addr1bbb', None],
+            [1_700_000_060_000, 'addr1bbb', 4.0],
+            [1_700_000_000_000, None, 9.0],
+        ],
+    )
+
+    by_wallet = reader.fetch_asset_series_by_wallet('usdc')
+
+    assert sorted(by_wallet) == ['addr1aaa', 'addr1bbb']
+    assert list(by_wallet['addr1aaa'].series.values()) == [1.0, 2.0]
+    assert list(by_wallet['addr1bbb'].series.values()) == [4.0]
+    assert by_wallet['addr1bbb'].asset_symbol == 'USDC'
+
+
+def test_describe_probe_checks_body_markers():
+    class FakeResponse:
+        def __init__(self, status_code, content):
+            self.status_code = status_code
+            self.content = content
+
+    reader = GreptimeReader(GreptimeConnConfig(), "liqwid_supply_positions_")
+    responses = {
+        'present': FakeResponse(200, b'{"output": [{"records": {"rows": [["ts"]]}}], "execution_time_ms": 1}'),
+        'empty': FakeResponse(200, b'{"output":[],"execution_time_ms":1}'),
+        'missing': FakeResponse(400, b'{"code":4001,"error":"Table not found: missing"}'),
+    }
+
+    def fake_post(url, data=None, timeout=None):
+        sql = data.decode('utf-8')
+        return next(resp for name, resp in responses.items() if f"TABLE+{name}" in sql)
+
+    reader.session.post = fake_post
+
+    assert reader._describe_table_exists('present')
+    assert not reader._describe_table_exists('empty')
+    assert not reader._describe_table_exists('missing')
+
+
+def test_fetch_asset_series_by_wallet_merges_out_of_order_groups():
+    reader = FakeReader(
+        tables=['liqwid_supply_positions_usdc'],
+        wallet_rows=[
+            [1_700_000_000_000, 'addr1bbb', 3.0],
+            [1_700_000_000_000, 'addr1aaa', 1.0],
+            [1_700_000_060_000, 'addr1bbb', 4.0],
+        ],
+    )
+
+    by_wallet = reader.fetch_asset_series_by_wallet('usdc')
+
+    assert list(by_wallet) == ['addr1bbb', 'addr1aaa']
+    assert list(by_wallet['addr1bbb'].series.values()) == [3.0, 4.0]
+    assert by_wallet['addr1bbb'].as_arrays()[0].tolist() == [1_700_000_000_000, 1_700_000_060_000]
+
+
+def test_discover_wallet_addresses_batches_tables_into_union():
+    tables = [f'liqwid_supply_positions_a{i}' for i in range(5)]
+    reader = FakeReader(
+        tables=tables + ['other_table'],
+        table_wallets={t: ['addr1shared', f'addr1only{i}', ''] for i, t in enumerate(tables)},
+    )
+    reader._wallet_discovery_batch_size = 2
+
+    wallets = reader.discover_wallet_addresses()
+
+    assert len(reader.executed) == 3
+    assert all("GROUP BY wallet_address" in sql for sql in reader.executed)
+    assert "other_table" not in "".join(reader.executed)
+    assert wallets == sorted(['addr1shared'] + [f'addr1only{i}' for i in range(5)])
+
+
+def test_discover_wallet_addresses_falls_back_per_table():
+    class FlakyUnionReader(FakeReader):
+        def _execute_sql(self, sql, bypass_cache=False):
+            if "UNION ALL" in sql:
+                self.executed.append(sql)
+                raise GreptimeQueryError("bad table in union")
+            return super()._execute_sql(sql, bypass_cache)
+
+    tables = ['liqwid_supply_positions_usdc', 'liqwid_supply_positions_djed']
+    reader = FlakyUnionReader(tables=tables, table_wallets={t: ['addr1aaa'] for t in tables})
+
+    assert reader.discover_wallet_addresses() == ['addr1aaa']
+    fallback = reader.executed[1:]
+    assert len(fallback) == 2
+    assert all(sql.endswith("GROUP BY wallet_address") and "DISTINCT" not in sql for sql in fallback)
+
+
+def test_show_tables_is_memoized_until_invalidated():
+    class ListingReader(GreptimeReader):
+        def __init__(self):
+            super().__init__(GreptimeConnConfig(), "liqwid_supply_positions_")
+            self.queries = 0
+
+        def _query_show_tables(self):
+            self.queries += 1
+            return ['liqwid_supply_positions_usdc', 'liqwid_supply_positions_djed']
+
+    reader = ListingReader()
+
+    assert reader.discover_asset_tables() == ['djed', 'usdc']
+    assert reader._table_exists('liqwid_supply_positions_usdc')
+    reader._show_tables().append('mutated')
+    assert 'mutated' not in reader._show_tables()
+    assert reader.queries == 1
+
+    reader.invalidate_tables_cache()
+    reader._show_tables()
+    assert reader.queries == 2
+
+
+def test_show_tables_error_payload_is_not_cached_as_empty():
+    class ErrorListingReader(GreptimeReader):
+        def __init__(self):
+            super().__init__(GreptimeConnConfig(), "liqwid_supply_positions_")
+            self.listings = 0
+            self.probes = []
+
+        def _execute_sql(self, sql, bypass_cache=False):
+            self.listings += 1
+            return {'code': 4001, 'error': 'Table not found'}
+
+        def _describe_table_exists(self, table_name):
+            self.probes.append(table_name)
+            return True
+
+    reader = ErrorListingReader()
+
+    assert reader._show_tables() is None
+    assert reader._table_exists('liqwid_supply_positions_usdc')
+    assert reader._filter_existing_tables(['liqwid_supply_positions_djed']) == ['liqwid_supply_positions_djed']
+    assert reader.probes == ['liqwid_supply_positions_usdc', 'liqwid_supply_positions_djed']
+    # Every lookup asks the server again instead of trusting a cached empty set
+    assert reader.listings == 3
+    with pytest.raises(GreptimeError):
+        reader.discover_asset_tables()
+
+
+def test_match_prefixed_tables_handles_schema_and_case():
+    matches = GreptimeReader._match_prefixed_tables(
+        ['liqwid.Liqwid_Supply_Positions_USDC', 'liqwid_supply_positions_', 'other', ''],
+        'liqwid_supply_positions_',
+    )
+
+    assert matches == [
+        ('liqwid.Liqwid_Supply_Positions_USDC', 'usdc'),
+        ('liqwid_supply_positions_', ''),
+    ]
+    assert GreptimeReader._match_prefixed_tables(['liqwid_supply_positions_usdc'], '') == []
+
+
+def test_get_data_timespan_reduces_across_assets():
+    reader = FakeReader(
+        tables=['liqwid_supply_positions_usdc', 'liqwid_supply_positions_djed', 'liqwid_supply_positions_iusd'],
+        series_rows={
+            'liqwid_supply_positions_usdc': [[1_700_000_060_000, 1.0], [1_700_000_120_000, 2.0]],
+            'liqwid_supply_positions_djed': [[1_700_000_000_000, 5.0], [1_700_000_060_000, 6.0]],
+            'liqwid_supply_positions_iusd': [],
+        },
+    )
+
+    start, end = reader.get_data_timespan(['usdc', 'djed', 'iusd', 'shen'], max_workers=2)
+
+    assert start == datetime.fromtimestamp(1_700_000_000, tz=timezone.utc)
+    assert end == datetime.fromtimestamp(1_700_000_120, tz=timezone.utc)
+    assert len(reader.executed) == 1
+    assert reader.executed[0].count("UNION ALL") == 2
+    assert reader.get_data_timespan([]) == (None, None)
+
+
+def test_get_data_timespan_falls_back_to_per_asset_queries():
+    class NoUnionReader(FakeReader):
+        def _execute_sql(self, sql, bypass_cache=False):
+            if "UNION ALL" in sql:
+                raise GreptimeQueryError("union not supported")
+            return super()._execute_sql(sql, bypass_cache)
+
+    reader = NoUnionReader(
+        tables=['liqwid_supply_positions_usdc', 'liqwid_supply_positions_djed'],
+        series_rows={
+            'liqwid_supply_positions_usdc': [[1_700_000_060_000, 1.0]],
+            'liqwid_supply_positions_djed': [[1_700_000_000_000, 5.0]],
+        },
+    )
+
+    start, end = reader.get_data_timespan(['usdc', 'djed'])
+
+    assert start == datetime.fromtimestamp(1_700_000_000, tz=timezone.utc)
+    assert end == datetime.fromtimestamp(1_700_000_060, tz=timezone.utc)
+    assert len(reader.executed) == 2
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Unit tests for GreptimeWriter SQL orchestration.
+
+SQL execution is captured in memory so these tests run offline.
+"""
+from datetime import datetime, timezone
+
+from src.shared.config import GreptimeConnConfig
+from src.shared.greptime_writer import GreptimeWriter
+from src.shared.models import Transaction
+
+
+class RecordingWriter(GreptimeWriter):
+    """GreptimeWriter that records SQL instead of sending it"""
+
+    def __init__(self, tables=(), **kwargs):
+        super().__init__(GreptimeConnConfig(), **kwargs)
+        self.tables = list(tables)
+        self.executed = []
+
+    def _execute_sql(self, sql, use_effective_db=True):
+        if sql == "SHOW TABLES":
+            rows = [[t] for t in self.tables]
+            return {'code': 0, 'output': [{'records': {'schema': {'column_schemas': [{'name': 'Tables'}]}, 'rows': rows}}]}
+        self.executed.append(sql)
+        return {'code': 0, 'output': [{'affectedrows': 1}]}
+
+
+def _deposit(symbol='USDC', amount=100.0, notes=None):
+    return Transaction(
+        timestamp=datetime(2024, 1, 1, tzinfo=timezone.utc),
+        wallet_address='addr1abc',
+        market_id=symbol,
+        asset_symbol=symbol,
+        amount=amount,
+        transaction_type='deposit',
+        notes=notes,
+        created_at=datetime(2024, 1, 1, 0, 0, 1, tzinfo=timezone.utc),
+    )
+
+
+def test_ensure_transaction_table_runs_ddl_once_per_table():
+    writer = RecordingWriter()
+
+    writer.insert_transactions([_deposit()], 'deposit')
+    writer.insert_transactions([_deposit(amount=5.0)], 'deposit')
+
+    assert sum("CREATE TABLE" in sql for sql in writer.executed) == 1
+
+    writer.invalidate_table_cache()
+    writer.ensure_transaction_table('usdc', 'deposit')
+    assert sum("CREATE TABLE" in sql for sql in writer.executed) == 2
+
+
+def test_insert_transactions_sends_one_multi_statement_request():
+    writer = RecordingWriter(test_prefix=True)
+
+    result = writer.insert_transactions([_deposit('USDC'), _deposit('DJED'), _deposit('USDC', 7.0)], 'deposit')
+
+    assert result == {'test_liqwid_deposits_usdc': 2, 'test_liqwid_deposits_djed': 1}
+    assert writer.executed[0].startswith("CREATE DATABASE IF NOT EXISTS test_")
+    batch = writer.executed[1]
+    assert len(writer.executed) == 2
+    assert batch.count("CREATE TABLE IF NOT EXISTS") == 2
+    assert batch.count("INSERT INTO") == 2
+
+    writer.insert_transactions([_deposit('USDC', 1.0)], 'deposit')
+    assert len(writer.executed) == 3
+    assert writer.executed[2].startswith("INSERT INTO test_liqwid_deposits_usdc")
+
+
+def test_multi_statement_parse_error_falls_back_per_statement():
+    class NoBatchWriter(RecordingWriter):
+        def _execute_sql(self, sql, use_effective_db=True):
+            if sql.count(";") > 1:
+                raise RuntimeError("HTTP 400: Failed to parse SQL")
+            return super()._execute_sql(sql, use_effective_db)
+
+    writer = NoBatchWriter()
+    writer.insert_transactions([_deposit('USDC'), _deposit('DJED')], 'deposit')
+
+    assert sum(sql.startswith("CREATE TABLE") for sql in writer.executed) == 2
+    assert sum(sql.startswith("INSERT INTO") for sql in writer.executed) == 2
+
+
+def test_build_insert_sql_formats_rows():
+    writer = RecordingWriter()
+    sql = writer._build_transaction_insert_sql('liqwid_deposits_usdc', [_deposit(notes="it's"), _deposit(amount=2.5)])
+
+    assert sql.startswith("INSERT INTO liqwid_deposits_usdc (")
+    assert "(1704067200000, 1704067201000, 'addr1abc', 'USDC', 100.0, 'it''s')" in sql
+    assert "(1704067200000, 1704067201000, 'addr1abc', 'USDC', 2.5, NULL)" in sql
+    assert writer._build_transaction_insert_sql('t', []) == ""
+
+
+def test_effective_database_applies_test_prefix():
+    assert RecordingWriter().get_effective_database() == GreptimeConnConfig().database
+    assert RecordingWriter(test_prefix=True).get_effective_database() == f"test_{GreptimeConnConfig().database}"
+
+
+def test_tables_listed_by_show_tables_skip_ddl():
+    writer = RecordingWriter(tables=['liqwid_deposits_usdc'])
+
+    writer.insert_transactions([_deposit('USDC'), _deposit('DJED')], 'deposit')
+
+    batch = writer.executed[-1]
+    assert "CREATE TABLE IF NOT EXISTS liqwid_deposits_djed" in batch
+    assert "CREATE TABLE IF NOT EXISTS liqwid_deposits_usdc" not in batch
+
+
+def test_dropped_table_is_recreated_for_single_insert():
+    class DroppedTableWriter(RecordingWriter):
+        def _execute_sql(self, sql, use_effective_db=True):
+            if sql.startswith("INSERT") and not any(s.startswith("CREATE TABLE") for s in self.executed):
+                self.executed.append(sql)
+                raise RuntimeError("HTTP 404: Table not found: liqwid_deposits_usdc")
+            return super()._execute_sql(sql, use_effective_db)
+
+    writer = DroppedTableWriter(tables=['liqwid_deposits_usdc'])
+
+    assert writer.insert_transactions([_deposit('USDC')], 'deposit') == {'liqwid_deposits_usdc': 1}
+    assert "CREATE TABLE IF NOT EXISTS liqwid_deposits_usdc" in writer.executed[-1]
+    assert writer.executed[-1].count("INSERT INTO") == 1
+
+
+def test_large_request_bodies_are_gzipped():
+    import gzip
+    from urllib.parse import parse_qs
+
+    posts = []
+
+    class FakeResponse:
+        status_code = 200
+        content = b'{"code": 0, "output": []}'
+
+    writer = GreptimeWriter(GreptimeConnConfig(request_gzip_min_bytes=64))
+    writer.session.post = lambda url, data=None, headers=None, timeout=None: posts.append((data, headers)) or FakeResponse()
+
+    writer._execute_sql("SELECT 1")
+    writer._execute_sql("SELECT '" + "x" * 200 + "'")
+
+    assert posts[0][1] is None
+    assert parse_qs(posts[0][0].decode('utf-8'))['sql'] == ["SELECT 1"]
+    assert posts[1][1] == {'Content-Encoding': 'gzip'}
+    assert parse_qs(gzip.decompress(posts[1][0]).decode('utf-8'))['sql'] == ["SELECT '" + "x" * 200 + "'"]
+
+
+def test_buffered_writer_coalesces_single_records():
+    from src.shared.greptime_writer import BufferedGreptimeWriter
+
+    writer = RecordingWriter(tables=['liqwid_deposits_usdc'])
+    with BufferedGreptimeWriter(writer, max_rows=3, max_seconds=60) as buffered:
+        assert buffered.record_deposit(_deposit(amount=1.0))
+        assert buffered.record_deposit(_deposit(amount=2.0))
+        assert not any(sql.startswith("INSERT") for sql in writer.executed)
+        buffered.record_deposit(_deposit(amount=3.0))
+        inserts = [sql for sql in writer.executed if "INSERT INTO" in sql]
+        assert len(inserts) == 1 and inserts[0].count("'addr1abc'") == 3
+        buffered.record_deposit(_deposit(amount=4.0))
+        assert buffered.pending() == 1
+
+    assert buffered.pending() == 0
+    assert sum("INSERT INTO" in sql for sql in writer.executed) == 2
+
+
+def test_buffered_writer_flushes_on_timer_and_keeps_failed_batches():
+    import time
+    from src.shared.greptime_writer import BufferedGreptimeWriter
+
+    class FailingWriter(RecordingWriter):
+        def insert_transactions(self, txs, tx_type):
+            raise RuntimeError("HTTP 500: boom")
+
+    buffered = BufferedGreptimeWriter(FailingWriter(), max_rows=100, max_seconds=0.05)
+    buffered.record_deposit(_deposit())
+    deadline = time.monotonic() + 2.0
+    while buffered.pending() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    buffered.close()
+
+    assert buffered.pending() == 0
+    assert len(buffered.failed) == 1
+    assert buffered.failed[0][0] == 'deposit'
@@ -4,13 +4,7 @@
 Integration test for per-wallet Wmax breakdown feature
 """
 
-import sys
-from pathlib import Path
-
-# Add src to path
-sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
-
-from shared.models import WalletBreakdown
+from src.shared.models import WalletBreakdown
 # Import just the dataclass, not the whole module to avoid import errors
 from dataclasses import dataclass, field
 from typing import List, Optional
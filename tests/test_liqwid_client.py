@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the Liqwid and Koios API clients.
+
+HTTP sessions are replaced by in-memory fakes so these tests run offline.
+"""
+import json
+
+import pytest
+
+from src.shared.liqwid_client import APIClientManager, KoiosClient, LiqwidClient
+
+
+class FakeResponse:
+    def __init__(self, payload, status_code=200):
+        self._payload = payload
+        self.status_code = status_code
+        self.text = str(payload)
+        self.content = json.dumps(payload).encode('utf-8')
+
+    def json(self):
+        return self._payload
+
+
+class FakeSession:
+    """Records calls and returns queued payloads"""
+
+    def __init__(self, payloads):
+        self.payloads = list(payloads)
+        self.calls = []
+        self.headers = {}
+        self.closed = False
+
+    def post(self, url, data=None, timeout=None, **kwargs):
+        self.calls.append(('POST', url, json.loads(data)))
+        payload = self.payloads.pop(0)
+        if isinstance(payload, FakeResponse):
+            return payload
+        return FakeResponse(payload)
+
+    def get(self, url, timeout=None, **kwargs):
+        self.calls.append(('GET', url, None))
+        return FakeResponse(self.payloads.pop(0))
+
+    def close(self):
+        self.closed = True
+
+
+MARKETS_PAYLOAD = {'data': {'liqwid': {'data': {'markets': {'results': [{
+    'id': 'Ada',
+    'displayName': 'Ada',
+    'exchangeRate': '0.02',
+    'asset': {'symbol': 'ADA', 'decimals': 6, 'price': 0.5},
+    'receiptAsset': {'policyId': 'ABCDEF', 'symbol': 'qADA', 'decimals': 6},
+}]}}}}}
+
+
+def test_liqwid_requests_reuse_session():
+    client = LiqwidClient("https://example.invalid/graphql", retry_backoff=0, markets_ttl=0)
+    client.session = FakeSession([MARKETS_PAYLOAD, MARKETS_PAYLOAD])
+
+    with client:
+        markets = client.fetch_markets()
+        client.fetch_markets()
+
+    assert [m.id for m in markets] == ['Ada']
+    assert markets[0].qtoken_policy == 'abcdef'
+    assert len(client.session.calls) == 2
+    assert client.session.closed
+
+
+def test_clients_mount_retrying_adapter():
+    for client in (LiqwidClient("https://example.invalid/graphql", retry_attempts=3, retry_backoff=2.0),
+                   KoiosClient("https://example.invalid/api/v1", retry_attempts=3, retry_backoff=2.0)):
+        retry = client.session.get_adapter("https://example.invalid/").max_retries
+        assert retry.total == 2
+        assert retry.backoff_factor == 2.0
+        assert 503 in retry.status_forcelist
+        assert "POST" in retry.allowed_methods
+        if hasattr(retry, 'backoff_jitter'):  # urllib3 2.x
+            assert retry.backoff_jitter == 1.0
+            assert retry.backoff_max == 30
+
+
+def test_liqwid_final_http_error_is_not_retried_in_python():
+    client = LiqwidClient("https://example.invalid/graphql", retry_attempts=3)
+    client.session = FakeSession([FakeResponse("unavailable", status_code=503)])
+
+    with pytest.raises(Exception, match="HTTP 503"):
+        client.fetch_markets()
+    assert len(client.session.calls) == 1
+
+
+PRICES_PAYLOAD = {'data': {'liqwid': {'data': {'assets': {'results': [
+    {'symbol': 'ADA', 'price': 0.5},
+    {'symbol': 'DJED', 'price': 1.0},
+]}}}}}
+
+
+def test_manager_fetches_markets_and_prices_together():
+    manager = APIClientManager("https://example.invalid/graphql", "https://example.invalid/api/v1")
+
+    def post(url, data=None, timeout=None, **kwargs):
+        payload = PRICES_PAYLOAD if 'GetAssetPrices' in json.loads(data)['query'] else MARKETS_PAYLOAD
+        return FakeResponse(payload)
+
+    manager.liqwid.session.post = post
+    markets, prices = manager.fetch_markets_and_prices(['ADA'])
+
+    assert [m.id for m in markets] == ['Ada']
+    assert list(prices) == ['ADA']
+    assert prices['ADA'].price == 0.5
+
+
+def _assets_payload(addresses):
+    return [{'address': addr, 'asset_list': [
+        {'policy_id': 'AB' + addr[-1], 'asset_name': '', 'fingerprint': 'asset1', 'decimals': 6, 'quantity': '42'},
+    ]} for addr in addresses]
+
+
+def test_koios_fetch_wallet_assets_many_uses_one_batch():
+    client = KoiosClient("https://example.invalid/api/v1")
+    client.session = FakeSession([_assets_payload(['addr_1', 'addr_2'])])
+
+    result = client.fetch_wallet_assets_many(['addr_1', 'addr_2', 'addr_3', 'addr_1'])
+
+    assert len(client.session.calls) == 1
+    assert client.session.calls[0][2] == {'_addresses': ['addr_1', 'addr_2', 'addr_3']}
+    assert result['addr_2'][0].policy_id == 'ab2'
+    assert result['addr_1'][0].quantity == 42
+    assert result['addr_3'] == []
+
+
+def test_koios_failed_batch_falls_back_per_wallet():
+    client = KoiosClient("https://example.invalid/api/v1")
+
+    def post(url, data=None, timeout=None, **kwargs):
+        addrs = json.loads(data)['_addresses']
+        if 'addr_bad' in addrs:
+            return FakeResponse('boom', status_code=500)
+        return FakeResponse(_assets_payload(addrs))
+
+    client.session.post = post
+    result = client.fetch_wallet_assets_many(['addr_1', 'addr_2', 'addr_bad'])
+
+    assert sorted(result) == ['addr_1', 'addr_2']
+    assert result['addr_2'][0].policy_id == 'ab2'
+
+
+def test_liqwid_markets_and_prices_are_cached():
+    client = LiqwidClient("https://example.invalid/graphql")
+    client.session = FakeSession([MARKETS_PAYLOAD, PRICES_PAYLOAD, MARKETS_PAYLOAD])
+
+    assert [m.id for m in client.fetch_markets()] == ['Ada']
+    assert [m.id for m in client.fetch_markets()] == ['Ada']
+    assert client.fetch_asset_prices(['ADA'])['ADA'].price == 0.5
+    # Same snapshot serves a different symbol set
+    assert client.fetch_asset_prices(['DJED', 'IUSD']).keys() == {'DJED'}
+    assert len(client.session.calls) == 2
+
+    client.invalidate_cache()
+    client.fetch_markets()
+    assert len(client.session.calls) == 3
+
+
+def test_liqwid_concurrent_cold_fetches_share_one_request():
+    import threading
+    import time
+
+    client = LiqwidClient("https://example.invalid/graphql")
+    calls = []
+
+    def post(url, data=None, timeout=None, **kwargs):
+        calls.append(url)
+        time.sleep(0.05)
+        return FakeResponse(MARKETS_PAYLOAD)
+
+    client.session.post = post
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(client.fetch_markets())) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert [[m.id for m in r] for r in results] == [['Ada']] * 4
+
+
+def test_koios_parse_skips_malformed_assets():
+    assets = KoiosClient._parse_wallet_assets([
+        {'policy_id': 'AA', 'quantity': '5'},
+        {'policy_id': 'BB', 'quantity': 'not-a-number'},
+        {'quantity': '7'},
+        {'policy_id': 'CC', 'quantity': 9, 'decimals': None, 'asset_name': '4e'},
+    ])
+
+    assert [(a.policy_id, a.quantity, a.decimals) for a in assets] == [('aa', 5, 0), ('cc', 9, 0)]
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the domain models in src/shared/models.py
+"""
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+
+from src.shared.models import AdjustedSupplyPosition, AggregatedRow, AssetTimeSeries, Transaction
+
+
+def test_to_dict_uses_cached_field_names():
+    ts = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    row = AggregatedRow(timestamp=ts, asset_values={'usdc': 10.0}, total=10.0)
+
+    assert AggregatedRow._field_names == ('timestamp', 'asset_values', 'total')
+    assert row.to_dict() == {'timestamp': ts, 'asset_values': {'usdc': 10.0}, 'total': 10.0}
+
+    tx = Transaction(timestamp=ts, wallet_address='addr1', market_id='USDC', asset_symbol='usdc',
+                     amount=5.0, transaction_type='deposit', created_at=ts)
+    assert tx.to_dict()['amount'] == 5.0
+    assert list(tx.to_dict()) == list(Transaction._field_names)
+
+
+def test_transaction_equality_ignores_created_at():
+    ts = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    kwargs = dict(timestamp=ts, wallet_address='addr1', market_id='USDC', asset_symbol='usdc',
+                  amount=5.0, transaction_type='deposit')
+
+    a = Transaction(**kwargs, created_at=ts)
+    b = Transaction(**kwargs, created_at=datetime(2025, 1, 1, tzinfo=timezone.utc))
+
+    assert a == b
+    assert a != Transaction(**{**kwargs, 'amount': 6.0}, created_at=ts)
+
+
+def test_adjusted_position_batch_validation():
+    AdjustedSupplyPosition.validate_arrays('usdc', [0.0, 5.0], [1.0, 2.0], [0.0, -1.0])
+
+    with pytest.raises(ValueError, match="raw_position cannot be negative"):
+        AdjustedSupplyPosition.validate_arrays('usdc', [1.0, -0.5], [0.0, 0.0], [0.0, 0.0])
+    with pytest.raises(ValueError, match="cumulative_withdrawals must be negative or zero"):
+        AdjustedSupplyPosition.validate_arrays('usdc', [1.0], [0.0], [2.0])
+    with pytest.raises(ValueError, match="asset_symbol cannot be empty"):
+        AdjustedSupplyPosition.validate_arrays(' ', [], [], [])
+
+
+def test_adjusted_position_constructor_validates_and_trusted_path_matches():
+    ts = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    kwargs = dict(timestamp=ts, asset_symbol='usdc', raw_position=10.0, cumulative_deposits=4.0,
+                  cumulative_withdrawals=-1.0, adjusted_position=7.0, net_gain=3.0)
+
+    with pytest.raises(ValueError, match="raw_position cannot be negative"):
+        AdjustedSupplyPosition(**{**kwargs, 'raw_position': -1.0})
+
+    assert AdjustedSupplyPosition.from_validated(**kwargs) == AdjustedSupplyPosition(**kwargs)
+
+
+def test_sorted_points_matches_for_array_and_dict_series():
+    t0 = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    t1 = datetime(2024, 1, 2, tzinfo=timezone.utc)
+    ms = [int(t.timestamp() * 1000) for t in (t1, t0)]
+
+    array_backed = AssetTimeSeries.from_arrays('usdc', np.array(ms), np.array([2.0, 1.0]))
+    dict_backed = AssetTimeSeries(asset_symbol='usdc', series={t1: 2.0, t0: 1.0})
+
+    assert array_backed.sorted_points() == ([t0, t1], [1.0, 2.0])
+    assert dict_backed.sorted_points() == ([t0, t1], [1.0, 2.0])
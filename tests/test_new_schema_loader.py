@@ -1,7 +1,11 @@
 from pathlib import Path
+import pytest
 from src.core.settings import load_settings
 from src.core.config_normalizer import build_normalized_config
 
+# Preflight talks to GreptimeDB; stub the connection check for every test
+pytestmark = pytest.mark.usefixtures("greptime_preflight_ok")
+
 
 def test_load_new_schema_and_normalize(tmp_path: Path):
     cfg = """
@@ -87,14 +91,7 @@ maintenance:
     conf = tmp_path / "config.yaml"
     conf.write_text(cfg)
 
-    # Avoid Greptime network dependency during preflight
-    import src.shared.greptime_reader as gr
-    orig = gr.GreptimeReader.test_connection
-    gr.GreptimeReader.test_connection = lambda self: True
-    try:
-        settings = load_settings(conf)
-    finally:
-        gr.GreptimeReader.test_connection = orig
+    settings = load_settings(conf)
 
     assert settings.orchestrator.prices_v2 is not None
     assert settings.orchestrator.analysis_v2 is not None
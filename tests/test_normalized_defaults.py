@@ -1,8 +1,12 @@
 import json
 from pathlib import Path
+import pytest
 from src.core.settings import load_settings, SettingsError
 from src.core.config_normalizer import build_normalized_config
 
+# Preflight talks to GreptimeDB; stub the connection check for every test
+pytestmark = pytest.mark.usefixtures("greptime_preflight_ok")
+
 
 def write_yaml(tmp_path: Path, content: str) -> Path:
     p = tmp_path / "config.yaml"
@@ -67,14 +71,7 @@ maintenance:
     enabled: false
 '''
     path = write_yaml(tmp_path, cfg)
-    # Avoid Greptime network dependency during preflight
-    import src.shared.greptime_reader as gr
-    orig = gr.GreptimeReader.test_connection
-    gr.GreptimeReader.test_connection = lambda self: True
-    try:
-        settings = load_settings(path)
-    finally:
-        gr.GreptimeReader.test_connection = orig
+    settings = load_settings(path)
     norm = build_normalized_config(settings)
     assert norm.prices.priority_by_logical["liqwid"][0] == "greptime(liqwid)"
 
@@ -99,13 +96,5 @@ orchestrator:
       minswap: ["greptime(minswap)", "minswap"]
 '''
     path = write_yaml(tmp_path, cfg)
-    # Avoid Greptime network dependency during preflight
-    import src.shared.greptime_reader as gr
-    orig = gr.GreptimeReader.test_connection
-    gr.GreptimeReader.test_connection = lambda self: True
-    try:
-        import pytest
-        with pytest.raises(SettingsError):
-            _ = load_settings(path)
-    finally:
-        gr.GreptimeReader.test_connection = orig
+    with pytest.raises(SettingsError):
+        _ = load_settings(path)
@@ -1,25 +1,20 @@
-import os
-import yaml
+import copy
+from functools import lru_cache
 from pathlib import Path
-import types
-import pytest
 
-from pathlib import Path
-import yaml
 import pytest
+import yaml
 
 from src.core.settings import load_settings, SettingsError
 from src.core.config_normalizer import build_normalized_config
+import src.shared.greptime_reader as gr
 
-
-def _write(tmp_path: Path, content: str) -> Path:
-    p = tmp_path / "config.yaml"
-    p.write_text(content)
-    return p
+# Preflight talks to GreptimeDB; stub the connection check for every test
+pytestmark = pytest.mark.usefixtures("greptime_preflight_ok")
 
 
-def test_v2_endpoint_enforcement_liqwid_requires_endpoint(tmp_path: Path):
-    cfg = """
+# Sections shared by every config below; each test adds prices/analysis
+_BASE_CFG_TEXT = """
 settings:
   timezone: "UTC"
   currency: "usd"
@@ -43,150 +38,94 @@ data:
   date_range:
     start: "2025-10-04"
     end: null
-prices:
-  sources: ["liqwid"]
-  duty_cycle_threshold: 0.9
-  endpoints: {}
-  priority_by_logical:
-    liqwid: ["greptime(liqwid)", "liqwid"]
-analysis:
-  trend_indicator:
-    enabled: true
-  price_compare:
-    enabled: true
-    sources: ["liqwid"]
 runtime:
   telemetry:
     enabled: false
-maintenance:
-  cleanup:
-    enabled: true
-    expire_before: "7d"
-    paths: ["output"]
-    extensions: [".png", ".jpg", ".jpeg", ".svg", ".csv", ".tsv", ".json", ".log"]
 """
-    path = _write(tmp_path, cfg)
-    # Avoid Greptime network dependency so preflight passes
-    import src.shared.greptime_reader as gr
-    orig = gr.GreptimeReader.test_connection
-    gr.GreptimeReader.test_connection = lambda self: True
-    try:
-        with pytest.raises(SettingsError) as ei:
-            _ = load_settings(path)
-        assert "prices.endpoints.liqwid_graphql" in str(ei.value)
-    finally:
-        gr.GreptimeReader.test_connection = orig
+_BASE = yaml.safe_load(_BASE_CFG_TEXT)
+
+_LIQWID_PRIORITY = {"liqwid": ["greptime(liqwid)", "liqwid"]}
+_BOTH_PRIORITY = {**_LIQWID_PRIORITY, "minswap": ["greptime(minswap)", "minswap"]}
+
+
+def _write(tmp_path: Path, content: str) -> Path:
+    p = tmp_path / "config.yaml"
+    p.write_text(content)
+    return p
+
+
+def _write_cfg(tmp_path: Path, **sections) -> Path:
+    """Write the base config with the given top-level sections added"""
+    cfg = copy.deepcopy(_BASE)
+    cfg.update(sections)
+    return _write(tmp_path, yaml.safe_dump(cfg, sort_keys=False))
+
+
+def test_v2_endpoint_enforcement_liqwid_requires_endpoint(tmp_path: Path):
+    path = _write_cfg(
+        tmp_path,
+        prices={
+            "sources": ["liqwid"],
+            "duty_cycle_threshold": 0.9,
+            "endpoints": {},
+            "priority_by_logical": _LIQWID_PRIORITY,
+        },
+        analysis={
+            "trend_indicator": {"enabled": True},
+            "price_compare": {"enabled": True, "sources": ["liqwid"]},
+        },
+        maintenance={
+            "cleanup": {
+                "enabled": True,
+                "expire_before": "7d",
+                "paths": ["output"],
+                "extensions": [".png", ".jpg", ".jpeg", ".svg", ".csv", ".tsv", ".json", ".log"],
+            },
+        },
+    )
+    with pytest.raises(SettingsError) as ei:
+        _ = load_settings(path)
+    assert "prices.endpoints.liqwid_graphql" in str(ei.value)
 
 
 def test_v2_endpoint_enforcement_minswap_requires_endpoint(tmp_path: Path):
-    cfg = """
-settings:
-  timezone: "UTC"
-  currency: "usd"
-domain:
-  assets: ["usdc"]
-data:
-  databases:
-    greptime:
-      host: "http://localhost"
-      port: 4000
-      database: "liqwid"
-      timeout: 5
-  datasets:
-    transactions:
-      alignment_method: "detect_spike"
-      sources:
-        liqwid:
-          table_asset_prefix: "liqwid_supply_positions_"
-          deposits_prefix: "liqwid_deposits_"
-          withdrawals_prefix: "liqwid_withdrawals_"
-  date_range:
-    start: "2025-10-04"
-    end: null
-prices:
-  sources: ["liqwid", "minswap"]
-  duty_cycle_threshold: 0.9
-  endpoints: {}
-  priority_by_logical:
-    liqwid: ["greptime(liqwid)", "liqwid"]
-    minswap: ["greptime(minswap)", "minswap"]
-analysis:
-  trend_indicator:
-    enabled: true
-  price_compare:
-    enabled: true
-    sources: ["minswap"]
-runtime:
-  telemetry:
-    enabled: false
-"""
-    path = _write(tmp_path, cfg)
-    # Avoid Greptime network dependency so preflight passes
-    import src.shared.greptime_reader as gr
-    orig = gr.GreptimeReader.test_connection
-    gr.GreptimeReader.test_connection = lambda self: True
-    try:
-        with pytest.raises(SettingsError) as ei:
-            _ = load_settings(path)
-        assert "prices.endpoints.minswap_aggregator" in str(ei.value)
-    finally:
-        gr.GreptimeReader.test_connection = orig
+    path = _write_cfg(
+        tmp_path,
+        prices={
+            "sources": ["liqwid", "minswap"],
+            "duty_cycle_threshold": 0.9,
+            "endpoints": {},
+            "priority_by_logical": _BOTH_PRIORITY,
+        },
+        analysis={
+            "trend_indicator": {"enabled": True},
+            "price_compare": {"enabled": True, "sources": ["minswap"]},
+        },
+    )
+    with pytest.raises(SettingsError) as ei:
+        _ = load_settings(path)
+    assert "prices.endpoints.minswap_aggregator" in str(ei.value)
 
 
 def test_v2_indirection_prices_sources(tmp_path: Path):
-    cfg = """
-settings:
-  timezone: "UTC"
-  currency: "usd"
-domain:
-  assets: ["usdc"]
-data:
-  databases:
-    greptime:
-      host: "http://localhost"
-      port: 4000
-      database: "liqwid"
-      timeout: 5
-  datasets:
-    transactions:
-      alignment_method: "detect_spike"
-      sources:
-        liqwid:
-          table_asset_prefix: "liqwid_supply_positions_"
-          deposits_prefix: "liqwid_deposits_"
-          withdrawals_prefix: "liqwid_withdrawals_"
-  date_range:
-    start: "2025-10-04"
-    end: null
-prices:
-  sources: ["liqwid", "minswap"]
-  duty_cycle_threshold: 0.9
-  endpoints:
-    liqwid_graphql: "https://v2.api.liqwid.finance/graphql"
-    minswap_aggregator: "https://agg-api.minswap.org"
-  priority_by_logical:
-    liqwid: ["greptime(liqwid)", "liqwid"]
-    minswap: ["greptime(minswap)", "minswap"]
-analysis:
-  trend_indicator:
-    enabled: true
-  price_compare:
-    enabled: true
-    sources: "@prices.sources"
-runtime:
-  telemetry:
-    enabled: false
-"""
-    path = _write(tmp_path, cfg)
-
-    # Monkeypatch GreptimeReader.test_connection to avoid real network during preflight
-    import src.shared.greptime_reader as gr
-    orig = gr.GreptimeReader.test_connection
-    gr.GreptimeReader.test_connection = lambda self: True
-    try:
-        settings = load_settings(path)
-    finally:
-        gr.GreptimeReader.test_connection = orig
+    path = _write_cfg(
+        tmp_path,
+        prices={
+            "sources": ["liqwid", "minswap"],
+            "duty_cycle_threshold": 0.9,
+            "endpoints": {
+                "liqwid_graphql": "https://v2.api.liqwid.finance/graphql",
+                "minswap_aggregator": "https://agg-api.minswap.org",
+            },
+            "priority_by_logical": _BOTH_PRIORITY,
+        },
+        analysis={
+            "trend_indicator": {"enabled": True},
+            "price_compare": {"enabled": True, "sources": "@prices.sources"},
+        },
+    )
+
+    settings = load_settings(path)
 
     # Ensure indirection resolved to prices.sources
     assert settings.orchestrator.analysis_v2 is not None
@@ -199,66 +138,83 @@ runtime:
     assert norm.prices.priority_by_logical["liqwid"][0] == "greptime(liqwid)"
 
 
-def test_preflight_fails_without_greptime(tmp_path: Path):
-    cfg = """
-settings:
-  timezone: "UTC"
-  currency: "usd"
-domain:
-  assets: ["usdc"]
-data:
-  databases:
-    greptime:
-      host: "http://localhost"
-      port: 4000
-      database: "liqwid"
-      timeout: 5
-  datasets:
-    transactions:
-      alignment_method: "detect_spike"
-      sources:
-        liqwid:
-          table_asset_prefix: "liqwid_supply_positions_"
-          deposits_prefix: "liqwid_deposits_"
-          withdrawals_prefix: "liqwid_withdrawals_"
-  date_range:
-    start: "2025-10-04"
-    end: null
-prices:
-  sources: ["liqwid"]
-  duty_cycle_threshold: 0.9
-  endpoints: {}
-  priority_by_logical:
-    liqwid: ["greptime(liqwid)", "liqwid"]
-analysis:
-  trend_indicator:
-    enabled: true
-  price_compare:
-    enabled: false
-runtime:
-  telemetry:
-    enabled: false
-"""
-    path = _write(tmp_path, cfg)
+def test_load_settings_caches_parse_but_not_settings(tmp_path: Path, monkeypatch):
+    prices = {"sources": ["liqwid"], "endpoints": {"liqwid_graphql": "https://v2.api.liqwid.finance/graphql"},
+              "priority_by_logical": _LIQWID_PRIORITY}
+    path = _write_cfg(tmp_path, prices=prices)
+    first = load_settings(path)
+    first.client.greptime.test_prefix = True
+
+    # Each call builds its own Settings, so caller mutations do not leak
+    second = load_settings(str(path))
+    assert second is not first
+    assert second.client.greptime.test_prefix is False
+
+    # Rewriting the file (different size) is picked up
+    path = _write_cfg(tmp_path, prices=dict(prices, duty_cycle_threshold=0.5))
+    assert load_settings(path).orchestrator.prices_v2.duty_cycle_threshold == 0.5
+
+    # Preflight still runs for an unchanged, already parsed file
+    monkeypatch.setattr(gr.GreptimeReader, "test_connection", lambda self: False)
+    with pytest.raises(SettingsError, match="Preflight failed"):
+        load_settings(path)
+
+
+def test_v2_unknown_indirection_rejected(tmp_path: Path):
+    path = _write_cfg(
+        tmp_path,
+        prices={
+            "sources": ["liqwid"],
+            "duty_cycle_threshold": 0.9,
+            "endpoints": {"liqwid_graphql": "https://v2.api.liqwid.finance/graphql"},
+            "priority_by_logical": _LIQWID_PRIORITY,
+        },
+        analysis={
+            "trend_indicator": {"enabled": True},
+            "price_compare": {"enabled": True, "sources": "@prices.endpoints"},
+        },
+    )
+    with pytest.raises(SettingsError) as ei:
+        load_settings(path)
+    assert "unknown reference '@prices.endpoints'" in str(ei.value)
+
+
+def test_preflight_fails_without_greptime(tmp_path: Path, monkeypatch):
+    path = _write_cfg(
+        tmp_path,
+        prices={
+            "sources": ["liqwid"],
+            "duty_cycle_threshold": 0.9,
+            "endpoints": {},
+            "priority_by_logical": _LIQWID_PRIORITY,
+        },
+        analysis={
+            "trend_indicator": {"enabled": True},
+            "price_compare": {"enabled": False},
+        },
+    )
     # Force preflight to fail
-    import src.shared.greptime_reader as gr
-    orig = gr.GreptimeReader.test_connection
-    gr.GreptimeReader.test_connection = lambda self: False
-    try:
-        with pytest.raises(SettingsError) as ei:
-            load_settings(path)
-        assert "Preflight failed" in str(ei.value)
-    finally:
-        gr.GreptimeReader.test_connection = orig
+    monkeypatch.setattr(gr.GreptimeReader, "test_connection", lambda self: False)
+    with pytest.raises(SettingsError) as ei:
+        load_settings(path)
+    assert "Preflight failed" in str(ei.value)
 
 
-def test_repo_yaml_is_v2_only_no_duplicates():
-    # Parse repo config to ensure there are no duplicate top-level keys within the same document
+@lru_cache(maxsize=None)
+def _repo_config():
+    """Read and parse the repo config once per session: (path, text, data); text/data are None if missing"""
     repo_root = Path(__file__).resolve().parents[2]
     cfg_path = repo_root / "alert_orchestrator" / "config" / "orchestrator_config.yaml"
-    assert cfg_path.exists(), f"Missing config at {cfg_path}"
+    if not cfg_path.exists():
+        return cfg_path, None, None
     text = cfg_path.read_text()
-    data = yaml.safe_load(text)
+    return cfg_path, text, yaml.load(text, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader))
+
+
+def test_repo_yaml_is_v2_only_no_duplicates():
+    # Parse repo config to ensure there are no duplicate top-level keys within the same document
+    cfg_path, text, data = _repo_config()
+    assert text is not None, f"Missing config at {cfg_path}"
     assert isinstance(data, dict)
     # Expected top-level keys must be unique
     expected_keys = {"settings", "domain", "data", "prices", "analysis", "runtime", "visualization", "maintenance"}
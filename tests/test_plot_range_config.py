@@ -9,16 +9,23 @@ Tests cover:
 """
 import pytest
 from datetime import datetime, timezone, timedelta
-from pathlib import Path
-import sys
-
-# Add parent directory to path for imports
-sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.core.settings import PlotRangeConfig, AggregationConfig
 from src.shared.config import DateRange
 
 
+@pytest.fixture(scope="module")
+def data_range():
+    return DateRange(
+        start=datetime(2025, 10, 1, tzinfo=timezone.utc),
+        end=datetime(2025, 11, 1, tzinfo=timezone.utc)
+    )
+
+
+@pytest.fixture(scope="module")
+def now():
+    return datetime(2025, 11, 22, 12, 0, 0, tzinfo=timezone.utc)
+
 
 class TestPlotRangeConfig:
     """Test PlotRangeConfig dataclass"""
@@ -80,67 +87,24 @@ class TestPlotRangeConfig:
         assert result.start == custom_start
         assert result.end == data_range.end  # Falls back to data_range.end
     
-    def test_resolve_relative_mode_days(self):
-        """Test relative mode with days duration"""
-        data_range = DateRange(
-            start=datetime(2025, 10, 1, tzinfo=timezone.utc),
-            end=datetime(2025, 11, 1, tzinfo=timezone.utc)
-        )
-        now = datetime(2025, 11, 22, 12, 0, 0, tzinfo=timezone.utc)
-        
-        config = PlotRangeConfig(
-            mode="relative",
-            relative_duration="7d"
-        )
-        result = config.resolve(data_range, now=now)
-        
-        expected_start = now - timedelta(days=7)
-        assert result.start == expected_start
-        assert result.end == now
-    
-    def test_resolve_relative_mode_hours(self):
-        """Test relative mode with hours duration"""
-        data_range = DateRange(
-            start=datetime(2025, 10, 1, tzinfo=timezone.utc),
-            end=datetime(2025, 11, 1, tzinfo=timezone.utc)
-        )
-        now = datetime(2025, 11, 22, 12, 0, 0, tzinfo=timezone.utc)
-        
+    @pytest.mark.parametrize("duration,td", [
+        ("7d", timedelta(days=7)),
+        ("48h", timedelta(hours=48)),
+        ("2w", timedelta(weeks=2)),
+    ])
+    def test_resolve_relative_mode(self, data_range, now, duration, td):
+        """Test relative mode with days/hours/weeks durations"""
         config = PlotRangeConfig(
             mode="relative",
-            relative_duration="48h"
+            relative_duration=duration
         )
         result = config.resolve(data_range, now=now)
         
-        expected_start = now - timedelta(hours=48)
-        assert result.start == expected_start
+        assert result.start == now - td
         assert result.end == now
     
-    def test_resolve_relative_mode_weeks(self):
-        """Test relative mode with weeks duration"""
-        data_range = DateRange(
-            start=datetime(2025, 10, 1, tzinfo=timezone.utc),
-            end=datetime(2025, 11, 1, tzinfo=timezone.utc)
-        )
-        now = datetime(2025, 11, 22, 12, 0, 0, tzinfo=timezone.utc)
-        
-        config = PlotRangeConfig(
-            mode="relative",
-            relative_duration="2w"
-        )
-        result = config.resolve(data_range, now=now)
-        
-        expected_start = now - timedelta(weeks=2)
-        assert result.start == expected_start
-        assert result.end == now
-    
-    def test_resolve_relative_mode_invalid_format(self):
+    def test_resolve_relative_mode_invalid_format(self, data_range):
         """Test relative mode with invalid duration format falls back"""
-        data_range = DateRange(
-            start=datetime(2025, 10, 1, tzinfo=timezone.utc),
-            end=datetime(2025, 11, 1, tzinfo=timezone.utc)
-        )
-        
         config = PlotRangeConfig(
             mode="relative",
             relative_duration="invalid"
@@ -151,13 +115,8 @@ class TestPlotRangeConfig:
         assert result.start == data_range.start
         assert result.end == data_range.end
     
-    def test_resolve_relative_mode_no_duration(self):
+    def test_resolve_relative_mode_no_duration(self, data_range):
         """Test relative mode without duration specified"""
-        data_range = DateRange(
-            start=datetime(2025, 10, 1, tzinfo=timezone.utc),
-            end=datetime(2025, 11, 1, tzinfo=timezone.utc)
-        )
-        
         config = PlotRangeConfig(mode="relative")
         result = config.resolve(data_range)
         
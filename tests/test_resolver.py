@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the Greptime-first asset Resolver.
+
+The reader is an in-memory fake that answers SHOW TABLES and the mapping
+queries with Greptime-shaped JSON, so the resolver's own parser is exercised.
+"""
+import re
+from types import SimpleNamespace
+
+import pytest
+
+from src.shared import resolver as resolver_module
+from src.shared.resolver import Resolver
+
+
+def _result(columns, rows):
+    return {'output': [{'records': {
+        'schema': {'column_schemas': [{'name': c} for c in columns]},
+        'rows': rows,
+    }}]}
+
+
+class FakeReader:
+    def __init__(self, tables, unified_rows):
+        self.tables = tables
+        self.unified_rows = unified_rows
+        self.show_calls = 0
+        self.sql = []
+
+    def _show_tables(self):
+        self.show_calls += 1
+        return list(self.tables)
+
+    def _execute_sql(self, sql):
+        self.sql.append(sql)
+        if 'liqwid_supply_positions' in sql.lower():
+            rows = self.unified_rows
+            match = re.search(r"WHERE LOWER\(market_id\) = '((?:[^']|'')*)'", sql)
+            if match:
+                key = match.group(1).replace("''", "'")
+                rows = [r for r in rows if key in {str(v).lower() for v in r}][:1]
+            else:
+                rows = rows[:resolver_module.UNIFIED_SCAN_LIMIT]
+            return _result(['market_id', 'market_name', 'asset_symbol'], rows)
+        return _result([], [])
+
+
+def test_resolve_from_unified_table_scans_tables_once():
+    reader = FakeReader(
+        ['public.Liqwid_Supply_Positions', 'liqwid_supply_positions_usdc'],
+        [['USDC', 'USD Coin', 'usdc'], ['DJED', 'Djed', 'djed']],
+    )
+    resolver = Resolver(greptime_reader=reader)
+
+    assert resolver.resolve_asset('usd coin') == ('USDC', 'usdc')
+    assert resolver.resolve_asset('DJED') == ('DJED', 'djed')
+    assert resolver.resolve_asset('Djed') == ('DJED', 'djed')
+    assert reader.show_calls == 1
+    # One mapping query builds the index for every later resolve
+    assert len(reader.sql) == 1
+    assert 'FROM public.Liqwid_Supply_Positions' in reader.sql[0]
+
+
+def test_failed_table_listing_is_not_cached():
+    class FlakyReader(FakeReader):
+        def _show_tables(self):
+            self.show_calls += 1
+            return None if self.show_calls == 1 else list(self.tables)
+
+    reader = FlakyReader(['liqwid_supply_positions'], [])
+    resolver = Resolver(greptime_reader=reader)
+
+    assert resolver._get_tables() == {}
+    assert resolver._get_tables() == {'liqwid_supply_positions': 'liqwid_supply_positions'}
+    assert reader.show_calls == 2
+
+
+def test_unresolvable_asset_raises():
+    resolver = Resolver(greptime_reader=FakeReader([], []))
+
+    with pytest.raises(RuntimeError):
+        resolver.resolve_asset('nope')
+
+
+def test_truncated_index_falls_back_to_filtered_lookup(monkeypatch):
+    monkeypatch.setattr(resolver_module, 'UNIFIED_SCAN_LIMIT', 2)
+    reader = FakeReader(
+        ['liqwid_supply_positions'],
+        [['USDC', 'USD Coin', 'usdc'], ['DJED', 'Djed', 'djed'], ['IUSD', "Indigo's USD", 'iusd']],
+    )
+    resolver = Resolver(greptime_reader=reader)
+
+    assert resolver.resolve_asset('djed') == ('DJED', 'djed')
+    assert len(reader.sql) == 1
+    assert resolver.resolve_asset("indigo's usd") == ('IUSD', 'iusd')
+    assert len(reader.sql) == 2
+    assert "= 'indigo''s usd'" in reader.sql[1]
+
+
+class AssetTablesReader(FakeReader):
+    """No unified table; one per-asset table per symbol with (market_id, market_name)"""
+
+    def __init__(self, markets, fail_union=False):
+        super().__init__(['liqwid_supply_positions_' + s for s in markets], [])
+        self.markets = markets
+        self.fail_union = fail_union
+
+    def discover_asset_tables(self):
+        return list(self.markets)
+
+    def _get_table_name(self, symbol):
+        return 'liqwid_supply_positions_' + symbol
+
+    def _execute_sql(self, sql):
+        self.sql.append(sql)
+        if 'UNION ALL' in sql:
+            if self.fail_union:
+                raise RuntimeError('column market_name not found')
+            rows = [[s, *self.markets[s]] for s in reversed(self.markets)]
+            return _result(['symbol', 'market_id', 'market_name'], rows)
+        symbol = sql.split('liqwid_supply_positions_')[1].split()[0]
+        return _result(['market_id', 'market_name'], [list(self.markets[symbol])])
+
+
+def test_asset_tables_probed_in_one_union_query():
+    reader = AssetTablesReader({'usdc': ('USDC', 'USD Coin'), 'djed': ('DJED', 'Djed')})
+    resolver = Resolver(greptime_reader=reader)
+
+    assert resolver.resolve_asset('usd coin') == ('USDC', 'usdc')
+    assert resolver.resolve_asset('DJED') == ('DJED', 'djed')
+    # The parsed probe index is reused for later keys
+    assert len(reader.sql) == 1
+    assert "(SELECT 'djed' AS symbol, market_id, market_name FROM liqwid_supply_positions_djed LIMIT 1)" in reader.sql[0]
+
+
+def test_asset_tables_fall_back_to_per_table_probes():
+    reader = AssetTablesReader({'usdc': ('USDC', 'USD Coin'), 'djed': ('DJED', 'Djed')}, fail_union=True)
+    resolver = Resolver(greptime_reader=reader)
+
+    assert resolver.resolve_asset('djed') == ('DJED', 'djed')
+    assert len(reader.sql) == 3
+
+
+def test_liqwid_fallback_matches_id_name_or_symbol():
+    class FakeLiqwid:
+        def fetch_markets(self):
+            return [
+                SimpleNamespace(id='Ada', name='Cardano', underlying_symbol='ADA'),
+                SimpleNamespace(id='DJED', name='Djed', underlying_symbol=''),
+                SimpleNamespace(id='USDC', name='USD Coin', underlying_symbol='USDC'),
+            ]
+
+    resolver = Resolver(liqwid_client=FakeLiqwid())
+
+    assert resolver.resolve_asset('usd coin') == ('USDC', 'usdc')
+    assert resolver.resolve_asset('ADA') == ('Ada', 'ada')
+    with pytest.raises(RuntimeError):
+        # Markets without an underlying symbol are skipped
+        resolver.resolve_asset('djed')
+
+
+def test_cached_keys_resolve_without_queries():
+    reader = FakeReader(['liqwid_supply_positions'], [['USDC', 'USD Coin', 'usdc']])
+    resolver = Resolver(greptime_reader=reader)
+
+    assert resolver.resolve_asset(' USDC ') == ('USDC', 'usdc')
+    assert resolver.resolve_asset('usdc') == ('USDC', 'usdc')
+    assert resolver.resolve_asset('Usdc') == ('USDC', 'usdc')
+    assert len(reader.sql) == 1
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Unit tests for TimeSeriesAggregator in src/shared/aggregation.py
+"""
+import sys
+from datetime import datetime, timezone
+
+import numpy as np
+
+from src.shared.aggregation import TimeSeriesAggregator
+from src.shared.models import AggregatedFrame, AssetTimeSeries
+
+
+def _dt(ms):
+    return datetime.fromtimestamp(ms / 1000, tz=timezone.utc)
+
+
+def _series(fill_missing_with_zero, as_arrays):
+    data = {
+        'usdc': {1000: 1.0, 2000: 2.0},
+        'djed': {2000: 10.0, 3000: 30.0},
+    }
+    out = {}
+    for sym, points in data.items():
+        if as_arrays:
+            out[sym] = AssetTimeSeries.from_arrays(sym, np.array(list(points)), np.array(list(points.values())))
+        else:
+            out[sym] = AssetTimeSeries(sym, {_dt(ms): v for ms, v in points.items()})
+    return TimeSeriesAggregator(fill_missing_with_zero).aggregate_series(out)
+
+
+def test_array_and_dict_series_aggregate_identically():
+    for fill in (True, False):
+        fast = _series(fill, as_arrays=True)
+        slow = _series(fill, as_arrays=False)
+        assert [(r.timestamp, r.asset_values, r.total) for r in fast] == \
+               [(r.timestamp, r.asset_values, r.total) for r in slow]
+
+    rows = _series(True, as_arrays=True)
+    assert [r.total for r in rows] == [1.0, 12.0, 30.0]
+    assert rows[0].asset_values == {'djed': 0.0, 'usdc': 1.0}
+
+    rows = _series(False, as_arrays=True)
+    assert rows[0].asset_values == {'usdc': 1.0}
+
+
+def test_frame_round_trips_rows():
+    rows = _series(False, as_arrays=False)
+    frame = AggregatedFrame.from_rows(rows)
+
+    assert frame.symbols == ('djed', 'usdc')
+    assert frame.values.shape == (3, 2)
+    assert np.isnan(frame.values[0, 0])
+    assert [(r.asset_values, r.total) for r in frame.to_rows()] == [(r.asset_values, r.total) for r in rows]
+
+
+def test_gain_stats_skip_zero_baseline():
+    rows = AggregatedFrame(
+        [_dt(1000), _dt(2000), _dt(3000)], ('usdc',),
+        np.array([[0.0], [100.0], [110.0]]), np.array([0.0, 100.0, 110.0]),
+    ).to_rows()
+    stats = TimeSeriesAggregator().compute_gain_stats(rows)
+
+    assert stats.initial_total == 100.0
+    assert stats.average_absolute_gain == (-100.0 + 0.0 + 10.0) / 3
+    assert abs(stats.average_percentage_gain - (-100.0 + 0.0 + 10.0) / 3) < 1e-9
+
+
+def test_row_dicts_share_interned_symbol_keys():
+    rows = _series(True, as_arrays=True)
+    keys = [next(k for k in r.asset_values if k == 'usdc') for r in rows]
+    assert all(k is keys[0] for k in keys)
+    assert keys[0] is sys.intern('usdc')
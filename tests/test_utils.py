@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Unit tests for helpers in src/shared/utils.py
+"""
+import logging
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+
+from src.shared import utils
+from src.shared.utils import (
+    ProgressTracker,
+    are_valid_cardano_addresses,
+    build_date_range_filter,
+    datetime_to_timestamp,
+    is_valid_cardano_address,
+    remove_smooth_curve_outliers,
+    retry_with_backoff,
+    validate_table_name,
+)
+
+
+# Base (bech32), testnet enterprise (bech32) and enterprise (bech32m) addresses
+VALID_ADDRESSES = [
+    'addr1qykhz9jzkuntq3qpvf72n7avxt6us5c0kxgre3xmqgjcw9ujrfygrg0uusmrs48l3zx07juw0p6avqxzdq3eqsf23nmshgv889',
+    'addr_test1vqkhz9jzkuntq3qpvf72n7avxt6us5c0kxgre3xmqgjcw9c834x6h',
+    'addr1vykhz9jzkuntq3qpvf72n7avxt6us5c0kxgre3xmqgjcw9cf93kss',
+]
+
+
+@pytest.mark.parametrize('addr', VALID_ADDRESSES)
+def test_valid_cardano_addresses(addr):
+    assert is_valid_cardano_address(addr)
+    assert is_valid_cardano_address(addr.upper())
+    assert is_valid_cardano_address(f'  {addr}  ')
+
+
+@pytest.mark.parametrize('addr', [
+    '',
+    None,
+    VALID_ADDRESSES[0][:-1] + 'q',  # checksum mismatch
+    VALID_ADDRESSES[1][:12] + 'b' + VALID_ADDRESSES[1][13:],  # 'b' is not in the charset
+    'Addr1vykhz9jzkuntq3qpvf72n7avxt6us5c0kxgre3xmqgjcw9cf93kss',  # mixed case
+    'stake1uykhz9jzkuntq3qpvf72n7avxt6us5c0kxgre3xmqgjcw9cqnpufq',  # wrong HRP
+    'addr1qqqqqq',  # too short for a checksum
+])
+def test_invalid_cardano_addresses(addr):
+    assert not is_valid_cardano_address(addr)
+
+
+def test_are_valid_cardano_addresses_matches_single_validator():
+    addrs = VALID_ADDRESSES + ['addr1xyz', VALID_ADDRESSES[0], None, [], '']
+    assert are_valid_cardano_addresses(addrs) == [True, True, True, False, True, False, False, False]
+
+
+def test_validate_table_name_allow_list():
+    assert validate_table_name('liqwid_supply_positions_usdc', 'liqwid_supply_positions_')
+    assert validate_table_name('liqwid_supply_positions_update')
+    assert not validate_table_name('minswap_prices_usdc', 'liqwid_supply_positions_')
+    for name in ('', None, 'usdc; DROP TABLE x', 'usdc--', 'usdc/*', "usdc'", 'public.usdc', 'usdc\n'):
+        assert not validate_table_name(name)
+
+
+def test_progress_tracker_logs_each_milestone_once(caplog):
+    tracker = ProgressTracker(5, "Fetching")
+    with caplog.at_level('INFO', logger='ProgressTracker'):
+        for _ in range(5):
+            tracker.update()
+    assert [r.getMessage() for r in caplog.records] == [
+        'Fetching: 25% complete (2/5)',
+        'Fetching: 50% complete (3/5)',
+        'Fetching: 75% complete (4/5)',
+        'Fetching: Complete! (5/5)',
+    ]
+
+
+def test_progress_tracker_throttles_repeated_complete(caplog):
+    tracker = ProgressTracker(4, "Syncing")
+    with caplog.at_level('INFO', logger='ProgressTracker'):
+        for _ in range(50):
+            tracker.update()
+    messages = [r.getMessage() for r in caplog.records]
+    assert messages[:4] == [
+        'Syncing: 25% complete (1/4)',
+        'Syncing: 50% complete (2/4)',
+        'Syncing: 75% complete (3/4)',
+        'Syncing: Complete! (4/4)',
+    ]
+    assert len(messages) < 10
+
+
+def test_retry_with_backoff_sleeps_on_schedule(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(utils.time, 'sleep', sleeps.append)
+    calls = iter([ValueError('a'), ValueError('b'), 'ok'])
+
+    def flaky():
+        item = next(calls)
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+    assert retry_with_backoff(flaky, max_attempts=3, base_delay=0.5, backoff_factor=3.0) == 'ok'
+    assert sleeps == [0.5, 1.5]
+
+
+def test_retry_with_backoff_jitter_and_final_raise(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(utils.time, 'sleep', sleeps.append)
+
+    def failing():
+        raise ValueError('boom')
+
+    with pytest.raises(ValueError, match='boom'):
+        retry_with_backoff(failing, max_attempts=3, base_delay=1.0, jitter=0.5)
+    assert len(sleeps) == 2
+    assert 1.0 <= sleeps[0] <= 1.5 and 2.0 <= sleeps[1] <= 3.0
+
+
+def test_datetime_to_timestamp_keeps_exact_milliseconds():
+    # float(dt.timestamp()) * 1000 lands just below ...726 here
+    dt = datetime(2038, 6, 25, 4, 56, 45, 726000, tzinfo=timezone.utc)
+    assert datetime_to_timestamp(dt) == 2161054605726
+    assert datetime_to_timestamp(datetime(1970, 1, 1, tzinfo=timezone.utc)) == 0
+
+
+def test_remove_smooth_curve_outliers_accepts_arrays_without_mutating():
+    values = [0.01, 0.02, 0.015, 8.5, 0.018, 0.02, -5.2, 0.019]
+    arr = np.array(values)
+    filtered = remove_smooth_curve_outliers(arr, 80.0)
+    assert filtered == remove_smooth_curve_outliers(values, 80.0)
+    assert 8.5 not in filtered and -5.2 not in filtered
+    assert arr.tolist() == values
+
+
+def test_build_date_range_filter_bounds():
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    end = datetime(2025, 1, 2, tzinfo=timezone.utc)
+    assert build_date_range_filter(start, end) == 'WHERE ts >= 1735689600000 AND ts <= 1735776000000'
+    assert build_date_range_filter(start, None) == 'WHERE ts >= 1735689600000'
+    assert build_date_range_filter(None, end) == 'WHERE ts <= 1735776000000'
+    assert build_date_range_filter(None, None) == ''
+
+
+def test_setup_logging_closes_previous_handlers(tmp_path):
+    root = logging.getLogger()
+    saved_handlers, saved_level = root.handlers[:], root.level
+    try:
+        utils.setup_logging(log_file=str(tmp_path / "first.log"))
+        first = [h for h in utils._log_listener.handlers if isinstance(h, logging.FileHandler)]
+        assert first and first[0].stream is not None
+
+        utils.setup_logging(log_file=str(tmp_path / "second.log"))
+        assert first[0].stream is None
+    finally:
+        utils._log_listener.stop()
+        for handler in utils._log_listener.handlers:
+            handler.close()
+        utils._log_listener = None
+        for handler in root.handlers[:]:
+            root.removeHandler(handler)
+        for handler in saved_handlers:
+            root.addHandler(handler)
+        root.setLevel(saved_level)
@@ -5,13 +5,8 @@ Unit tests for WalletBreakdown model
 """
 
 import pytest
-import sys
-from pathlib import Path
 
-# Add src to path
-sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
-
-from shared.models import WalletBreakdown
+from src.shared.models import WalletBreakdown
 
 
 def test_wallet_breakdown_creation():
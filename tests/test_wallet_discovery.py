@@ -18,6 +18,8 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+_SEP = "=" * 60
+
 def test_wallet_discovery():
     """Test wallet discovery from existing supply position tables"""
     reader = None
@@ -31,17 +33,17 @@ def test_wallet_discovery():
         greptime_config = settings.client.greptime
         table_prefix = settings.client.table_asset_prefix
         
-        logger.info(f"GreptimeDB: {greptime_config.host}:{greptime_config.port}")
-        logger.info(f"Database: {greptime_config.database}")
-        logger.info(f"Table prefix: {table_prefix}")
+        logger.info("GreptimeDB: %s:%s", greptime_config.host, greptime_config.port)
+        logger.info("Database: %s", greptime_config.database)
+        logger.info("Table prefix: %s", table_prefix)
         
         # Create reader
-        logger.info("\n" + "="*60)
+        logger.info("\n%s", _SEP)
         logger.info("Creating GreptimeReader...")
         reader = create_greptime_reader(greptime_config, table_prefix)
         
         # Test connection
-        logger.info("\n" + "="*60)
+        logger.info("\n%s", _SEP)
         logger.info("Testing database connection...")
         if not reader.test_connection():
             logger.error("❌ Failed to connect to GreptimeDB")
@@ -49,13 +51,13 @@ def test_wallet_discovery():
         logger.info("✓ Connection successful")
         
         # Discover asset tables
-        logger.info("\n" + "="*60)
+        logger.info("\n%s", _SEP)
         logger.info("Discovering asset tables...")
         assets = reader.discover_asset_tables()
-        logger.info(f"✓ Found {len(assets)} asset tables: {', '.join(assets).upper()}")
+        logger.info("✓ Found %d asset tables: %s", len(assets), ', '.join(assets).upper())
         
         # Discover wallet addresses
-        logger.info("\n" + "="*60)
+        logger.info("\n%s", _SEP)
         logger.info("Discovering wallet addresses...")
         wallets = reader.discover_wallet_addresses()
         
@@ -64,31 +66,31 @@ def test_wallet_discovery():
             logger.info("Checking configured wallets as fallback...")
             config_wallets = getattr(settings.orchestrator, 'wallets', [])
             if config_wallets:
-                logger.info(f"✓ Found {len(config_wallets)} configured wallets:")
+                logger.info("✓ Found %d configured wallets:", len(config_wallets))
                 for i, wallet in enumerate(config_wallets, 1):
-                    logger.info(f"  {i}. {wallet[:30]}...")
+                    logger.info("  %d. %s...", i, wallet[:30])
             else:
                 logger.error("❌ No wallets in configuration either")
                 return False
         else:
-            logger.info(f"✓ Discovered {len(wallets)} unique wallet addresses:")
+            logger.info("✓ Discovered %d unique wallet addresses:", len(wallets))
             for i, wallet in enumerate(wallets, 1):
-                logger.info(f"  {i}. {wallet[:30]}... (len={len(wallet)})")
+                logger.info("  %d. %s... (len=%d)", i, wallet[:30], len(wallet))
         
         # Summary
-        logger.info("\n" + "="*60)
+        logger.info("\n%s", _SEP)
         logger.info("WALLET DISCOVERY TEST SUMMARY")
-        logger.info("="*60)
-        logger.info(f"✓ Database connection: OK")
-        logger.info(f"✓ Asset tables found: {len(assets)}")
-        logger.info(f"✓ Wallets discovered: {len(wallets)}")
-        logger.info(f"Status: {'SUCCESS' if wallets else 'FALLBACK TO CONFIG'}")
-        logger.info("="*60)
+        logger.info(_SEP)
+        logger.info("✓ Database connection: OK")
+        logger.info("✓ Asset tables found: %d", len(assets))
+        logger.info("✓ Wallets discovered: %d", len(wallets))
+        logger.info("Status: %s", 'SUCCESS' if wallets else 'FALLBACK TO CONFIG')
+        logger.info(_SEP)
         
         return True
         
     except Exception as e:
-        logger.error(f"❌ Test failed with error: {e}", exc_info=True)
+        logger.error("❌ Test failed with error: %s", e, exc_info=True)
         return False
     finally:
         if reader is not None: